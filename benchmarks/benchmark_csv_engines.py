@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark de motores de parseo CSV
+----------------------------------
+Compara el parser C de pandas con el motor multihilo de pyarrow ('arrow')
+sobre archivos sintéticos de distintos tamaños, para decidir qué motor
+usar según el volumen del dataset.
+
+Uso:
+    python benchmarks/benchmark_csv_engines.py --rows 100000 1000000 5000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List, Dict, Any
+
+import numpy as np
+import pandas as pd
+
+# Permitir ejecutar el script desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.csv_loader import CSVLoader, ARROW_ENGINE, PYARROW_AVAILABLE
+from utils.dtype_optimizer import to_numpy_backed
+
+
+def generate_csv(path: str, rows: int, seed: int = 0) -> None:
+    """
+    Generar un CSV sintético con la forma típica de una exportación de sensores.
+
+    Args:
+        path: Ruta del archivo a crear
+        rows: Número de filas
+        seed: Semilla del generador aleatorio
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'fecha': pd.date_range('2023-01-01', periods=rows, freq='s').strftime('%Y-%m-%d %H:%M:%S'),
+        'sensor': rng.choice(['A1', 'A2', 'B1', 'B2'], rows),
+        'temperatura': rng.normal(20, 5, rows).round(3),
+        'humedad': rng.uniform(0, 100, rows).round(2),
+        'presion': rng.normal(1013, 10, rows).round(1),
+        'contador': rng.integers(0, 1_000_000, rows)
+    })
+    df.to_csv(path, index=False)
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    """Ejecutar func varias veces y devolver el mejor tiempo en segundos."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_benchmark(row_counts: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Medir ambos motores para cada tamaño de archivo.
+
+    Args:
+        row_counts: Tamaños (en filas) de los archivos a generar
+        repeat: Repeticiones por medición (se toma la mejor)
+
+    Returns:
+        List[Dict[str, Any]]: Resultados por tamaño
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in row_counts:
+            path = os.path.join(tmp_dir, f"datos_{rows}.csv")
+            generate_csv(path, rows)
+            size_mb = os.path.getsize(path) / 1024 ** 2
+
+            result = {'rows': rows, 'size_mb': size_mb,
+                      'c': best_time(lambda: CSVLoader(path).parse(), repeat)}
+
+            if PYARROW_AVAILABLE:
+                result['arrow'] = best_time(lambda: CSVLoader(path, engine=ARROW_ENGINE).parse(), repeat)
+
+                # Coste de pasar a NumPy las columnas que consumiría un gráfico o modelo
+                parsed = CSVLoader(path, engine=ARROW_ENGINE).parse()
+                numeric = parsed[['temperatura', 'humedad', 'presion']]
+                result['to_numpy'] = best_time(lambda: to_numpy_backed(numeric), repeat)
+
+            results.append(result)
+            print(f"  {rows} filas medidas", file=sys.stderr)
+    return results
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Mostrar la tabla comparativa y el motor recomendado por tamaño."""
+    print(f"{'Filas':>10} {'MB':>8} {'c (s)':>9} {'arrow (s)':>10} {'a NumPy (s)':>12} {'Aceleración':>12}  Recomendado")
+    for result in results:
+        arrow_time = result.get('arrow')
+        if arrow_time is None:
+            print(f"{result['rows']:>10} {result['size_mb']:>8.1f} {result['c']:>9.3f} {'-':>10} {'-':>12} {'-':>12}  c")
+            continue
+
+        speedup = result['c'] / arrow_time if arrow_time else float('inf')
+        recommended = ARROW_ENGINE if arrow_time + result['to_numpy'] < result['c'] else 'c'
+        print(f"{result['rows']:>10} {result['size_mb']:>8.1f} {result['c']:>9.3f} {arrow_time:>10.3f} "
+              f"{result['to_numpy']:>12.4f} {speedup:>11.1f}x  {recommended}")
+
+    if not PYARROW_AVAILABLE:
+        print("\npyarrow no está instalado: solo se midió el parser de pandas.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comparar los motores de parseo CSV de PearsonFlow")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 3_000_000],
+                        help="Tamaños de archivo a medir, en filas")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    print(f"Núcleos disponibles: {os.cpu_count()}", file=sys.stderr)
+    print_results(run_benchmark(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark de decodificación de documentos MongoDB
+-------------------------------------------------
+Compara tres formas de convertir los documentos de una consulta en un
+DataFrame:
+
+- dict:   pd.DataFrame(list(cursor)), la conversión original
+- stream: documentos decodificados a dict y volcados en columnas por lotes
+- raw:    lotes BSON sin decodificar leídos directamente a columnas
+
+Cada tamaño se mide con tres conjuntos de campos: solo numéricos (lotes
+uniformes), numéricos con un campo que falta en tramos de documentos (lotes
+con varias disposiciones, que raw lee por tramos) y todos los campos (textos
+de longitud variable, que raw decodifica con bson).
+
+Sin --uri los lotes BSON se generan en memoria con el mismo codificador que
+usa el servidor, de modo que solo se mide la decodificación. Con --uri se
+crea una colección sintética en un mongod local y se mide la carga completa
+con MongoDBLoader (la colección se elimina al terminar).
+
+Uso:
+    python benchmarks/benchmark_mongo_decoding.py --docs 100000 1000000
+    python benchmarks/benchmark_mongo_decoding.py --uri mongodb://localhost:27017 --docs 1000000
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from bson import decode_all, encode
+
+# Permitir ejecutar el script desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.mongo_columns import BATCH_SIZE, documents_to_frame, raw_batches_to_frame
+from core.mongo_loader import MongoDBLoader
+
+BENCHMARK_DB = "PearsonFlowBenchmark"
+BENCHMARK_COLLECTION = "decodificacion"
+NUMERIC_FIELDS = ['fecha', 'temperatura', 'humedad', 'contador', 'activo']
+
+# Documentos seguidos con la misma disposición en el conjunto de lotes mixtos
+SPARSE_RUN = 1000
+
+# Conjuntos medidos: (etiqueta, campos incluidos, documentos con un campo ausente)
+FIELD_SETS = [
+    ('numéricos', NUMERIC_FIELDS, False),
+    ('mixtos', NUMERIC_FIELDS, True),
+    ('todos', None, False),
+]
+
+
+def generate_documents(count: int, seed: int = 0, sparse: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Generar documentos sintéticos con la forma típica de una colección de sensores.
+
+    Args:
+        count: Número de documentos
+        seed: Semilla del generador aleatorio
+        sparse: Omitir la humedad en tramos alternos de SPARSE_RUN documentos (lotes con disposición mixta)
+
+    Returns:
+        Iterator[Dict[str, Any]]: Documentos con campos numéricos, de fecha, booleanos y de texto
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime.datetime(2023, 1, 1)
+    temperatures = rng.normal(20, 5, count).round(3)
+    humidities = rng.uniform(0, 100, count).round(2)
+    counters = rng.integers(0, 1_000_000, count)
+    sensors = rng.choice(['A1', 'A2', 'B1', 'B2'], count)
+    for i in range(count):
+        document = {
+            'fecha': start + datetime.timedelta(seconds=i),
+            'sensor': str(sensors[i]),
+            'temperatura': float(temperatures[i]),
+            'humedad': float(humidities[i]),
+            'contador': int(counters[i]),
+            'activo': bool(counters[i] % 2),
+            'nota': f"lectura {i}"   # Texto de longitud variable
+        }
+        if sparse and (i // SPARSE_RUN) % 2:
+            del document['humedad']
+        yield document
+
+
+def encode_batches(documents: Iterator[Dict[str, Any]], fields: Optional[List[str]]) -> List[bytes]:
+    """Codificar los documentos en lotes BSON como los que envía el servidor."""
+    batches, current = [], []
+    for document in documents:
+        if fields is not None:
+            document = {field: document[field] for field in fields if field in document}
+        current.append(encode(document))
+        if len(current) == BATCH_SIZE:
+            batches.append(b''.join(current))
+            current = []
+    if current:
+        batches.append(b''.join(current))
+    return batches
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    """Ejecutar func varias veces y devolver el mejor tiempo en segundos."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure_in_memory(count: int, fields: Optional[List[str]], sparse: bool, repeat: int) -> Dict[str, float]:
+    """
+    Medir las tres conversiones sobre lotes BSON generados en memoria.
+
+    Args:
+        count: Número de documentos
+        fields: Campos incluidos en cada documento (None = todos)
+        sparse: Generar documentos con un campo ausente en tramos alternos
+        repeat: Repeticiones por medición (se toma la mejor)
+
+    Returns:
+        Dict[str, float]: Segundos de cada conversión
+
+    Raises:
+        RuntimeError: Si la conversión raw no coincide con la de documentos decodificados
+    """
+    batches = encode_batches(generate_documents(count, sparse=sparse), fields)
+
+    def decoded() -> Iterator[Dict[str, Any]]:
+        for batch in batches:
+            yield from decode_all(batch)
+
+    # Los lotes mixtos se decodifican: el resultado debe ser idéntico al de los documentos
+    try:
+        pd.testing.assert_frame_equal(raw_batches_to_frame(batches), documents_to_frame(decoded()))
+    except AssertionError as e:
+        raise RuntimeError(f"La conversión raw difiere de la de documentos: {str(e)}")
+
+    return {
+        'dict': best_time(lambda: pd.DataFrame(list(decoded())), repeat),
+        'stream': best_time(lambda: documents_to_frame(decoded()), repeat),
+        'raw': best_time(lambda: raw_batches_to_frame(batches), repeat)
+    }
+
+
+def measure_mongod(uri: str, count: int, fields: Optional[List[str]], sparse: bool,
+                   repeat: int) -> Dict[str, float]:
+    """
+    Medir las tres cargas contra una colección sintética de un mongod local.
+
+    Args:
+        uri: URI de conexión del servidor
+        count: Número de documentos de la colección
+        fields: Campos proyectados (None = todos)
+        sparse: Generar documentos con un campo ausente en tramos alternos
+        repeat: Repeticiones por medición (se toma la mejor)
+
+    Returns:
+        Dict[str, float]: Segundos de cada carga
+    """
+    loader = MongoDBLoader(uri, BENCHMARK_DB)
+    if not loader.connect():
+        raise ConnectionError(f"No se pudo conectar a {uri}")
+    collection = loader.db[BENCHMARK_COLLECTION]
+    try:
+        collection.drop()
+        batch = []
+        for document in generate_documents(count, sparse=sparse):
+            batch.append(document)
+            if len(batch) == BATCH_SIZE:
+                collection.insert_many(batch)
+                batch = []
+        if batch:
+            collection.insert_many(batch)
+
+        projection = {field: 1 for field in fields} if fields else None
+        return {
+            'dict': best_time(lambda: pd.DataFrame(list(collection.find({}, projection))), repeat),
+            'stream': best_time(lambda: loader.load_collection(BENCHMARK_COLLECTION, projection=projection), repeat),
+            'raw': best_time(lambda: loader.load_collection(BENCHMARK_COLLECTION, projection=projection,
+                                                            raw_bson=True), repeat)
+        }
+    finally:
+        collection.drop()
+        loader.close()
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Mostrar la tabla comparativa por tamaño y conjunto de campos."""
+    print(f"{'Documentos':>11} {'Campos':>10} {'dict (s)':>9} {'stream (s)':>11} {'raw (s)':>9} {'Aceleración':>12}")
+    for result in results:
+        speedup = result['dict'] / result['raw'] if result['raw'] else float('inf')
+        print(f"{result['docs']:>11} {result['fields']:>10} {result['dict']:>9.3f} {result['stream']:>11.3f} "
+              f"{result['raw']:>9.3f} {speedup:>11.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comparar la decodificación de documentos MongoDB de PearsonFlow")
+    parser.add_argument('--docs', type=int, nargs='+', default=[100_000, 1_000_000],
+                        help="Tamaños de colección a medir, en documentos")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por medición")
+    parser.add_argument('--uri', default=None,
+                        help="URI de un mongod local (sin ella se miden lotes BSON generados en memoria)")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.docs:
+        for label, fields, sparse in FIELD_SETS:
+            if args.uri:
+                times = measure_mongod(args.uri, count, fields, sparse, args.repeat)
+            else:
+                times = measure_in_memory(count, fields, sparse, args.repeat)
+            results.append({'docs': count, 'fields': label, **times})
+            print(f"  {count} documentos ({label}) medidos", file=sys.stderr)
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
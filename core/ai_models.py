@@ -7,6 +7,8 @@ from sklearn.ensemble import IsolationForest
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
+from utils.dtype_optimizer import get_numeric_columns
+from utils.datetime_utils import extend_time_axis
 
 class AIModel(ABC):
     """Clase abstracta base para todos los modelos de IA."""
@@ -104,7 +106,7 @@ class AIModel(ABC):
             raise ValueError("El DataFrame está vacío")
         
         # Verificar columnas numéricas
-        numeric_cols = data.select_dtypes(include=['int64', 'float64']).columns
+        numeric_cols = get_numeric_columns(data)
         if len(numeric_cols) == 0:
             raise ValueError("No hay columnas numéricas en los datos")
             
@@ -203,29 +205,9 @@ class LinearForecastModel(AIModel):
                    markersize=4,
                    linewidth=2)
         
-        # Crear valores X para pronósticos (extensión de los valores originales)
-        if isinstance(x_values, pd.DatetimeIndex) or isinstance(x_values, pd.Series):
-            # Si los valores originales son fechas, extender con fechas futuras
-            last_date = x_values[-1]
-            if isinstance(last_date, pd.Timestamp):
-                # Calcular el paso promedio entre fechas
-                if len(x_values) > 1:
-                    avg_delta = (x_values[-1] - x_values[0]) / (len(x_values) - 1)
-                    forecast_x = [last_date + (i+1) * avg_delta for i in range(self.forecast_periods)]
-                else:
-                    # Si solo hay una fecha, asumir días como unidad
-                    import datetime
-                    forecast_x = [last_date + datetime.timedelta(days=i+1) for i in range(self.forecast_periods)]
-            else:
-                # Para otros tipos, usar índice numérico
-                forecast_x = range(len(x_values), len(x_values) + self.forecast_periods)
-        else:
-            # Para valores no temporales, simplemente extender el rango
-            if isinstance(x_values, range):
-                last_x = max(x_values)
-                forecast_x = range(last_x + 1, last_x + self.forecast_periods + 1)
-            else:
-                forecast_x = range(len(x_values), len(x_values) + self.forecast_periods)
+        # Crear valores X para pronósticos (extensión de los valores originales);
+        # en ejes de fechas el paso medio se calcula sobre la vista int64 de epoch
+        forecast_x = extend_time_axis(x_values, self.forecast_periods)
         
         # Graficar pronósticos
         for i, column in enumerate(model_results.columns):
@@ -473,7 +455,7 @@ class ClusteringModel(AIModel):
         # Normalizar datos con manejo de errores
         try:
             # Usar solo columnas numéricas
-            numeric_data = data.select_dtypes(include=['int64', 'float64'])
+            numeric_data = data[get_numeric_columns(data)]
             if numeric_data.empty:
                 raise ValueError("No hay columnas numéricas para clustering")
                 
@@ -517,7 +499,8 @@ class ClusteringModel(AIModel):
             raise ValueError(f"Faltan columnas requeridas en los datos: {missing_cols}")
         
         # Utilizar solo las columnas originales en el mismo orden
-        data_subset = data[self.column_names].copy()
+        # (fillna devuelve un DataFrame nuevo: no hace falta copiar la selección)
+        data_subset = data[self.column_names]
         
         # Manejar valores NaN
         if data_subset.isnull().values.any():
@@ -576,7 +559,7 @@ class ClusteringModel(AIModel):
             
             if not usable_columns:
                 # Si no hay columnas utilizables, usar cualquier columna numérica
-                usable_columns = original_data.select_dtypes(include=['int64', 'float64']).columns[:2].tolist()
+                usable_columns = get_numeric_columns(original_data)[:2]
                 if len(usable_columns) == 0:
                     raise ValueError("No hay columnas numéricas para visualizar")
             
@@ -584,7 +567,8 @@ class ClusteringModel(AIModel):
             if len(model_results) != len(original_data):
                 # Usar el menor de los dos
                 min_len = min(len(original_data), len(model_results))
-                original_data = original_data.iloc[:min_len].copy()
+                original_data = original_data.iloc[:min_len]
+                # Copia explícita: la columna cluster se modifica a continuación
                 model_results = model_results.iloc[:min_len].copy()
             
             # Asegurarse de que la columna cluster es numérica
@@ -9,6 +9,9 @@ from typing import Dict, List, Tuple, Any, Optional
 class Chart(ABC):
     """Clase base abstracta para todos los tipos de gráficos usando patrón Strategy."""
     
+    # Método de reducción de puntos antes de dibujar (None = dibujar todos)
+    downsampling: Optional[str] = None
+    
     def __init__(self, colors: List[str]):
         """
         Inicializar un gráfico con paleta de colores.
@@ -28,23 +31,30 @@ class Chart(ABC):
             x_values: Valores para el eje X
             y_data: DataFrame con datos para el eje Y
             **kwargs: Argumentos adicionales específicos del gráfico
+                (p. ej. y_range: mínimo y máximo ya conocidos de los datos Y)
             
         Returns:
             plt.Axes: Los ejes con el gráfico dibujado
         """
         pass
     
-    def adjust_y_axis(self, ax: plt.Axes, y_data: pd.DataFrame) -> None:
+    def adjust_y_axis(self, ax: plt.Axes, y_data: pd.DataFrame,
+                      y_range: Optional[Tuple[float, float]] = None) -> None:
         """
         Ajustar automáticamente el rango del eje Y para optimizar la visualización.
         
         Args:
             ax: Ejes a ajustar
             y_data: DataFrame con datos para determinar el rango óptimo
+            y_range: Mínimo y máximo ya conocidos (p. ej. del índice de estadísticas);
+                si se indica no se recorren los datos
         """
         try:
-            ymin = y_data.min().min()
-            ymax = y_data.max().max()
+            if y_range is not None and None not in y_range:
+                ymin, ymax = y_range
+            else:
+                ymin = y_data.min().min()
+                ymax = y_data.max().max()
             
             # Manejar casos especiales donde los valores son muy similares
             if abs(ymax - ymin) < 1e-10:
@@ -99,13 +109,16 @@ class BarChart(Chart):
             ax.set_xticks(x + width * (len(y_data.columns) - 1) / 2)
             ax.set_xticklabels(x_values)
         
-        self.adjust_y_axis(ax, y_data)
+        self.adjust_y_axis(ax, y_data, kwargs.get('y_range'))
         return ax
 
 
 class LineChart(Chart):
     """Implementación de gráfico de líneas con marcadores."""
     
+    # Mínimo y máximo por píxel: la envolvente de la línea se mantiene exacta
+    downsampling = 'minmax'
+    
     def plot(self, ax: plt.Axes, x_values: Any, y_data: pd.DataFrame, **kwargs) -> plt.Axes:
         """Crear gráfico de líneas con marcadores para cada serie."""
         # Dibujar una línea por cada columna de datos
@@ -117,13 +130,16 @@ class LineChart(Chart):
                    linewidth=2,
                    color=self.colors[i % len(self.colors)])
         
-        self.adjust_y_axis(ax, y_data)
+        self.adjust_y_axis(ax, y_data, kwargs.get('y_range'))
         return ax
 
 
 class ScatterChart(Chart):
     """Implementación de gráfico de dispersión para análisis de correlación."""
     
+    # LTTB conserva la forma de la nube sin concentrar los puntos en los extremos
+    downsampling = 'lttb'
+    
     def plot(self, ax: plt.Axes, x_values: Any, y_data: pd.DataFrame, **kwargs) -> plt.Axes:
         """Crear gráfico de dispersión con puntos diferenciados por serie."""
         # Crear scatter plot para cada columna de datos
@@ -134,7 +150,7 @@ class ScatterChart(Chart):
                      s=50,  # Tamaño de punto optimizado para legibilidad
                      color=self.colors[i % len(self.colors)])
         
-        self.adjust_y_axis(ax, y_data)
+        self.adjust_y_axis(ax, y_data, kwargs.get('y_range'))
         return ax
 
 
@@ -0,0 +1,315 @@
+import hashlib
+import logging
+import os
+from typing import Optional, List
+
+import pandas as pd
+
+# pyarrow es opcional: sin él, el cache columnar simplemente queda deshabilitado
+try:
+    import pyarrow.feather as pa_feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class ColumnarCache:
+    """
+    Cache persistente en disco de DataFrames ya parseados en formato columnar (Feather).
+
+    Cada entrada se guarda bajo un nombre derivado de la ruta del CSV original y de
+    una huella de su contenido, de modo que una versión nueva del archivo invalida
+    automáticamente la anterior. El tamaño total del directorio se limita eliminando
+    las entradas usadas menos recientemente.
+    """
+
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pearsonflow", "cache")
+    DEFAULT_MAX_BYTES = 4 * 1024 ** 3   # Presupuesto de disco por defecto (4 GiB)
+    SAMPLE_SIZE = 1024 * 1024           # Bytes muestreados por región para la huella
+    EXTENSION = ".feather"
+    SPILL_PREFIX = "spill-"             # Volcados de datasets en memoria: no entran en el LRU de disco
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Inicializar el cache columnar.
+
+        Args:
+            cache_dir: Directorio donde guardar las entradas (por defecto ~/.pearsonflow/cache)
+            max_bytes: Tamaño máximo total en disco antes de desalojar entradas antiguas
+        """
+        self.cache_dir = cache_dir or os.environ.get("PEARSONFLOW_CACHE_DIR", self.DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Indicar si las dependencias del formato columnar están instaladas.
+
+        Returns:
+            bool: True si pyarrow está disponible
+        """
+        return PYARROW_AVAILABLE
+
+    @classmethod
+    def fingerprint(cls, file_path: str) -> str:
+        """
+        Calcular una huella del contenido de un archivo sin leerlo completo.
+
+        Combina tamaño, fecha de modificación y muestras del inicio, el centro
+        y el final del archivo, suficiente para detectar versiones distintas
+        de exportaciones grandes a una fracción del coste de un hash completo.
+
+        Args:
+            file_path: Ruta al archivo
+
+        Returns:
+            str: Huella hexadecimal del archivo
+        """
+        stat = os.stat(file_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+        with open(file_path, 'rb') as handle:
+            offsets = {0, max(0, stat.st_size // 2 - cls.SAMPLE_SIZE // 2), max(0, stat.st_size - cls.SAMPLE_SIZE)}
+            for offset in sorted(offsets):
+                handle.seek(offset)
+                digest.update(handle.read(cls.SAMPLE_SIZE))
+
+        return digest.hexdigest()
+
+    def _source_prefix(self, file_path: str, variant: str = "") -> str:
+        """Prefijo de nombre común a todas las versiones cacheadas de un archivo."""
+        key = f"{os.path.abspath(file_path)}|{variant}"
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def _entry_path(self, file_path: str, variant: str = "") -> str:
+        """Ruta de la entrada correspondiente a la versión actual del archivo."""
+        name = f"{self._source_prefix(file_path, variant)}-{self.fingerprint(file_path)}{self.EXTENSION}"
+        return os.path.join(self.cache_dir, name)
+
+    def _list_entries(self) -> List[str]:
+        """
+        Listar las rutas de las entradas de archivos CSV existentes en el directorio de cache.
+
+        Los volcados de store_spill no se incluyen: sustituyen a datasets que
+        siguen vivos en el DataCache y solo se borran al recuperarlos o descartarlos.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.endswith(self.EXTENSION) and not name.startswith(self.SPILL_PREFIX)]
+
+    def load(self, file_path: str, variant: str = "", columns: Optional[List[str]] = None,
+             arrow_backed: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Recuperar el DataFrame cacheado para la versión actual de un archivo.
+
+        Args:
+            file_path: Ruta al CSV original
+            variant: Etiqueta de las opciones de carga usadas (perfiles de tipos, etc.)
+            columns: Columnas a leer (None = todas); el formato columnar solo lee esas
+            arrow_backed: Devolver columnas respaldadas por Arrow (pd.ArrowDtype) en vez de NumPy
+
+        Returns:
+            Optional[pd.DataFrame]: DataFrame cacheado o None si no hay entrada válida
+        """
+        if not PYARROW_AVAILABLE:
+            return None
+
+        try:
+            entry = self._entry_path(file_path, variant)
+            if not os.path.exists(entry):
+                return None
+
+            columns = list(columns) if columns is not None else None
+            if arrow_backed and hasattr(pd, "ArrowDtype"):
+                df = pa_feather.read_table(entry, columns=columns).to_pandas(types_mapper=pd.ArrowDtype)
+            else:
+                df = pd.read_feather(entry, columns=columns)
+
+            # Marcar la entrada como usada recientemente para la política de desalojo
+            os.utime(entry, None)
+            logging.info(f"Datos cargados desde cache columnar: {entry}")
+            return df
+
+        except Exception as e:
+            logging.warning(f"No se pudo leer el cache columnar de {file_path}: {str(e)}")
+            return None
+
+    def store(self, file_path: str, df: pd.DataFrame, variant: str = "") -> Optional[str]:
+        """
+        Guardar un DataFrame parseado como entrada del cache.
+
+        Elimina las versiones anteriores del mismo archivo y aplica el
+        presupuesto de disco tras escribir.
+
+        Args:
+            file_path: Ruta al CSV original
+            df: DataFrame parseado a guardar
+            variant: Etiqueta de las opciones de carga usadas
+
+        Returns:
+            Optional[str]: Ruta de la entrada escrita o None si no se pudo cachear
+        """
+        if not PYARROW_AVAILABLE:
+            return None
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry = self._entry_path(file_path, variant)
+
+            # Escribir en un temporal y renombrar para no dejar entradas a medias
+            tmp_path = f"{entry}.{os.getpid()}.tmp"
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, entry)
+
+            self.invalidate(file_path, variant, keep=entry)
+            self.evict()
+            logging.debug(f"Cache columnar escrito: {entry}")
+            return entry
+
+        except Exception as e:
+            # Columnas con tipos mixtos u otros casos no soportados: continuar sin cache
+            logging.warning(f"No se pudo escribir el cache columnar de {file_path}: {str(e)}")
+            if 'tmp_path' in locals() and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def _spill_path(self, key: str) -> str:
+        """Ruta de la entrada de volcado de un dataset en memoria (propia de este proceso)."""
+        name = f"{self.SPILL_PREFIX}{os.getpid()}-{hashlib.sha1(key.encode()).hexdigest()[:16]}{self.EXTENSION}"
+        return os.path.join(self.cache_dir, name)
+
+    def store_spill(self, key: str, df: pd.DataFrame) -> bool:
+        """
+        Volcar a disco un DataFrame desalojado de memoria para recuperarlo después.
+
+        A diferencia de store, la entrada no depende de un archivo de origen:
+        sirve también para datasets de MongoDB o modificados en memoria.
+
+        Args:
+            key: Identificador del dataset
+            df: DataFrame a volcar
+
+        Returns:
+            bool: True si el volcado se escribió correctamente
+        """
+        if not PYARROW_AVAILABLE:
+            return False
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry = self._spill_path(key)
+            tmp_path = f"{entry}.tmp"
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, entry)
+            self.evict()
+            return True
+
+        except Exception as e:
+            logging.warning(f"No se pudo volcar a disco el dataset {key}: {str(e)}")
+            if 'tmp_path' in locals() and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def load_spill(self, key: str, arrow_backed: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Recuperar un DataFrame volcado con store_spill.
+
+        Args:
+            key: Identificador del dataset
+            arrow_backed: Devolver columnas respaldadas por Arrow en vez de NumPy
+
+        Returns:
+            Optional[pd.DataFrame]: DataFrame recuperado o None si el volcado ya no existe
+        """
+        entry = self._spill_path(key)
+        if not PYARROW_AVAILABLE or not os.path.exists(entry):
+            return None
+
+        try:
+            if arrow_backed and hasattr(pd, "ArrowDtype"):
+                return pa_feather.read_table(entry).to_pandas(types_mapper=pd.ArrowDtype)
+            return pd.read_feather(entry)
+        except Exception as e:
+            logging.warning(f"No se pudo recuperar el volcado del dataset {key}: {str(e)}")
+            return None
+
+    def has_spill(self, key: str) -> bool:
+        """
+        Indicar si el volcado de un dataset sigue en disco.
+
+        Args:
+            key: Identificador del dataset
+
+        Returns:
+            bool: True si el archivo de volcado existe
+        """
+        return os.path.exists(self._spill_path(key))
+
+    def discard_spill(self, key: str) -> None:
+        """
+        Eliminar el volcado de un dataset, si existe.
+
+        Args:
+            key: Identificador del dataset
+        """
+        try:
+            os.remove(self._spill_path(key))
+        except OSError:
+            pass
+
+    def invalidate(self, file_path: str, variant: str = "", keep: Optional[str] = None) -> int:
+        """
+        Eliminar las entradas cacheadas de un archivo.
+
+        Args:
+            file_path: Ruta al CSV original
+            variant: Etiqueta de las opciones de carga usadas
+            keep: Ruta de una entrada a conservar (la versión vigente)
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        prefix = self._source_prefix(file_path, variant)
+        removed = 0
+        for entry in self._list_entries():
+            if os.path.basename(entry).startswith(prefix) and entry != keep:
+                try:
+                    os.remove(entry)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def evict(self) -> int:
+        """
+        Desalojar entradas menos usadas hasta respetar el presupuesto de disco.
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        entries = []
+        for entry in self._list_entries():
+            try:
+                stat = os.stat(entry)
+                entries.append((stat.st_mtime, stat.st_size, entry))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        # Eliminar primero las entradas usadas hace más tiempo
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry)
+                total -= size
+                removed += 1
+                logging.debug(f"Entrada de cache columnar desalojada: {entry}")
+            except OSError:
+                continue
+
+        return removed
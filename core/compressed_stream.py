@@ -0,0 +1,248 @@
+import bz2
+import gzip
+import io
+import logging
+import lzma
+import queue
+import threading
+from typing import Optional, Dict, BinaryIO, Union
+
+# zstandard es opcional: sin él, los archivos .zst no pueden leerse
+try:
+    import zstandard
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    ZSTANDARD_AVAILABLE = False
+
+# Firmas (magic bytes) de los formatos de compresión soportados
+COMPRESSION_MAGIC: Dict[str, bytes] = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+    'zstd': b'\x28\xb5\x2f\xfd'
+}
+
+# Extensiones de archivos CSV comprimidos reconocidas al listar directorios
+COMPRESSED_EXTENSIONS = ['.gz', '.bz2', '.xz', '.zst']
+
+# Patrones de nombre de archivo CSV, comprimidos o no
+CSV_FILE_PATTERNS = ['*.csv'] + [f'*.csv{extension}' for extension in COMPRESSED_EXTENSIONS]
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Detectar el formato de compresión de un archivo por sus bytes iniciales.
+
+    Args:
+        file_path: Ruta al archivo
+
+    Returns:
+        Optional[str]: 'gzip', 'bz2', 'xz', 'zstd' o None si no está comprimido
+    """
+    try:
+        with open(file_path, 'rb') as handle:
+            head = handle.read(8)
+    except OSError:
+        return None
+
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_decompressor(source: Union[str, BinaryIO], compression: str) -> BinaryIO:
+    """
+    Abrir un archivo comprimido como flujo binario descomprimido (sin hilo auxiliar).
+
+    Args:
+        source: Ruta al archivo comprimido o archivo binario ya abierto
+        compression: Formato de compresión detectado
+
+    Returns:
+        BinaryIO: Objeto de archivo que entrega los bytes descomprimidos
+
+    Raises:
+        ValueError: Si el formato no está soportado o falta su dependencia
+    """
+    if compression == 'gzip':
+        return gzip.open(source, 'rb')
+    if compression == 'bz2':
+        return bz2.open(source, 'rb')
+    if compression == 'xz':
+        return lzma.open(source, 'rb')
+    if compression == 'zstd':
+        if not ZSTANDARD_AVAILABLE:
+            raise ValueError("Para leer archivos .zst instale el paquete 'zstandard'")
+        raw = open(source, 'rb') if isinstance(source, str) else source
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    raise ValueError(f"Formato de compresión no soportado: {compression}")
+
+
+class DecompressingReader(io.RawIOBase):
+    """
+    Flujo de lectura que descomprime un archivo en un hilo en segundo plano.
+
+    El hilo descomprime bloques y los deposita en una cola acotada de la que
+    lee el parser, de modo que descompresión y parseo se solapan en núcleos
+    distintos (zlib, bz2, lzma y zstandard liberan el GIL mientras trabajan)
+    y en memoria nunca hay más de max_chunks bloques de texto descomprimido.
+    """
+
+    def __init__(self, file_path: str, compression: Optional[str] = None,
+                 chunk_size: int = 1024 * 1024, max_chunks: int = 8):
+        """
+        Inicializar el lector y arrancar el hilo de descompresión.
+
+        Args:
+            file_path: Ruta al archivo comprimido
+            compression: Formato de compresión (None = detectar por magic bytes)
+            chunk_size: Bytes descomprimidos por bloque
+            max_chunks: Bloques máximos en espera entre el hilo y el parser
+
+        Raises:
+            ValueError: Si el archivo no está comprimido en un formato soportado
+        """
+        super().__init__()
+        self.file_path = file_path
+        self.compression = compression or detect_compression(file_path)
+        if self.compression is None:
+            raise ValueError(f"El archivo no está comprimido en un formato reconocido: {file_path}")
+
+        self.chunk_size = chunk_size
+        self._compressed = open(file_path, 'rb')
+        try:
+            self._source = open_decompressor(self._compressed, self.compression)
+        except Exception:
+            self._compressed.close()
+            raise
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_chunks)
+        self._stop = threading.Event()
+        self._buffer = memoryview(b'')
+        self._offset = 0
+        self._eof = False
+
+        self._thread = threading.Thread(target=self._decompress, name="pearsonflow-decompress", daemon=True)
+        self._thread.start()
+
+    def _decompress(self) -> None:
+        """Bucle del hilo auxiliar: descomprimir bloques y encolarlos."""
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(self.chunk_size)
+                if not chunk:
+                    break
+                self._put(chunk)
+        except Exception as e:
+            # Reenviar el error al hilo lector para que lo reciba el parser
+            logging.error(f"Error al descomprimir {self.file_path}: {str(e)}")
+            self._put(e)
+            return
+        self._put(None)
+
+    def _put(self, item) -> None:
+        """Encolar un elemento esperando espacio, salvo que el lector se haya cerrado."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    @property
+    def compressed_position(self) -> int:
+        """Bytes del archivo comprimido consumidos hasta ahora (para barras de progreso)."""
+        try:
+            return self._compressed.tell()
+        except (OSError, ValueError):
+            return 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        Copiar en buffer los siguientes bytes descomprimidos disponibles.
+
+        Args:
+            buffer: Búfer de destino
+
+        Returns:
+            int: Bytes copiados (0 al final del flujo)
+        """
+        if not self._buffer and not self._eof:
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+            elif isinstance(item, Exception):
+                self._eof = True
+                raise item
+            else:
+                # memoryview permite consumir el bloque por partes sin copiarlo
+                self._buffer = memoryview(item)
+
+        if not self._buffer:
+            return 0
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        self._offset += size
+        return size
+
+    def tell(self) -> int:
+        return self._offset
+
+    def close(self) -> None:
+        """Detener el hilo de descompresión y liberar el archivo."""
+        if self.closed:
+            return
+        self._stop.set()
+
+        # Vaciar la cola para desbloquear al hilo si estaba esperando espacio
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+        self._thread.join()
+        self._source.close()
+        self._compressed.close()
+        super().close()
+
+
+def open_stream(file_path: str, compression: Optional[str] = None) -> BinaryIO:
+    """
+    Abrir un archivo comprimido como flujo bufferizado con descompresión en segundo plano.
+
+    Args:
+        file_path: Ruta al archivo comprimido
+        compression: Formato de compresión (None = detectar por magic bytes)
+
+    Returns:
+        BinaryIO: Flujo binario listo para pandas.read_csv
+    """
+    reader = DecompressingReader(file_path, compression)
+    return io.BufferedReader(reader, buffer_size=reader.chunk_size)
+
+
+def read_head(file_path: str, size: int) -> bytes:
+    """
+    Leer los primeros bytes de un archivo, descomprimiéndolos si hace falta.
+
+    Args:
+        file_path: Ruta al archivo
+        size: Número de bytes (descomprimidos) a leer
+
+    Returns:
+        bytes: Inicio del contenido del archivo
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        with open(file_path, 'rb') as handle:
+            return handle.read(size)
+
+    with open_decompressor(file_path, compression) as handle:
+        return handle.read(size)
+
@@ -1,9 +1,39 @@
-from .data_loader import DataLoader
+from .data_loader import DataLoader, LoadCancelledError
 import pandas as pd
 from tkinter import Tk, filedialog
 import os
+import io
 import logging
-from typing import Optional, Dict, Any, List, Union
+import threading
+from typing import Optional, Dict, Any, List, Union, Callable, Tuple, Iterator
+from utils.dtype_optimizer import optimize_dtypes
+from core.format_sniffer import FormatSniffer
+from core.compressed_stream import detect_compression, open_stream, read_head, CSV_FILE_PATTERNS
+
+# pyarrow es opcional: sin él, el motor 'arrow' recurre al parser de pandas
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Nombre del motor de parseo multihilo basado en pyarrow.csv
+ARROW_ENGINE = "arrow"
+
+# Opciones de pandas.read_csv sin equivalente en pyarrow.csv
+ARROW_UNSUPPORTED_OPTIONS = ("thousands", "skiprows", "skipfooter", "nrows", "comment", "dtype",
+                             "converters", "na_values", "index_col", "names", "lineterminator",
+                             "escapechar", "parse_dates", "compression")
+
+# Firma del callback de progreso: (filas leídas, bytes leídos, bytes totales)
+ProgressCallback = Callable[[int, int, int], None]
+
+# Bytes leídos en cada paso al recorrer el archivo desde el final
+TAIL_BLOCK_SIZE = 1024 * 1024
+
+# Filas por bloque al recorrer el archivo sin cargarlo (consultas con condiciones)
+STREAM_CHUNK_ROWS = 100_000
 
 class CSVLoader(DataLoader):
     """
@@ -13,20 +43,55 @@ class CSVLoader(DataLoader):
     para archivos CSV incluyendo detección de delimitadores y validación de formato.
     """
 
-    def __init__(self, path: str = "", **kwargs):
+    def __init__(self, path: str = "", chunksize: Optional[int] = None,
+                 progress_callback: Optional[ProgressCallback] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 dtype_profile: Optional[str] = None, sniff_format: bool = True, **kwargs):
         """
         Inicializar el cargador de CSV con opciones configurables.
         
         Args:
             path: Ruta al archivo CSV (opcional, se puede seleccionar interactivamente)
-            **kwargs: Argumentos adicionales para pandas.read_csv (encoding, sep, etc.)
+            chunksize: Filas por bloque para la carga progresiva (None = lectura en un solo paso)
+            progress_callback: Función llamada tras cada bloque con (filas, bytes leídos, bytes totales)
+            cancel_event: Evento que, al activarse, cancela la carga progresiva en curso
+            dtype_profile: Perfil de reducción de tipos a aplicar tras la lectura (p. ej. 'compact')
+            sniff_format: Detectar el formato del archivo y leerlo con opciones explícitas
+            **kwargs: Argumentos adicionales para pandas.read_csv (encoding, sep, etc.);
+                tienen prioridad sobre el formato detectado. engine='arrow' selecciona
+                el parser multihilo de pyarrow con columnas respaldadas por Arrow
         """
         super().__init__(path)
+        
+        # Motor de parseo: 'arrow' usa pyarrow.csv; cualquier otro valor se pasa a pandas
+        self.engine = kwargs.get("engine", "c")
+        if self.engine == ARROW_ENGINE:
+            kwargs.pop("engine")
+            if not PYARROW_AVAILABLE:
+                logging.warning("pyarrow no está instalado: se usará el parser de pandas")
+                self.engine = "c"
+                
         self.csv_options = kwargs  # Opciones de pandas para lectura de CSV
         
+        # Perfil de formato detectado y opciones de lectura resultantes (por ruta)
+        self.sniff_format = sniff_format
+        self.format_profile: Optional[Dict[str, Any]] = None
+        self.compression: Optional[str] = None  # Formato de compresión detectado por magic bytes
+        self._read_options: Optional[Tuple[str, Dict[str, Any]]] = None
+        
+        # Configuración de la carga progresiva por bloques
+        self.chunksize = chunksize
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        
+        # Perfil de optimización de tipos y reporte de bytes ahorrados por columna
+        self.dtype_profile = dtype_profile
+        self.dtype_report: Dict[str, Dict[str, Any]] = {}
+        
         # Metadatos del archivo CSV
         self.metadata = {
             "file_type": "csv",
+            "engine": self.engine,
             "encoding": kwargs.get("encoding", "utf-8"),
             "separator": kwargs.get("sep", ",")
         }
@@ -58,7 +123,7 @@ class CSVLoader(DataLoader):
         try:
             # Cargar CSV con pandas aplicando opciones configuradas
             logging.info(f"Cargando archivo CSV: {self.path}")
-            df = pd.read_csv(self.path, **self.csv_options)
+            df = self.parse()
             
             # Actualizar metadatos con información del archivo cargado
             self.metadata.update({
@@ -66,7 +131,8 @@ class CSVLoader(DataLoader):
                 "file_name": os.path.basename(self.path),
                 "file_size": os.path.getsize(self.path),
                 "rows": len(df),
-                "columns": len(df.columns)
+                "columns": len(df.columns),
+                "dtype_report": self.dtype_report
             })
             
             # Almacenar DataFrame y retornar
@@ -74,6 +140,10 @@ class CSVLoader(DataLoader):
             logging.info(f"CSV cargado exitosamente: {len(df)} filas, {len(df.columns)} columnas")
             return df
             
+        except LoadCancelledError:
+            logging.info(f"Carga cancelada por el usuario: {self.path}")
+            raise
+            
         except pd.errors.EmptyDataError:
             error_msg = f"El archivo CSV está vacío: {self.path}"
             logging.error(error_msg)
@@ -89,6 +159,661 @@ class CSVLoader(DataLoader):
             logging.error(error_msg)
             raise ValueError(error_msg)
     
+    def parse(self) -> pd.DataFrame:
+        """
+        Leer el archivo CSV configurado sin transformar los errores de pandas.
+        
+        Con engine='arrow' parsea con pyarrow.csv en todos los núcleos. Si no,
+        usa lectura por bloques si se configuró chunksize o una única llamada
+        a pandas.read_csv. Si hay un perfil de tipos configurado, el resultado
+        se devuelve ya optimizado.
+        
+        Returns:
+            pd.DataFrame: DataFrame con el contenido del archivo
+            
+        Raises:
+            LoadCancelledError: Si se activó el evento de cancelación durante la lectura
+            pd.errors.EmptyDataError: Si el archivo está vacío
+            pd.errors.ParserError: Si el formato del archivo es inválido
+        """
+        df = self._parse_arrow() if self.engine == ARROW_ENGINE else None
+        
+        if df is None:
+            if self.chunksize:
+                df = self._parse_chunked()
+            else:
+                df = self._read_csv()
+            
+        # Convertir fechas con los formatos del perfil, sin inferirlos fila a fila
+        df = self._apply_datetime_formats(df)
+            
+        # Reducir tipos numéricos y codificar textos repetidos si se solicitó
+        if self.dtype_profile:
+            df, self.dtype_report = optimize_dtypes(df, self.dtype_profile)
+            
+        return df
+    
+    def load_columns(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Leer del archivo solo las columnas indicadas usando usecols.
+        
+        Args:
+            columns: Nombres de las columnas a leer
+            
+        Returns:
+            pd.DataFrame: DataFrame con las columnas solicitadas en el orden pedido
+            
+        Raises:
+            ValueError: Si alguna columna no existe en el archivo
+        """
+        logging.info(f"Cargando columnas {columns} de: {self.path}")
+        df = self._parse_arrow(list(columns)) if self.engine == ARROW_ENGINE else None
+        if df is None:
+            df = self._read_csv(usecols=list(columns))
+        df = self._apply_datetime_formats(df)
+        
+        if self.dtype_profile:
+            df, report = optimize_dtypes(df, self.dtype_profile)
+            self.dtype_report.update(report)
+            
+        # usecols conserva el orden del archivo: reordenar según lo solicitado
+        return df[list(columns)]
+    
+    def read_schema(self, sample_rows: int = 1000) -> pd.DataFrame:
+        """
+        Leer una muestra inicial del archivo para conocer columnas y tipos.
+        
+        Args:
+            sample_rows: Número de filas a leer
+            
+        Returns:
+            pd.DataFrame: Primeras filas del archivo con todas sus columnas
+        """
+        df = self._read_csv(nrows=sample_rows)
+        return self._apply_datetime_formats(df)
+    
+    def _read_csv(self, **extra_options) -> pd.DataFrame:
+        """
+        Ejecutar pandas.read_csv sobre el archivo, descomprimiéndolo en segundo plano si hace falta.
+        
+        Args:
+            **extra_options: Opciones adicionales para esta lectura (usecols, nrows, etc.)
+            
+        Returns:
+            pd.DataFrame: Resultado de pandas.read_csv
+        """
+        options = {**self.get_read_options(), **extra_options}
+        if not self.compression:
+            return pd.read_csv(self.path, **options)
+            
+        # El parser consume el flujo mientras otro hilo descomprime los bloques siguientes
+        with open_stream(self.path, self.compression) as stream:
+            return pd.read_csv(stream, **options)
+    
+    def _parse_arrow(self, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Parsear el archivo con pyarrow.csv usando todos los núcleos.
+        
+        Las columnas quedan en búferes Arrow (pd.ArrowDtype); la conversión a
+        NumPy se hace después solo donde un gráfico o modelo la necesite. Con
+        un perfil de tipos se convierte a NumPy para poder reducir los tipos.
+        
+        Args:
+            columns: Columnas a leer (None = todas)
+            
+        Returns:
+            Optional[pd.DataFrame]: DataFrame parseado, o None si las opciones no
+            son compatibles con Arrow o el archivo no pudo parsearse (usar pandas)
+            
+        Raises:
+            LoadCancelledError: Si se activó el evento de cancelación durante la lectura
+        """
+        options = self.get_read_options()
+        arrow_options = self._build_arrow_options(options, columns)
+        if arrow_options is None:
+            logging.info(f"Opciones de lectura no soportadas por Arrow, usando pandas: {self.path}")
+            return None
+            
+        read_options, parse_options, convert_options = arrow_options
+        total_bytes = os.path.getsize(self.path)
+        source = open_stream(self.path, self.compression) if self.compression else open(self.path, 'rb')
+        
+        try:
+            with source:
+                if not self.chunksize:
+                    table = pa_csv.read_csv(source, read_options=read_options,
+                                            parse_options=parse_options, convert_options=convert_options)
+                else:
+                    # Lectura por lotes para poder informar progreso y cancelar
+                    position = (lambda: source.raw.compressed_position) if self.compression else source.tell
+                    reader = pa_csv.open_csv(source, read_options=read_options,
+                                             parse_options=parse_options, convert_options=convert_options)
+                    batches = []
+                    rows_read = 0
+                    for batch in reader:
+                        if self.cancel_event is not None and self.cancel_event.is_set():
+                            raise LoadCancelledError(f"Carga cancelada: {self.path}")
+                        batches.append(batch)
+                        rows_read += batch.num_rows
+                        if self.progress_callback is not None:
+                            self.progress_callback(rows_read, min(position(), total_bytes), total_bytes)
+                    table = pa.Table.from_batches(batches, schema=reader.schema)
+                    batches.clear()
+        except pa.ArrowInvalid as e:
+            # Tipos inconsistentes entre bloques, archivo vacío, etc.: el parser de pandas decide
+            logging.warning(f"Arrow no pudo parsear {self.path}, usando pandas: {str(e)}")
+            return None
+            
+        if self.dtype_profile or not hasattr(pd, "ArrowDtype"):
+            df = table.to_pandas()
+        else:
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
+            
+        # Sin cabecera, pandas numera las columnas desde 0
+        if options.get("header", 0) is None:
+            df.columns = range(len(df.columns))
+        return df
+    
+    def _match_engine_backing(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Pasar a búferes Arrow un DataFrame leído con pandas si el motor es 'arrow'.
+        
+        Las lecturas parciales (final del archivo, filas añadidas) usan pandas;
+        así se concatenan con el dataset principal sin mezclar tipos.
+        """
+        if self.engine != ARROW_ENGINE or self.dtype_profile or not hasattr(pd, "ArrowDtype"):
+            return df
+        return pa.Table.from_pandas(df, preserve_index=False).to_pandas(types_mapper=pd.ArrowDtype)
+    
+    def _build_arrow_options(self, options: Dict[str, Any], columns: Optional[List[str]] = None):
+        """
+        Traducir las opciones de pandas.read_csv a las de pyarrow.csv.
+        
+        Args:
+            options: Opciones de lectura de pandas
+            columns: Columnas a leer (None = todas)
+            
+        Returns:
+            Optional[Tuple]: (ReadOptions, ParseOptions, ConvertOptions) o None si
+            alguna opción no tiene equivalente en Arrow
+        """
+        if any(options.get(option) for option in ARROW_UNSUPPORTED_OPTIONS):
+            return None
+        if options.get("header", 0) not in (0, None, "infer") or callable(options.get("usecols")):
+            return None
+            
+        sep = options.get("sep", options.get("delimiter", ","))
+        quotechar = options.get("quotechar", '"')
+        if not isinstance(sep, str) or len(sep) != 1 or len(quotechar) != 1:
+            return None
+            
+        encoding = str(options.get("encoding", "utf-8"))
+        if encoding.lower().replace("-", "").replace("_", "") in ("utf8", "utf8sig"):
+            encoding = "utf8"   # Arrow descarta la marca BOM por sí mismo
+            
+        usecols = columns if columns is not None else options.get("usecols")
+        if usecols is not None and options.get("header", 0) is None:
+            return None
+        datetime_formats = sorted(set((self.format_profile or {}).get("datetime_columns", {}).values()))
+        
+        read_options = pa_csv.ReadOptions(use_threads=True, encoding=encoding,
+                                          autogenerate_column_names=options.get("header", 0) is None)
+        parse_options = pa_csv.ParseOptions(delimiter=sep, quote_char=quotechar)
+        convert_options = pa_csv.ConvertOptions(
+            decimal_point=options.get("decimal", "."),
+            include_columns=list(usecols) if usecols is not None else None,
+            timestamp_parsers=datetime_formats or None,
+            strings_can_be_null=True
+        )
+        return read_options, parse_options, convert_options
+    
+    def get_read_options(self) -> Dict[str, Any]:
+        """
+        Obtener las opciones de pandas.read_csv para el archivo actual.
+        
+        Combina el perfil de formato detectado (delimitador, codificación,
+        separadores numéricos y cabecera) con las opciones indicadas por el
+        usuario, que tienen prioridad. El perfil se calcula una vez por ruta.
+        
+        Returns:
+            Dict[str, Any]: Argumentos para pandas.read_csv
+        """
+        if self._read_options is not None and self._read_options[0] == self.path:
+            return self._read_options[1]
+            
+        options = dict(self.csv_options)
+        self.format_profile = None
+        
+        # Compresión detectada por contenido, salvo que el usuario la indique a pandas
+        self.compression = None
+        if "compression" not in options and self.path and os.path.isfile(self.path):
+            self.compression = detect_compression(self.path)
+        
+        if self.sniff_format and self.path and os.path.isfile(self.path):
+            try:
+                self.format_profile = FormatSniffer().get_profile(self.path)
+                detected = FormatSniffer.to_read_options(self.format_profile)
+                if "delimiter" in options:
+                    detected.pop("sep", None)
+                options = {**detected, **self.csv_options}
+            except (OSError, ValueError) as e:
+                logging.warning(f"No se pudo detectar el formato de {self.path}: {str(e)}")
+                
+        self.metadata.update({
+            "compression": self.compression,
+            "encoding": options.get("encoding", "utf-8"),
+            "separator": options.get("sep", options.get("delimiter", ",")),
+            "format_profile": self.format_profile
+        })
+        self._read_options = (self.path, options)
+        return options
+    
+    def _apply_datetime_formats(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convertir a datetime64 las columnas de fecha del perfil usando su formato explícito.
+        
+        Args:
+            df: DataFrame recién parseado
+            
+        Returns:
+            pd.DataFrame: DataFrame con las columnas de fecha convertidas
+        """
+        if not self.format_profile or "parse_dates" in self.csv_options:
+            return df
+            
+        for column, fmt in self.format_profile.get("datetime_columns", {}).items():
+            if column not in df.columns or not pd.api.types.is_string_dtype(df[column]):
+                continue
+            try:
+                df[column] = pd.to_datetime(df[column], format=fmt)
+            except (ValueError, TypeError) as e:
+                # Valores fuera de la muestra con otro formato: conservar el texto
+                logging.warning(f"La columna '{column}' no sigue el formato {fmt}: {str(e)}")
+        return df
+    
+    def read_tail(self, n_rows: int, block_size: int = TAIL_BLOCK_SIZE) -> pd.DataFrame:
+        """
+        Leer las últimas n_rows filas del archivo sin recorrerlo completo.
+        
+        Retrocede por bloques desde el final del archivo buscando saltos de
+        línea que sean límites de registro y parsea solo la cabecera más esas
+        filas. Un salto de línea separa registros si el número de comillas
+        entre él y el final del archivo es par; así se respetan los campos
+        entrecomillados que contienen saltos de línea.
+        
+        Args:
+            n_rows: Número de filas finales a leer
+            block_size: Bytes leídos en cada paso hacia atrás
+            
+        Returns:
+            pd.DataFrame: DataFrame con las últimas filas (índice desde 0)
+            
+        Raises:
+            ValueError: Si las opciones de lectura no permiten localizar filas por bytes
+        """
+        if not self.supports_byte_seeking():
+            raise ValueError("Las opciones de lectura del CSV no permiten la lectura desde el final")
+            
+        options = self.get_read_options()
+        quote = options.get("quotechar", '"').encode()
+        
+        with open(self.path, 'rb') as handle:
+            header_end = self._find_header_end(handle, quote, block_size) if options.get("header", 0) is not None else 0
+            size = os.fstat(handle.fileno()).st_size
+            
+            # El salto de línea final del archivo termina el último registro, no separa dos
+            limit = size
+            if limit > header_end:
+                handle.seek(limit - 1)
+                if handle.read(1) == b'\n':
+                    limit -= 1
+                    
+            start = None
+            found = 0
+            quotes = 0
+            pos = limit
+            
+            while start is None and pos > header_end and n_rows > 0:
+                read_size = min(block_size, pos - header_end)
+                pos -= read_size
+                handle.seek(pos)
+                block = handle.read(read_size)
+                
+                # Recorrer el bloque de atrás hacia delante salto a salto
+                end = len(block)
+                while True:
+                    idx = block.rfind(b'\n', 0, end)
+                    quotes += block.count(quote, idx + 1, end)
+                    if idx < 0:
+                        break
+                    if quotes % 2 == 0:
+                        found += 1
+                        if found == n_rows:
+                            start = pos + idx + 1
+                            break
+                    end = idx
+                    
+            # Menos filas que las pedidas: leer todo el cuerpo
+            if start is None:
+                start = header_end if n_rows > 0 else size
+                
+            handle.seek(0)
+            header = handle.read(header_end)
+            handle.seek(start)
+            body = handle.read(size - start)
+            
+        logging.debug(f"Lectura desde el final: {len(body)} de {size} bytes de {self.path}")
+        
+        if header and not header.endswith(b'\n'):
+            header += b'\n'
+        df = pd.read_csv(io.BytesIO(header + body), **options)
+        df = self._match_engine_backing(self._apply_datetime_formats(df))
+        
+        if self.dtype_profile:
+            df, self.dtype_report = optimize_dtypes(df, self.dtype_profile)
+        return df
+    
+    def read_appended(self, offset: int,
+                      columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Leer los registros completos añadidos al archivo a partir de un byte.
+        
+        Solo se parsean los bytes nuevos; un último registro a medio escribir
+        se deja para la siguiente lectura.
+        
+        Args:
+            offset: Posición (inicio de registro) hasta la que ya se consumió el archivo
+            columns: Columnas a leer (None = todas)
+            
+        Returns:
+            Tuple[pd.DataFrame, int]: Filas nuevas y posición hasta la que se consumió
+            
+        Raises:
+            ValueError: Si las opciones de lectura no permiten localizar filas por bytes
+        """
+        if not self.supports_byte_seeking():
+            raise ValueError("Las opciones de lectura del CSV no permiten el seguimiento por bytes")
+            
+        read_options = self.get_read_options()
+        quote = read_options.get("quotechar", '"').encode()
+        
+        with open(self.path, 'rb') as handle:
+            header_end = (self._find_header_end(handle, quote, TAIL_BLOCK_SIZE)
+                          if read_options.get("header", 0) is not None else 0)
+            offset = max(offset, header_end)
+            size = os.fstat(handle.fileno()).st_size
+            
+            handle.seek(offset)
+            data = handle.read(max(0, size - offset))
+            end = self._last_record_end(data, quote)
+            if end == 0:
+                return pd.DataFrame(), offset
+                
+            handle.seek(0)
+            header = handle.read(header_end)
+            
+        options = dict(read_options)
+        if columns is not None:
+            options["usecols"] = list(columns)
+        df = self._apply_datetime_formats(pd.read_csv(io.BytesIO(header + data[:end]), **options))
+        df = self._match_engine_backing(df)
+        if columns is not None:
+            df = df[list(columns)]
+            
+        if self.dtype_profile:
+            df, _ = optimize_dtypes(df, self.dtype_profile)
+            
+        logging.debug(f"Leídas {len(df)} filas nuevas ({end} bytes) de {self.path}")
+        return df, offset + end
+    
+    def partial_record_start(self, size: Optional[int] = None,
+                             block_size: int = TAIL_BLOCK_SIZE) -> Optional[int]:
+        """
+        Localizar un último registro a medio escribir (sin salto de línea final).
+        
+        Una lectura completa del archivo mientras otro proceso escribe su
+        última fila la incluye tal cual; en seguimiento ese registro debe
+        quedar fuera del dataset y leerse entero con read_appended. Se
+        retrocede desde el final hasta el último salto de línea que sea
+        límite de registro, como en read_tail.
+        
+        Args:
+            size: Bytes del archivo que se consideran (None = tamaño actual)
+            block_size: Bytes leídos en cada paso hacia atrás
+            
+        Returns:
+            Optional[int]: Posición donde empieza el registro sin terminar, o None si
+            el archivo termina en un registro completo (o solo le siguen espacios)
+            
+        Raises:
+            ValueError: Si las opciones de lectura no permiten localizar filas por bytes
+        """
+        if not self.supports_byte_seeking():
+            raise ValueError("Las opciones de lectura del CSV no permiten localizar registros por bytes")
+            
+        options = self.get_read_options()
+        quote = options.get("quotechar", '"').encode()
+        
+        with open(self.path, 'rb') as handle:
+            header_end = self._find_header_end(handle, quote, block_size) if options.get("header", 0) is not None else 0
+            size = os.fstat(handle.fileno()).st_size if size is None else size
+            
+            start = header_end
+            quotes = 0
+            pos = size
+            while pos > header_end:
+                read_size = min(block_size, pos - header_end)
+                pos -= read_size
+                handle.seek(pos)
+                block = handle.read(read_size)
+                idx = block.rfind(b'\n')
+                end = len(block)
+                while idx >= 0:
+                    quotes += block.count(quote, idx + 1, end)
+                    if quotes % 2 == 0:
+                        break
+                    end = idx
+                    idx = block.rfind(b'\n', 0, end)
+                if idx >= 0:
+                    start = pos + idx + 1
+                    break
+                quotes += block.count(quote, 0, end)
+                
+            if start >= size:
+                return None
+            handle.seek(start)
+            return start if handle.read(size - start).strip() else None
+    
+    @staticmethod
+    def _last_record_end(data: bytes, quote: bytes) -> int:
+        """
+        Calcular cuántos bytes iniciales de un bloque forman registros completos.
+        
+        El bloque debe empezar en un límite de registro: un salto de línea
+        cierra un registro si el número de comillas anterior a él es par.
+        
+        Args:
+            data: Bytes a partir de un inicio de registro
+            quote: Carácter de comillas del CSV
+            
+        Returns:
+            int: Longitud del prefijo con registros completos (0 si no hay ninguno)
+        """
+        idx = data.rfind(b'\n')
+        if idx < 0:
+            return 0
+            
+        quotes = data.count(quote, 0, idx)
+        while quotes % 2:
+            previous = data.rfind(b'\n', 0, idx)
+            if previous < 0:
+                return 0
+            quotes -= data.count(quote, previous + 1, idx)
+            idx = previous
+            
+        return idx + 1
+    
+    def supports_byte_seeking(self) -> bool:
+        """
+        Indicar si el archivo puede dividirse en registros trabajando sobre bytes.
+        
+        Requiere una codificación compatible con ASCII y una cabecera en la
+        primera línea sin filas omitidas ni pies de página.
+        
+        Returns:
+            bool: True si las lecturas por posición de bytes son seguras
+        """
+        options = self.get_read_options()
+        if self.compression or options.get("compression") not in (None, "infer"):
+            return False
+            
+        encoding = str(options.get("encoding", "utf-8")).lower().replace("-", "").replace("_", "")
+        if encoding.startswith(("utf16", "utf32")):
+            return False
+            
+        unsupported = ("skiprows", "skipfooter", "nrows", "chunksize", "iterator", "lineterminator", "comment")
+        if any(options.get(option) for option in unsupported):
+            return False
+        return options.get("header", "infer") in ("infer", 0, None)
+    
+    @staticmethod
+    def _find_header_end(handle, quote: bytes, block_size: int) -> int:
+        """
+        Localizar el byte siguiente al final de la línea de cabecera.
+        
+        Args:
+            handle: Archivo abierto en modo binario
+            quote: Carácter de comillas del CSV
+            block_size: Bytes leídos en cada paso
+            
+        Returns:
+            int: Posición del primer byte del cuerpo del archivo
+        """
+        handle.seek(0)
+        offset = 0
+        quotes = 0
+        
+        while True:
+            block = handle.read(block_size)
+            if not block:
+                return offset
+                
+            start = 0
+            while True:
+                idx = block.find(b'\n', start)
+                quotes += block.count(quote, start, idx if idx >= 0 else len(block))
+                if idx < 0:
+                    break
+                if quotes % 2 == 0:
+                    return offset + idx + 1
+                start = idx + 1
+                
+            offset += len(block)
+    
+    def iter_chunks(self, columns: Optional[List[str]] = None,
+                    chunksize: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Recorrer el archivo en bloques de filas sin acumularlos en memoria.
+        
+        Cada bloque se entrega con las fechas del perfil ya convertidas; no se
+        aplica el perfil de tipos, que depende del dataset completo.
+        
+        Args:
+            columns: Columnas a leer (None = todas)
+            chunksize: Filas por bloque
+            
+        Yields:
+            pd.DataFrame: Bloques consecutivos del archivo
+            
+        Raises:
+            LoadCancelledError: Si se activó el evento de cancelación durante la lectura
+            ValueError: Si alguna columna no existe en el archivo
+        """
+        options = dict(self.get_read_options())
+        if columns is not None:
+            options['usecols'] = list(columns)
+            
+        handle = open_stream(self.path, self.compression) if self.compression else open(self.path, 'rb')
+        with handle:
+            reader = pd.read_csv(handle, chunksize=chunksize, **options)
+            try:
+                for chunk in reader:
+                    if self.cancel_event is not None and self.cancel_event.is_set():
+                        raise LoadCancelledError(f"Lectura cancelada: {self.path}")
+                    chunk = self._apply_datetime_formats(chunk)
+                    yield chunk if columns is None else chunk[list(columns)]
+            finally:
+                reader.close()
+    
+    def _parse_chunked(self) -> pd.DataFrame:
+        """
+        Leer el archivo en bloques de filas informando el progreso.
+        
+        Cada bloque se reparte al llegar en arrays independientes por columna y
+        se descarta. Al final las columnas se concatenan de una en una y sus
+        partes se liberan en cuanto la columna está completa, de modo que el
+        pico de memoria es el del DataFrame final más una columna (en lugar de
+        dos veces el DataFrame, como al concatenar todos los bloques a la vez).
+        El resultado guarda cada columna en su propio array, sin consolidar.
+        
+        Returns:
+            pd.DataFrame: DataFrame con todas las filas leídas
+            
+        Raises:
+            LoadCancelledError: Si se activó el evento de cancelación durante la lectura
+        """
+        options = self.get_read_options()
+        total_bytes = os.path.getsize(self.path)
+        parts: Dict[Any, List[pd.Series]] = {}   # Columna -> partes leídas, en orden
+        single = None   # Primer bloque, que se devuelve tal cual si es el único
+        rows_read = 0
+        
+        # En archivos comprimidos el progreso se mide sobre los bytes comprimidos consumidos
+        if self.compression:
+            handle = open_stream(self.path, self.compression)
+            position = lambda: handle.raw.compressed_position
+        else:
+            handle = open(self.path, 'rb')
+            position = handle.tell
+        
+        with handle:
+            reader = pd.read_csv(handle, chunksize=self.chunksize, **options)
+            try:
+                for chunk in reader:
+                    # Verificar cancelación entre bloques
+                    if self.cancel_event is not None and self.cancel_event.is_set():
+                        raise LoadCancelledError(f"Carga cancelada: {self.path}")
+                        
+                    if single is None and not parts:
+                        single = chunk
+                    else:
+                        # Copia por columna: la parte no retiene el bloque 2D de pandas del que procede
+                        if single is not None:
+                            parts = {column: [values.copy()] for column, values in single.items()}
+                            single = None
+                        for column, values in chunk.items():
+                            parts[column].append(values.copy())
+                    rows_read += len(chunk)
+                    del chunk
+                    
+                    # Informar progreso (la posición del archivo avanza por bloques de lectura)
+                    if self.progress_callback is not None:
+                        bytes_read = min(position(), total_bytes)
+                        self.progress_callback(rows_read, bytes_read, total_bytes)
+            finally:
+                reader.close()
+                
+        if single is not None:
+            return single
+        if not parts:
+            raise pd.errors.EmptyDataError("No columns to parse from file")
+            
+        # Ensamblar columna a columna liberando las partes de cada una al terminarla
+        columns = {}
+        for column in list(parts):
+            columns[column] = pd.concat(parts.pop(column), ignore_index=True)
+        return pd.DataFrame(columns, index=pd.RangeIndex(rows_read), copy=False)
+    
     def _select_file_dialog(self) -> None:
         """
         Mostrar diálogo de selección de archivo CSV.
@@ -106,7 +831,7 @@ class CSVLoader(DataLoader):
         # Mostrar diálogo de selección con filtros apropiados
         file_path = filedialog.askopenfilename(
             title="Selecciona un archivo CSV",
-            filetypes=[("CSV files", "*.csv"), ("Todos los archivos", "*.*")]
+            filetypes=[("CSV files", " ".join(CSV_FILE_PATTERNS)), ("Todos los archivos", "*.*")]
         )
         
         root.destroy()  # Limpiar recursos de Tkinter
@@ -180,12 +905,12 @@ class CSVLoader(DataLoader):
         df = self.get_data()
         return df.head(rows)
     
-    def detect_delimiter(self, sample_size: int = 1000) -> str:
+    def detect_delimiter(self, sample_size: int = FormatSniffer.SAMPLE_SIZE) -> str:
         """
         Detectar automáticamente el delimitador del archivo CSV.
         
-        Analiza una muestra del archivo para determinar el delimitador más probable
-        basándose en la frecuencia de caracteres separadores comunes.
+        Delega en FormatSniffer, que elige el delimitador que produce un número
+        de campos consistente en las filas de la muestra.
         
         Args:
             sample_size: Número de bytes a analizar para la detección
@@ -198,20 +923,8 @@ class CSVLoader(DataLoader):
             return ","  # Delimitador por defecto
             
         try:
-            # Leer muestra del archivo
-            with open(self.path, 'r', errors='ignore') as f:
-                sample = f.read(sample_size)
-                
-            # Contar frecuencia de delimitadores comunes
-            delimiters = {
-                ',': sample.count(','),
-                ';': sample.count(';'),
-                '\t': sample.count('\t'),
-                '|': sample.count('|')
-            }
-            
-            # Seleccionar el delimitador más frecuente
-            delimiter = max(delimiters, key=delimiters.get)
+            sample = read_head(self.path, sample_size)
+            delimiter = FormatSniffer.sniff_sample(sample, complete=len(sample) < sample_size)['sep']
             self.metadata["separator"] = delimiter
             logging.debug(f"Delimitador detectado: '{delimiter}'")
             return delimiter
@@ -220,9 +933,3 @@ class CSVLoader(DataLoader):
             # Fallback a delimitador por defecto en caso de error
             logging.warning(f"Error al detectar delimitador: {str(e)}")
             return ","
-
-            
-
-
-    
-    
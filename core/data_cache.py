@@ -0,0 +1,296 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Iterator, List
+
+import pandas as pd
+
+from core.columnar_cache import ColumnarCache
+
+
+def _default_budget() -> int:
+    """Presupuesto por defecto: la mitad de la memoria física (4 GiB si no puede consultarse)."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2
+    except (AttributeError, ValueError, OSError):
+        return 4 * 1024 ** 3
+
+
+def _is_arrow_backed(df: pd.DataFrame) -> bool:
+    """Indicar si alguna columna del DataFrame está respaldada por Arrow."""
+    arrow_dtype = getattr(pd, "ArrowDtype", None)
+    return arrow_dtype is not None and any(isinstance(dtype, arrow_dtype) for dtype in df.dtypes)
+
+
+class DataCache:
+    """
+    Cache en memoria de DataFrames con presupuesto de bytes y desalojo LRU.
+
+    Se usa como un diccionario (identificador -> DataFrame). Cada entrada se
+    mide una vez con memory_usage(deep=True) al guardarla; cuando el total
+    supera el presupuesto se desalojan los datasets usados hace más tiempo.
+    Con un ColumnarCache, los desalojados se vuelcan a disco en formato
+    Feather y se recuperan de forma transparente al volver a pedirlos.
+
+    Las filas añadidas al final de una entrada (append) se guardan aparte y
+    se unen al DataFrame la próxima vez que se pide, de modo que varios
+    bloques añadidos entre dos lecturas cuestan una sola concatenación.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, spill_cache: Optional[ColumnarCache] = None,
+                 on_evict: Optional[Callable[[str, bool], None]] = None,
+                 combine: Optional[Callable[[List[pd.DataFrame]], pd.DataFrame]] = None):
+        """
+        Inicializar el cache.
+
+        Args:
+            max_bytes: Memoria máxima para los DataFrames (por defecto, variable de entorno
+                PEARSONFLOW_MEMORY_BUDGET o la mitad de la memoria física)
+            spill_cache: Cache columnar donde volcar los datasets desalojados (None = descartarlos)
+            on_evict: Función llamada con (identificador, volcado a disco) tras cada desalojo
+            combine: Función que une un DataFrame con las filas añadidas
+                (por defecto pd.concat con índice continuo)
+        """
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("PEARSONFLOW_MEMORY_BUDGET", 0)) or _default_budget()
+        self.max_bytes = max_bytes
+        self.spill_cache = spill_cache
+        self.on_evict = on_evict
+        self.combine = combine or (lambda frames: pd.concat(frames, ignore_index=True))
+
+        self._entries: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._spilled: Dict[str, bool] = {}   # Identificador -> estaba respaldado por Arrow
+        self._appended: Dict[str, List[pd.DataFrame]] = {}   # Filas añadidas aún sin unir
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self.reloads = 0
+
+    @staticmethod
+    def measure(df: pd.DataFrame) -> int:
+        """
+        Medir la memoria ocupada por un DataFrame, incluido el contenido de los textos.
+
+        Args:
+            df: DataFrame a medir
+
+        Returns:
+            int: Bytes ocupados
+        """
+        return int(df.memory_usage(deep=True).sum())
+
+    def put(self, key: str, df: pd.DataFrame, nbytes: Optional[int] = None) -> None:
+        """
+        Guardar un DataFrame como entrada más reciente y aplicar el presupuesto.
+
+        Args:
+            key: Identificador del dataset
+            df: DataFrame a guardar
+            nbytes: Tamaño ya conocido (evita volver a medir, p. ej. al añadir filas)
+        """
+        size = self.measure(df) if nbytes is None else nbytes
+        with self._lock:
+            self._remove_resident(key)
+            self._discard_spill(key)
+            self._entries[key] = df
+            self._sizes[key] = size
+            self._total_bytes += size
+            self._enforce_budget(keep=key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Obtener un DataFrame, recuperándolo del disco si fue volcado.
+
+        Args:
+            key: Identificador del dataset
+            default: Valor devuelto si el dataset no está en el cache
+
+        Returns:
+            Any: DataFrame cacheado o default
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._consolidate(key)
+
+            self.misses += 1
+            if key not in self._spilled:
+                return default
+
+            arrow_backed = self._spilled.pop(key)
+            df = self.spill_cache.load_spill(key, arrow_backed=arrow_backed)
+            self.spill_cache.discard_spill(key)
+            if df is None:
+                return default
+
+            self.reloads += 1
+            logging.info(f"Dataset recuperado del volcado en disco: {key}")
+            self.put(key, df)
+            return df
+
+    def append(self, key: str, rows: pd.DataFrame, nbytes: Optional[int] = None) -> None:
+        """
+        Añadir filas al final de una entrada sin copiar el DataFrame guardado.
+
+        Las filas se unen al DataFrame la próxima vez que se pida la entrada.
+
+        Args:
+            key: Identificador del dataset
+            rows: Filas nuevas (mismas columnas que el dataset)
+            nbytes: Tamaño ya conocido de las filas (evita volver a medirlas)
+
+        Raises:
+            KeyError: Si el dataset no está en el cache
+        """
+        size = self.measure(rows) if nbytes is None else nbytes
+        with self._lock:
+            if key not in self._entries and self.get(key) is None:
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self._appended.setdefault(key, []).append(rows)
+            self._sizes[key] += size
+            self._total_bytes += size
+            self._enforce_budget(keep=key)
+
+    def _consolidate(self, key: str) -> pd.DataFrame:
+        """Unir a una entrada residente las filas añadidas pendientes y devolverla."""
+        appended = self._appended.pop(key, None)
+        if appended:
+            self._entries[key] = self.combine([self._entries[key]] + appended)
+        return self._entries[key]
+
+    def is_resident(self, key: str) -> bool:
+        """Indicar si una entrada está en memoria (no cuenta las volcadas a disco)."""
+        with self._lock:
+            return key in self._entries
+
+    def nbytes(self, key: str) -> int:
+        """Tamaño medido de una entrada residente (0 si no está en memoria)."""
+        return self._sizes.get(key, 0)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Eliminar una entrada (en memoria o volcada) y devolver su DataFrame residente."""
+        with self._lock:
+            if key in self._entries:
+                self._consolidate(key)
+            df = self._remove_resident(key)
+            self._discard_spill(key)
+            return default if df is None else df
+
+    def clear(self) -> None:
+        """Vaciar el cache y borrar los volcados en disco."""
+        with self._lock:
+            for key in list(self._spilled):
+                self._discard_spill(key)
+            self._entries.clear()
+            self._appended.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtener los contadores de uso del cache.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, desalojos, volcados, recuperaciones y ocupación
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'spills': self.spills,
+                'reloads': self.reloads,
+                'resident': len(self._entries),
+                'spilled': len(self._spilled),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def _remove_resident(self, key: str) -> Optional[pd.DataFrame]:
+        """Quitar una entrada de memoria (y sus filas añadidas) actualizando la ocupación."""
+        self._appended.pop(key, None)
+        df = self._entries.pop(key, None)
+        self._total_bytes -= self._sizes.pop(key, 0)
+        return df
+
+    def _discard_spill(self, key: str) -> None:
+        """Olvidar y borrar el volcado en disco de una entrada."""
+        if self._spilled.pop(key, None) is not None:
+            self.spill_cache.discard_spill(key)
+
+    def _enforce_budget(self, keep: str) -> None:
+        """Desalojar entradas antiguas hasta respetar el presupuesto (nunca la indicada)."""
+        while self._total_bytes > self.max_bytes:
+            key = next((candidate for candidate in self._entries if candidate != keep), None)
+            if key is None:
+                # Un único dataset mayor que el presupuesto se conserva igualmente
+                break
+            self._evict(key)
+
+    def _evict(self, key: str) -> None:
+        """Desalojar una entrada, volcándola a disco si hay cache columnar."""
+        size = self._sizes.get(key, 0)
+        # El volcado debe incluir las filas añadidas aún sin unir
+        self._consolidate(key)
+        df = self._remove_resident(key)
+        self.evictions += 1
+
+        spilled = False
+        if self.spill_cache is not None and df is not None:
+            spilled = self.spill_cache.store_spill(key, df)
+            if spilled:
+                self._spilled[key] = _is_arrow_backed(df)
+                self.spills += 1
+
+        logging.info(f"Dataset desalojado de memoria ({size / 1024 ** 2:.1f} MB"
+                     f"{', volcado a disco' if spilled else ''}): {key}")
+        if self.on_evict:
+            try:
+                self.on_evict(key, spilled)
+            except Exception as e:
+                logging.warning(f"Error al notificar el desalojo de {key}: {str(e)}")
+
+    # Interfaz de diccionario usada por DataRepository
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        df = self.get(key)
+        if df is None:
+            raise KeyError(key)
+        return df
+
+    def __setitem__(self, key: str, df: pd.DataFrame) -> None:
+        self.put(key, df)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.pop(key)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+            if key not in self._spilled:
+                return False
+            # Un dataset volcado sigue disponible mientras su archivo exista: se recupera al pedirlo
+            if self.spill_cache.has_spill(key):
+                return True
+            logging.warning(f"El volcado en disco del dataset {key} ya no existe")
+            del self._spilled[key]
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries) + list(self._spilled))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries) + len(self._spilled)
@@ -1,8 +1,14 @@
 from abc import ABC, abstractmethod
 import pandas as pd
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, List
 import logging
 
+
+class LoadCancelledError(Exception):
+    """Excepción lanzada cuando se cancela una carga de datos en curso."""
+    pass
+
+
 class DataLoader(ABC):
     """
     Clase base abstracta para cargar datos desde diferentes fuentes usando patrón Template Method.
@@ -21,6 +27,7 @@ class DataLoader(ABC):
         """
         self.path = path
         self._dataframe: Optional[pd.DataFrame] = None  # Cache del DataFrame cargado
+        self._is_partial = False                        # True si solo hay columnas proyectadas
         self.metadata: Dict[str, Any] = {}              # Metadatos de la fuente de datos
     
     @abstractmethod
@@ -39,30 +46,66 @@ class DataLoader(ABC):
         """
         pass
 
-    def get_data(self) -> pd.DataFrame:
+    def load_columns(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Cargar únicamente un subconjunto de columnas desde la fuente.
+        
+        La implementación por defecto carga todo y proyecta; las clases
+        derivadas pueden sobrescribirla para leer solo lo necesario.
+        
+        Args:
+            columns: Nombres de las columnas a cargar
+            
+        Returns:
+            pd.DataFrame: DataFrame con las columnas solicitadas
+        """
+        return self.load()[columns]
+
+    def get_data(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Obtener el DataFrame cargado con lazy loading automático.
         
         Si los datos aún no han sido cargados, se ejecuta el método load()
-        automáticamente y se almacena el resultado en cache.
+        automáticamente y se almacena el resultado en cache. Si se indica
+        una proyección, solo se cargan las columnas que aún no estén en memoria.
         
+        Args:
+            columns: Columnas requeridas (None = todas las columnas)
+            
         Returns:
             pd.DataFrame: DataFrame con los datos
             
         Raises:
             ValueError: Si no se han podido cargar los datos
         """
-        # Implementar lazy loading: cargar solo cuando se necesite
-        if self._dataframe is None:
-            try:
-                logging.debug(f"Cargando datos desde: {self.path}")
-                self._dataframe = self.load()
-            except Exception as e:
-                error_msg = f"Error al cargar los datos: {str(e)}"
-                logging.error(error_msg)
-                raise ValueError(error_msg)
+        try:
+            # Implementar lazy loading: cargar solo cuando se necesite
+            if columns is None:
+                if self._dataframe is None or self._is_partial:
+                    logging.debug(f"Cargando datos desde: {self.path}")
+                    self._dataframe = self.load()
+                    self._is_partial = False
+                return self._dataframe
                 
-        return self._dataframe
+            # Cargar solo las columnas proyectadas que falten
+            if self._dataframe is None:
+                self._dataframe = self.load_columns(list(columns))
+                self._is_partial = True
+            elif self._is_partial:
+                missing = [col for col in columns if col not in self._dataframe.columns]
+                if missing:
+                    extra = self.load_columns(missing)
+                    self._dataframe = pd.concat([self._dataframe, extra], axis=1)
+                    
+            return self._dataframe[list(columns)]
+            
+        except LoadCancelledError:
+            # La cancelación no es un error de datos: propagarla tal cual
+            raise
+        except Exception as e:
+            error_msg = f"Error al cargar los datos: {str(e)}"
+            logging.error(error_msg)
+            raise ValueError(error_msg)
     
     def get_metadata(self) -> Dict[str, Any]:
         """
@@ -82,6 +125,7 @@ class DataLoader(ABC):
         """
         self.path = path
         self._dataframe = None  # Invalidar cache para forzar recarga
+        self._is_partial = False
         logging.debug(f"Ruta actualizada a: {path}")
         
     def get_path(self) -> str:
@@ -1,127 +1,1780 @@
 import pandas as pd
-from typing import Dict, List, Optional, Union, Tuple, Any
+import numpy as np
+from typing import Dict, List, Optional, Union, Tuple, Any, Callable
 import logging
+import threading
+import itertools
+from collections import deque
 from utils.csv_validator import ValidatorCSV
+from utils.dtype_optimizer import get_numeric_columns, to_numpy_backed
+from utils.datetime_utils import materialize_datetimes, epoch_view, is_datetime_like
+from utils.column_stats import ColumnStatistics
+from utils.aggregate_pyramid import AggregatePyramid
+from utils.sorted_index import SortedIndex
+from utils.rw_lock import ReadWriteLock
 import os
+from core.columnar_cache import ColumnarCache
+from core.data_cache import DataCache
+from core.csv_loader import CSVLoader, ProgressCallback, ARROW_ENGINE
+from core.data_loader import LoadCancelledError
 from core.mongo_loader import MongoDBLoader
+from core.multi_csv_loader import MultiCSVLoader
+from core.query import Query, QueryPlan
 
 class DataRepository:
     """
     Repositorio para acceso centralizado a datos.
     Implementa el patrón Repository para abstraer el acceso a diferentes fuentes de datos.
+    
+    Las ventanas y puntos de entrada de la aplicación comparten una única
+    instancia (get_shared_instance), de modo que cada dataset se parsea una
+    sola vez por sesión y se pasa entre ventanas por su identificador.
+    
+    El catálogo admite varios hilos: las lecturas se hacen en paralelo y las
+    modificaciones de uno en uno (ReadWriteLock). El parseo y el cálculo de
+    índices se hacen fuera del cerrojo y solo la publicación del resultado
+    excluye a los lectores. Los DataFrames publicados nunca se modifican en
+    su sitio: las filas nuevas producen otro DataFrame y las columnas nuevas
+    o sustituidas, una copia superficial con solo esas columnas cambiadas.
+    Los recortes que se entregan (cola, vista previa, rangos) son vistas de
+    los datos cacheados y deben tratarse como de solo lectura; quien necesite
+    modificarlos debe copiarlos antes. No se activa copy-on-write de forma
+    global, porque en pandas 1.5 es experimental y afectaría a todo el proceso.
+    
+    Cada DataFrame publicado es una versión del dataset con un número único
+    (get_version). Los cambios de valores (update_columns) crean una versión
+    que comparte con la anterior todas las columnas no modificadas; los
+    índices derivados se invalidan solo para esas columnas y quien guarde
+    resultados propios puede preguntar qué cambió (changed_columns).
     """
     
-    def __init__(self):
-        """Inicializar el repositorio de datos."""
-        self.cached_data = {}  # Cache de DataFrames indexado por identificador único
-        self.validators = {}   # Validadores CSV indexados por identificador
-        self.mongo_loader = None  # Instancia reutilizable del cargador MongoDB
+    _shared_instance: Optional["DataRepository"] = None
+    _shared_lock = threading.Lock()
+    
+    # Cambios recientes recordados por dataset para responder changed_columns
+    VERSION_LOG_LENGTH = 64
+    
+    @classmethod
+    def get_shared_instance(cls) -> "DataRepository":
+        """
+        Obtener el catálogo de datasets compartido por todo el proceso.
+        
+        Returns:
+            DataRepository: Instancia única, creada en la primera llamada
+        """
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+    
+    def __init__(self, max_memory_bytes: Optional[int] = None, spill_to_disk: bool = True):
+        """
+        Inicializar el repositorio de datos.
+        
+        Args:
+            max_memory_bytes: Memoria máxima para los datasets cacheados (None = presupuesto por defecto)
+            spill_to_disk: Volcar al cache columnar los datasets desalojados en vez de descartarlos
+        """
+        self.validators = {}   # Validadores CSV indexados por identificador
+        self.file_signatures = {}  # Identidad (mtime, tamaño, inodo) de cada CSV cacheado
+        self.dtype_profiles = {}   # Perfil de tipos con el que se cargó cada CSV
+        self.dtype_reports = {}    # Reporte de optimización de tipos por identificador
+        self.parse_engines = {}    # Motor de parseo ('c' o 'arrow') de cada CSV
+        self.shard_files = {}      # Archivos que componen cada dataset fragmentado
+        self.projections = {}      # Esquema completo de los datasets cargados solo en parte
+        self.mongo_sources = {}    # Parámetros de consulta de cada dataset MongoDB
+        self.tail_cache = {}       # Últimas filas leídas desde el final: ruta -> (firma, filas, DataFrame, perfil)
+        self.follow_offsets = {}   # Archivos en seguimiento: ruta -> (bytes consumidos, inodo)
+        self.datetime_formats = {} # Formato de fecha inferido por columna (None = no es fecha)
+        self.epoch_views = {}      # Vistas int64 de columnas de fecha: id -> (versión, columnas)
+        self.column_stats = {}     # Índice de estadísticas por columna de cada dataset
+        self.aggregate_pyramids = {}  # Agregados multirresolución para el zoom de cada dataset
+        self.sorted_indexes = {}   # Índices ordenados por columna X: id -> {columna: SortedIndex}
+        self.dataset_versions = {} # Versión vigente de cada dataset (cambia con cada DataFrame publicado)
+        self.version_log = {}      # Cambios recientes: id -> [(versión, columnas cambiadas o None = todas)]
+        self._version_counter = itertools.count(1)  # Versiones únicas en todo el catálogo
+        self._evicted = deque()    # Datasets desalojados cuyas estructuras derivadas faltan por liberar
+        self.update_listeners: List[Callable[[str, int], None]] = []  # Avisos de filas nuevas
+        self._lock = ReadWriteLock()  # Lecturas concurrentes y escrituras serializadas del catálogo
+        self.mongo_loader = None  # Instancia reutilizable del cargador MongoDB
+        self._mongo_lock = threading.RLock()  # Serializa el uso de la conexión MongoDB compartida
+        
+        # Precarga especulativa en segundo plano (una carga en curso y, como mucho, una pendiente)
+        self._prefetch_condition = threading.Condition()
+        self._prefetch_pending: Optional[Tuple[str, Callable[[], Any]]] = None
+        self._prefetch_running: Optional[str] = None
+        self._prefetch_thread: Optional[threading.Thread] = None
+        
+        # Cache columnar en disco para evitar reparsear CSV entre sesiones
+        self.columnar_cache = ColumnarCache() if ColumnarCache.is_available() else None
+        
+        # Cache de DataFrames indexado por identificador único, con presupuesto de memoria LRU
+        self.cached_data = DataCache(max_memory_bytes,
+                                     spill_cache=self.columnar_cache if spill_to_disk else None,
+                                     on_evict=self._on_evict,
+                                     combine=MultiCSVLoader.concat_frames)
+        
+    def load_csv(self, file_path: str, chunksize: Optional[int] = None,
+                progress_callback: Optional[ProgressCallback] = None,
+                cancel_event: Optional[threading.Event] = None,
+                dtype_profile: Optional[str] = None,
+                columns: Optional[List[str]] = None,
+                engine: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Cargar datos desde un archivo CSV con cache automático.
+        
+        Si la ruta es un directorio o un patrón glob, se carga como dataset
+        fragmentado mediante load_csv_shards. Si se indica una proyección de
+        columnas, solo se leen del archivo las columnas que aún no estén en cache.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            chunksize: Filas por bloque para carga progresiva (None = lectura en un solo paso)
+            progress_callback: Función llamada con (filas, bytes leídos, bytes totales) tras cada bloque
+            cancel_event: Evento que cancela la carga progresiva al activarse
+            dtype_profile: Perfil de reducción de tipos (p. ej. 'compact'); None conserva los tipos de pandas
+            columns: Columnas requeridas (None = todas las columnas)
+            engine: Motor de parseo: 'c' (pandas) o 'arrow' (pyarrow multihilo);
+                None conserva el usado en la carga anterior del archivo
+            
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame con los datos y metadatos
+            
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+            pd.errors.EmptyDataError: Si el archivo está vacío
+            pd.errors.ParserError: Si el formato del archivo es inválido
+            LoadCancelledError: Si la carga se cancela mediante cancel_event
+        """
+        # Si el archivo se está precargando, esperar y reutilizar el resultado
+        self.wait_for_prefetch(file_path)
+        engine = engine or self.parse_engines.get(file_path, "c")
+        
+        # Delegar directorios y patrones glob al cargador de fragmentos
+        if MultiCSVLoader.is_shard_pattern(file_path):
+            df, metadata = self.load_csv_shards(file_path, dtype_profile=dtype_profile, engine=engine)
+            return (df if columns is None else df[list(columns)]), metadata
+            
+        # Validar existencia del archivo
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"El archivo {file_path} no existe")
+            
+        # Cargar solo las columnas solicitadas
+        if columns is not None:
+            return self._load_csv_columns(file_path, list(columns), dtype_profile, engine)
+            
+        try:
+            # Verificar cache antes de cargar (solo si el archivo no cambió en disco)
+            signature = self._get_file_signature(file_path)
+            with self._lock.read():
+                cached = (self.cached_data[file_path]
+                          if (file_path in self.cached_data and self.file_signatures.get(file_path) == signature
+                              and self.dtype_profiles.get(file_path) == dtype_profile
+                              and self.parse_engines.get(file_path, "c") == engine
+                              and file_path not in self.projections) else None)
+            if cached is not None:
+                logging.debug(f"Datos cargados desde cache: {file_path}")
+                return cached, self._get_metadata(file_path)
+                
+            # Intentar recuperar la versión ya parseada desde el cache columnar
+            cache_variant = self._cache_variant(dtype_profile, engine)
+            df = (self.columnar_cache.load(file_path, cache_variant, arrow_backed=self._is_arrow_backed(dtype_profile, engine))
+                  if self.columnar_cache else None)
+            dtype_report = {}
+            
+            if df is None:
+                # Cargar archivo CSV
+                logging.info(f"Cargando archivo CSV: {file_path}")
+                loader = CSVLoader(file_path, chunksize=chunksize,
+                                   progress_callback=progress_callback,
+                                   cancel_event=cancel_event,
+                                   dtype_profile=dtype_profile,
+                                   engine=engine)
+                df = self._materialize_datetimes(file_path, loader.parse())
+                dtype_report = loader.dtype_report
+                
+                # Guardar el resultado para las próximas aperturas
+                if self.columnar_cache:
+                    self.columnar_cache.store(file_path, df, cache_variant)
+            else:
+                # Entradas escritas antes de materializar fechas pueden traerlas como texto
+                df = self._materialize_datetimes(file_path, df)
+            
+            # Almacenar en cache junto con la versión del archivo leída
+            with self._lock.write():
+                self.cached_data[file_path] = df
+                self.column_stats.pop(file_path, None)
+                self.aggregate_pyramids.pop(file_path, None)
+                self.sorted_indexes.pop(file_path, None)
+                self.file_signatures[file_path] = signature
+                self.dtype_profiles[file_path] = dtype_profile
+                self.dtype_reports[file_path] = dtype_report
+                self.parse_engines[file_path] = engine
+                self.projections.pop(file_path, None)
+                self._publish_version(file_path)
+                
+                # Crear validador para este dataset
+                self.validators[file_path] = ValidatorCSV(df)
+            
+            logging.info(f"CSV cargado exitosamente: {len(df)} filas, {len(df.columns)} columnas")
+            return df, self._get_metadata(file_path)
+            
+        except pd.errors.EmptyDataError:
+            raise pd.errors.EmptyDataError("El archivo CSV está vacío")
+        except pd.errors.ParserError:
+            raise pd.errors.ParserError("Formato de archivo CSV inválido")
+        except LoadCancelledError:
+            logging.info(f"Carga cancelada: {file_path}")
+            raise
+        except Exception as e:
+            logging.error(f"Error al cargar el archivo {file_path}: {str(e)}")
+            raise
+    
+    def load_csv_tail(self, file_path: str, n_rows: int,
+                      dtype_profile: Optional[str] = None) -> pd.DataFrame:
+        """
+        Obtener las últimas filas de un CSV leyendo solo el final del archivo.
+        
+        Si el archivo ya está cargado completo se recorta el DataFrame cacheado;
+        si no, se leen únicamente los bytes necesarios y el resultado se guarda
+        mientras el archivo no cambie en disco.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            n_rows: Número de filas finales requeridas
+            dtype_profile: Perfil de reducción de tipos
+            
+        Returns:
+            pd.DataFrame: Últimas n_rows filas del archivo
+            
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+            ValueError: Si el archivo no puede leerse desde el final
+        """
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"El archivo {file_path} no existe")
+            
+        self.wait_for_prefetch(file_path)
+        signature = self._get_file_signature(file_path)
+        
+        with self._lock.read():
+            # Reutilizar el dataset completo si está cargado y vigente
+            if (file_path in self.cached_data and file_path not in self.projections
+                    and self.file_signatures.get(file_path) == signature):
+                df = self.cached_data[file_path]
+                return df.iloc[max(len(df) - n_rows, 0):]
+                
+            cached = self.tail_cache.get(file_path)
+            if cached and cached[0] == signature and cached[1] >= n_rows and cached[3] == dtype_profile:
+                return cached[2].iloc[max(len(cached[2]) - n_rows, 0):]
+            engine = self.parse_engines.get(file_path, "c")
+            
+        loader = CSVLoader(file_path, dtype_profile=dtype_profile, engine=engine)
+        if not loader.supports_byte_seeking():
+            df, _ = self.load_csv(file_path, dtype_profile=dtype_profile)
+            return df.iloc[max(len(df) - n_rows, 0):]
+            
+        try:
+            df = loader.read_tail(n_rows)
+        except pd.errors.EmptyDataError:
+            raise ValueError(f"El archivo CSV está vacío: {file_path}")
+        except pd.errors.ParserError as e:
+            raise ValueError(f"Error al analizar el final del archivo CSV: {str(e)}")
+            
+        df = self._materialize_datetimes(file_path, df)
+        with self._lock.write():
+            self.tail_cache[file_path] = (signature, n_rows, df, dtype_profile)
+        logging.info(f"Últimas {len(df)} filas leídas desde el final de: {file_path}")
+        return df
+    
+    def start_following(self, file_path: str) -> None:
+        """
+        Activar el seguimiento de un CSV al que se añaden filas continuamente.
+        
+        A partir de aquí refresh_followed solo parsea los bytes añadidos tras
+        la última lectura. Si el archivo no está cargado se carga completo.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            
+        Raises:
+            ValueError: Si el archivo no admite lecturas por posición de bytes
+        """
+        if not CSVLoader(file_path).supports_byte_seeking():
+            raise ValueError(f"El archivo {file_path} no admite el modo de seguimiento")
+            
+        with self._lock.read():
+            if file_path in self.cached_data:
+                signature = self.file_signatures[file_path]
+            elif file_path in self.tail_cache:
+                signature = self.tail_cache[file_path][0]
+            else:
+                signature = None
+        if signature is None:
+            self.load_csv(file_path)
+            signature = self.file_signatures[file_path]
+            
+        offset = self._exclude_partial_record(file_path, signature)
+        with self._lock.write():
+            self.follow_offsets[file_path] = (offset, signature[2])
+        logging.info(f"Seguimiento activado para {file_path} desde el byte {offset}")
+    
+    def _exclude_partial_record(self, file_path: str, signature: Tuple[int, int, int]) -> int:
+        """
+        Dejar fuera de los datos leídos un último registro a medio escribir del archivo.
+        
+        Una lectura completa incluye la última línea aunque aún no termine en
+        salto de línea; si después se siguiera desde el final del archivo, el
+        resto de ese registro se leería como una fila nueva y la fila parcial
+        quedaría duplicada. Se quita la fila del dataset (y de la cola leída)
+        y el seguimiento empieza donde comienza el registro.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            signature: Firma del archivo con la que se leyeron los datos
+            
+        Returns:
+            int: Byte desde el que seguir el archivo
+        """
+        with self._lock.read():
+            dtype_profile = self.dtype_profiles.get(file_path)
+            engine = self.parse_engines.get(file_path, "c")
+        start = CSVLoader(file_path, dtype_profile=dtype_profile,
+                          engine=engine).partial_record_start(size=signature[1])
+        if start is None:
+            return signature[1]
+            
+        with self._lock.write():
+            df = self.cached_data.get(file_path) if self.file_signatures.get(file_path) == signature else None
+            if df is not None and len(df):
+                df = df.iloc[:-1]
+                self.cached_data.put(file_path, df)
+                self.column_stats.pop(file_path, None)
+                self.aggregate_pyramids.pop(file_path, None)
+                self.sorted_indexes.pop(file_path, None)
+                self.validators.pop(file_path, None)
+                self._publish_version(file_path)
+            if file_path in self.tail_cache and self.tail_cache[file_path][0] == signature:
+                tail_signature, n_rows, tail, profile = self.tail_cache[file_path]
+                self.tail_cache[file_path] = (tail_signature, n_rows, tail.iloc[:-1], profile)
+        logging.info(f"Registro a medio escribir al final de {file_path}: se leerá al completarse")
+        return start
+    
+    def stop_following(self, file_path: str) -> None:
+        """
+        Desactivar el seguimiento de un archivo.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+        """
+        with self._lock.write():
+            self.follow_offsets.pop(file_path, None)
+    
+    def refresh_followed(self, file_path: str) -> int:
+        """
+        Incorporar al dataset las filas añadidas al archivo desde la última lectura.
+        
+        El coste depende solo de los bytes nuevos. Si el archivo se truncó o se
+        reemplazó por otro, se vuelve a cargar completo.
+        
+        Args:
+            file_path: Ruta al archivo CSV en seguimiento
+            
+        Returns:
+            int: Número de filas nuevas incorporadas
+            
+        Raises:
+            ValueError: Si el archivo no está en seguimiento
+        """
+        with self._lock.read():
+            if file_path not in self.follow_offsets:
+                raise ValueError(f"El archivo '{file_path}' no está en seguimiento")
+            offset, inode = self.follow_offsets[file_path]
+        signature = self._get_file_signature(file_path)
+        
+        # Archivo rotado o truncado: no se puede continuar desde la posición anterior
+        if signature[2] != inode or signature[1] < offset:
+            logging.info(f"El archivo {file_path} fue reemplazado, recargando completo")
+            dtype_profile = self.dtype_profiles.get(file_path)
+            self.clear_cache(file_path)
+            self.load_csv(file_path, dtype_profile=dtype_profile)
+            offset = self._exclude_partial_record(file_path, self.file_signatures[file_path])
+            with self._lock.write():
+                self.follow_offsets[file_path] = (offset, signature[2])
+                rows = len(self.cached_data[file_path])
+            self._notify_update(file_path, rows)
+            return rows
+            
+        if signature[1] == offset:
+            return 0
+            
+        with self._lock.read():
+            current = self.cached_data.get(file_path)
+            dtype_profile = self.dtype_profiles.get(file_path)
+            if current is None and file_path in self.tail_cache:
+                dtype_profile = self.tail_cache[file_path][3]
+            partial = file_path in self.projections
+            engine = self.parse_engines.get(file_path, "c")
+        
+        # En datasets parciales solo se leen las columnas ya presentes en memoria
+        columns = list(current.columns) if current is not None and partial else None
+        loader = CSVLoader(file_path, dtype_profile=dtype_profile, engine=engine)
+        new_rows, new_offset = loader.read_appended(offset, columns)
+        
+        if not new_rows.empty:
+            # Convertir las fechas con los formatos ya inferidos para que los tipos coincidan
+            new_rows = self._materialize_datetimes(file_path, new_rows)
+        
+        # La firma solo se actualiza si no quedó un registro a medio escribir
+        consumed = new_offset == signature[1]
+        
+        with self._lock.write():
+            # Otro hilo ya incorporó estas filas
+            if self.follow_offsets.get(file_path) != (offset, inode):
+                return 0
+            self.follow_offsets[file_path] = (new_offset, inode)
+            
+            if new_rows.empty:
+                return 0
+                
+            if current is not None and file_path in self.cached_data:
+                # Las filas nuevas se guardan aparte y el cache las une al DataFrame cuando
+                # se vuelve a pedir: sin copiar el dataset completo en cada refresco
+                self.cached_data.append(file_path, new_rows, nbytes=DataCache.measure(new_rows))
+                
+                # Actualizar las estadísticas solo con las filas nuevas (los tipos resultantes
+                # de la unión se obtienen de una fila de cada parte)
+                stats = self.column_stats.get(file_path)
+                if stats is not None and stats.rows == len(current):
+                    stats.append(new_rows, MultiCSVLoader.concat_frames([current.iloc[-1:], new_rows.iloc[:1]]))
+                else:
+                    self.column_stats.pop(file_path, None)
+                # El validador guarda el DataFrame completo; se recrea al validar
+                self.validators.pop(file_path, None)
+                self._publish_version(file_path)
+                if consumed:
+                    self.file_signatures[file_path] = signature
+                    
+            if file_path in self.tail_cache:
+                tail_signature, n_rows, tail, profile = self.tail_cache[file_path]
+                tail = MultiCSVLoader.concat_frames([tail, new_rows]).tail(n_rows).reset_index(drop=True)
+                self.tail_cache[file_path] = (signature if consumed else tail_signature, n_rows, tail, profile)
+            
+        logging.debug(f"Seguimiento de {file_path}: {len(new_rows)} filas nuevas")
+        self._notify_update(file_path, len(new_rows))
+        return len(new_rows)
+    
+    def add_update_listener(self, callback: Callable[[str, int], None]) -> None:
+        """
+        Registrar una función que se llama cuando un dataset recibe filas nuevas.
+        
+        Args:
+            callback: Función que recibe (identificador, número de filas nuevas)
+        """
+        if callback not in self.update_listeners:
+            self.update_listeners.append(callback)
+    
+    def remove_update_listener(self, callback: Callable[[str, int], None]) -> None:
+        """
+        Eliminar una función registrada con add_update_listener.
+        
+        Args:
+            callback: Función a eliminar
+        """
+        if callback in self.update_listeners:
+            self.update_listeners.remove(callback)
+    
+    def _notify_update(self, identifier: str, new_rows: int) -> None:
+        """Avisar a los oyentes registrados de que un dataset cambió."""
+        for callback in list(self.update_listeners):
+            try:
+                callback(identifier, new_rows)
+            except Exception as e:
+                logging.warning(f"Error en oyente de actualización de {identifier}: {str(e)}")
+    
+    def _load_csv_columns(self, file_path: str, columns: List[str], dtype_profile: Optional[str] = None,
+                          engine: str = "c") -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Cargar bajo demanda un subconjunto de columnas de un archivo CSV.
+        
+        La primera vez se lee una muestra del archivo para conocer el esquema
+        completo; después solo se parsean (con usecols) las columnas que falten
+        en el DataFrame cacheado.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            columns: Columnas requeridas
+            dtype_profile: Perfil de reducción de tipos
+            engine: Motor de parseo ('c' o 'arrow')
+            
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame con las columnas pedidas y metadatos
+            
+        Raises:
+            ValueError: Si alguna columna no existe en el archivo
+        """
+        signature = self._get_file_signature(file_path)
+        with self._lock.read():
+            fresh = ((file_path in self.cached_data or file_path in self.projections)
+                     and self.file_signatures.get(file_path) == signature
+                     and self.dtype_profiles.get(file_path) == dtype_profile
+                     and self.parse_engines.get(file_path, "c") == engine)
+        
+        loader = CSVLoader(file_path, dtype_profile=dtype_profile, engine=engine)
+        
+        if not fresh:
+            # Descartar versiones anteriores y leer el esquema a partir de una muestra
+            projection = self._build_projection(loader.read_schema())
+            with self._lock.write():
+                self.clear_cache(file_path)
+                self.projections[file_path] = projection
+                self.file_signatures[file_path] = signature
+                self.dtype_profiles[file_path] = dtype_profile
+                self.dtype_reports[file_path] = {}
+                self.parse_engines[file_path] = engine
+                
+        with self._lock.read():
+            current = self.cached_data.get(file_path)
+            projection = self.projections.get(file_path)
+            
+        # Dataset ya cargado completo: basta con proyectar
+        if projection is None:
+            return current[columns], self._get_metadata(file_path)
+            
+        missing = [col for col in columns if current is None or col not in current.columns]
+        unknown = [col for col in missing if col not in projection['column_names']]
+        if unknown:
+            raise ValueError(f"Las columnas {unknown} no existen en el archivo {file_path}")
+            
+        if missing:
+            # Preferir el cache columnar, que lee solo las columnas pedidas
+            extra = None
+            if self.columnar_cache:
+                extra = self.columnar_cache.load(file_path, self._cache_variant(dtype_profile, engine), columns=missing,
+                                                 arrow_backed=self._is_arrow_backed(dtype_profile, engine))
+            if extra is None:
+                extra = loader.load_columns(missing)
+                with self._lock.write():
+                    self.dtype_reports.setdefault(file_path, {}).update(loader.dtype_report)
+            self._merge_projected(file_path, extra)
+            
+        # Sin columnas pedidas ni cargadas todavía: solo se ha leído el esquema
+        with self._lock.read():
+            df = self.cached_data.get(file_path, pd.DataFrame())
+        return df[columns], self._get_metadata(file_path)
+    
+    def _build_projection(self, sample: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Construir la descripción del esquema completo a partir de una muestra.
+        
+        Los tipos (y por tanto las columnas numéricas) son provisionales: una
+        columna puede cambiar de tipo más allá de la muestra. Se corrigen con
+        los tipos reales a medida que se cargan las columnas (_merge_projected).
+        
+        Args:
+            sample: Primeras filas del dataset con todas sus columnas
+            
+        Returns:
+            Dict[str, Any]: Columnas, tipos, columnas numéricas, columnas con el tipo
+            aún provisional y la propia muestra
+        """
+        return {
+            'column_names': list(sample.columns),
+            'numeric_columns': get_numeric_columns(sample),
+            'dtypes': {col: str(dtype) for col, dtype in sample.dtypes.items()},
+            'provisional': list(sample.columns),
+            'preview': sample
+        }
+    
+    def _merge_projected(self, identifier: str, extra: pd.DataFrame) -> None:
+        """
+        Añadir columnas recién cargadas al DataFrame parcial de un dataset.
+        
+        Args:
+            identifier: Identificador del dataset
+            extra: DataFrame con las columnas nuevas (mismas filas y orden)
+        """
+        extra = self._materialize_datetimes(identifier, extra)
+        
+        with self._lock.write():
+            # Otro hilo pudo cargar algunas de estas columnas mientras se leían
+            current = self.cached_data.get(identifier)
+            if current is not None:
+                extra = extra[[col for col in extra.columns if col not in current.columns]]
+                if extra.columns.empty:
+                    return
+            merged = extra if current is None else pd.concat([current, extra], axis=1)
+            
+            self.cached_data.put(identifier, merged,
+                                 nbytes=self.cached_data.nbytes(identifier) + DataCache.measure(extra))
+            if identifier in self.column_stats:
+                self.column_stats[identifier].add_columns(extra)
+            self.validators[identifier] = ValidatorCSV(merged)
+            self._publish_version(identifier, list(extra.columns))
+            
+            projection = self.projections.get(identifier)
+            if projection is not None:
+                # Si ya están todas las columnas, el dataset deja de ser parcial
+                if set(merged.columns) >= set(projection['column_names']):
+                    self.projections.pop(identifier, None)
+                else:
+                    self.projections[identifier] = self._correct_projection(projection, extra)
+            
+        logging.debug(f"Columnas en memoria para {identifier}: {list(merged.columns)}")
+    
+    @staticmethod
+    def _correct_projection(projection: Dict[str, Any], loaded: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Sustituir los tipos provisionales de la muestra por los de las columnas ya cargadas.
+        
+        Args:
+            projection: Esquema del dataset parcial
+            loaded: Columnas recién cargadas completas
+            
+        Returns:
+            Dict[str, Any]: Esquema nuevo (el anterior no se modifica: puede estar en uso)
+        """
+        loaded_numeric = set(get_numeric_columns(loaded))
+        return {
+            **projection,
+            'dtypes': {**projection['dtypes'], **{col: str(dtype) for col, dtype in loaded.dtypes.items()}},
+            'numeric_columns': [col for col in projection['column_names']
+                                if col in loaded_numeric
+                                or (col not in loaded.columns and col in projection['numeric_columns'])],
+            'provisional': [col for col in projection['provisional'] if col not in loaded.columns]
+        }
+    
+    def get_columns(self, identifier: str, columns: List[str]) -> pd.DataFrame:
+        """
+        Obtener columnas concretas de un dataset, cargándolas si hace falta.
+        
+        Args:
+            identifier: Identificador del dataset (ruta o identificador MongoDB)
+            columns: Columnas requeridas
+            
+        Returns:
+            pd.DataFrame: DataFrame con solo las columnas solicitadas
+            
+        Raises:
+            ValueError: Si el dataset no está cargado o alguna columna no existe
+        """
+        columns = list(columns)
+        
+        if identifier.startswith("mongodb://") and identifier in self.mongo_sources:
+            source = self.mongo_sources[identifier]
+            df, _ = self.load_from_mongodb(source['connection_string'], source['db_name'],
+                                           source['collection_name'], source['query'],
+                                           source['limit'], columns=columns, raw_bson=source.get('raw_bson'))
+            return df
+            
+        if not identifier.startswith("mongodb://") and (os.path.exists(identifier)
+                                                        or MultiCSVLoader.is_shard_pattern(identifier)):
+            df, _ = self.load_csv(identifier, dtype_profile=self.dtype_profiles.get(identifier),
+                                  columns=columns)
+            return df
+            
+        with self._lock.read():
+            if identifier not in self.cached_data:
+                raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            df = self.cached_data[identifier]
+        return df[columns]
+    
+    def get_preview(self, identifier: str, rows: int = 1000) -> pd.DataFrame:
+        """
+        Obtener las primeras filas de un dataset con todas sus columnas.
+        
+        Para datasets cargados parcialmente se usa la muestra del esquema,
+        evitando cargar columnas que no se van a graficar.
+        
+        Args:
+            identifier: Identificador del dataset
+            rows: Número máximo de filas
+            
+        Returns:
+            pd.DataFrame: Vista previa del dataset
+        """
+        with self._lock.read():
+            if identifier in self.projections:
+                return self.projections[identifier]['preview'].iloc[:rows]
+            return self.cached_data[identifier].iloc[:rows]
+    
+    def load_csv_shards(self, pattern: str, max_workers: Optional[int] = None,
+                        dtype_profile: Optional[str] = None,
+                        engine: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Cargar un dataset repartido en varios CSV como un único dataset cacheado.
+        
+        Los fragmentos se parsean en paralelo y el resultado se registra bajo
+        el propio patrón como identificador. El cache se invalida si cambia
+        cualquiera de los fragmentos o el conjunto de archivos.
+        
+        Args:
+            pattern: Directorio con archivos CSV o patrón glob
+            max_workers: Número máximo de procesos de parseo (por defecto, uno por núcleo)
+            dtype_profile: Perfil de reducción de tipos aplicado a cada fragmento
+            engine: Motor de parseo de cada fragmento (None = el de la carga anterior)
+            
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame combinado y metadatos
+            
+        Raises:
+            FileNotFoundError: Si el patrón no coincide con ningún archivo
+            ValueError: Si algún fragmento no puede parsearse
+        """
+        engine = engine or self.parse_engines.get(pattern, "c")
+        loader = MultiCSVLoader(pattern, max_workers=max_workers, dtype_profile=dtype_profile, engine=engine)
+        paths = loader.resolve_paths()
+        
+        # La firma combinada cubre altas, bajas y modificaciones de fragmentos
+        signature = tuple((path,) + self._get_file_signature(path) for path in paths)
+        with self._lock.read():
+            cached = (self.cached_data[pattern]
+                      if (pattern in self.cached_data and self.file_signatures.get(pattern) == signature
+                          and self.dtype_profiles.get(pattern) == dtype_profile
+                          and self.parse_engines.get(pattern, "c") == engine) else None)
+        if cached is not None:
+            logging.debug(f"Fragmentos cargados desde cache: {pattern}")
+            return cached, self._get_metadata(pattern)
+            
+        try:
+            df = self._materialize_datetimes(pattern, loader.load())
+            
+            # Registrar el dataset combinado bajo un único identificador
+            with self._lock.write():
+                self.cached_data[pattern] = df
+                self.column_stats.pop(pattern, None)
+                self.aggregate_pyramids.pop(pattern, None)
+                self.sorted_indexes.pop(pattern, None)
+                self.validators[pattern] = ValidatorCSV(df)
+                self.file_signatures[pattern] = signature
+                self.dtype_profiles[pattern] = dtype_profile
+                self.dtype_reports[pattern] = {}
+                self.parse_engines[pattern] = engine
+                self.shard_files[pattern] = paths
+                self._publish_version(pattern)
+            
+            return df, self._get_metadata(pattern)
+            
+        except Exception as e:
+            logging.error(f"Error al cargar los fragmentos {pattern}: {str(e)}")
+            raise
+    
+    def load_from_mongodb(self, connection_string: str, db_name: str, collection_name: str,
+                        query: Dict[str, Any] = None, limit: int = 0,
+                        columns: Optional[List[str]] = None,
+                        raw_bson: Optional[bool] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Cargar datos desde una colección de MongoDB con cache automático.
+        
+        Args:
+            connection_string: Cadena de conexión a MongoDB
+            db_name: Nombre de la base de datos
+            collection_name: Nombre de la colección
+            query: Filtro de consulta MongoDB (opcional)
+            limit: Límite de documentos a cargar (0 = sin límite)
+            columns: Campos requeridos; los que falten se piden con una proyección (None = todos)
+            raw_bson: Pedir lotes BSON sin decodificar y leerlos directamente a columnas
+                      (None = modo del cargador; ver MongoDBLoader.load_collection)
+            
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame con los datos y metadatos
+            
+        Raises:
+            ConnectionError: Si no se puede establecer conexión con MongoDB
+            RuntimeError: Si hay un error al cargar los datos
+        """
+        # Normalizar nombre de base de datos
+        db_name = self._normalize_mongo_db(db_name)
+        
+        # Crear identificador único para cache
+        conn_id = self._mongo_identifier(db_name, collection_name)
+        self.wait_for_prefetch(conn_id)
+        
+        with self._lock.write():
+            # Recordar los parámetros de consulta para cargas posteriores bajo demanda
+            self.mongo_sources[conn_id] = {
+                'connection_string': connection_string, 'db_name': db_name,
+                'collection_name': collection_name, 'query': query, 'limit': limit,
+                'raw_bson': raw_bson
+            }
+            
+            # Verificar cache antes de conectar
+            cached = (self.cached_data[conn_id]
+                      if conn_id in self.cached_data and conn_id not in self.projections else None)
+        if cached is not None:
+            logging.debug(f"Datos MongoDB cargados desde cache: {conn_id}")
+            return (cached if columns is None else cached[list(columns)]), self._get_metadata(conn_id)
+            
+        with self._mongo_lock:
+            try:
+                # Inicializar cargador MongoDB si es necesario
+                if self.mongo_loader is None:
+                    self.mongo_loader = MongoDBLoader()
+                
+                # Establecer conexión
+                logging.info(f"Conectando a MongoDB: {db_name}/{collection_name}")
+                if not self.mongo_loader.connect(connection_string, db_name):
+                    raise ConnectionError(f"No se pudo conectar a la base de datos MongoDB: {db_name}")
+                
+                if columns is not None:
+                    return self._load_mongodb_columns(conn_id, collection_name, query, limit, list(columns),
+                                                      raw_bson)
+                
+                # Cargar datos de la colección
+                df = self.mongo_loader.load_collection(collection_name, query, limit, raw_bson=raw_bson)
+                
+                # Validar que se cargaron datos
+                if df.empty:
+                    raise RuntimeError(f"La colección {collection_name} está vacía o no se encontraron documentos")
+                df = self._materialize_datetimes(conn_id, df)
+                
+                # Almacenar en cache
+                with self._lock.write():
+                    self.cached_data[conn_id] = df
+                    self.column_stats.pop(conn_id, None)
+                    self.aggregate_pyramids.pop(conn_id, None)
+                    self.sorted_indexes.pop(conn_id, None)
+                    self.projections.pop(conn_id, None)
+                    self._publish_version(conn_id)
+                    
+                    # Crear validador para este dataset
+                    self.validators[conn_id] = ValidatorCSV(df)
+                
+                logging.info(f"MongoDB cargado exitosamente: {len(df)} filas, {len(df.columns)} columnas")
+                return df, self._get_metadata(conn_id)
+                
+            except Exception as e:
+                logging.error(f"Error al cargar datos de MongoDB: {str(e)}")
+                raise
+    
+    def _load_mongodb_columns(self, conn_id: str, collection_name: str, query: Optional[Dict[str, Any]],
+                              limit: int, columns: List[str],
+                              raw_bson: Optional[bool] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Cargar bajo demanda un subconjunto de campos de una colección MongoDB.
+        
+        Los documentos se ordenan por _id en todas las consultas para que las
+        columnas cargadas en momentos distintos queden alineadas fila a fila.
+        
+        Args:
+            conn_id: Identificador del dataset MongoDB
+            collection_name: Nombre de la colección
+            query: Filtro de consulta MongoDB
+            limit: Límite de documentos (0 = sin límite)
+            columns: Campos requeridos
+            raw_bson: Leer los campos proyectados desde lotes BSON sin decodificar (None = modo del cargador)
+            
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame con los campos pedidos y metadatos
+        """
+        sort = [('_id', 1)]
+        
+        if conn_id not in self.cached_data:
+            # Conocer el esquema completo a partir de una muestra de documentos
+            sample = self.mongo_loader.load_collection(collection_name, query, 1000, sort=sort)
+            if sample.empty:
+                raise RuntimeError(f"La colección {collection_name} está vacía o no se encontraron documentos")
+            projection = self._build_projection(sample)
+            with self._lock.write():
+                self.projections[conn_id] = projection
+            
+        with self._lock.read():
+            current = self.cached_data.get(conn_id)
+        missing = [col for col in columns if current is None or col not in current.columns]
+        
+        if missing:
+            projection = {col: 1 for col in missing}
+            projection['_id'] = 0
+            extra = self.mongo_loader.load_collection(collection_name, query, limit,
+                                                      projection=projection, sort=sort, raw_bson=raw_bson)
+            
+            # Campos ausentes en todos los documentos: completar con nulos
+            extra = extra.reindex(columns=missing)
+            if current is not None and len(extra) != len(current):
+                raise RuntimeError(f"La colección {collection_name} cambió durante la carga por columnas")
+            self._merge_projected(conn_id, extra)
+            
+        with self._lock.read():
+            df = self.cached_data[conn_id]
+        return df[columns], self._get_metadata(conn_id)
+    
+    def load_csv_in_background(self, file_path: str,
+                               on_done: Callable[[Optional[Dict[str, Any]], Optional[Exception]], None],
+                               chunksize: Optional[int] = None,
+                               progress_callback: Optional[ProgressCallback] = None,
+                               cancel_event: Optional[threading.Event] = None) -> threading.Thread:
+        """
+        Cargar un CSV en el catálogo desde un hilo de trabajo, sin bloquear a quien lo pide.
+        
+        on_done y progress_callback se llaman desde el hilo de trabajo; una
+        interfaz gráfica debe reenviarlos a su propio hilo (p. ej. con after).
+        
+        Args:
+            file_path: Ruta al archivo CSV, directorio o patrón de fragmentos
+            on_done: Función llamada al terminar con (metadatos, None) o (None, excepción)
+            chunksize: Filas por bloque para carga progresiva (None = lectura en un solo paso)
+            progress_callback: Función llamada con (filas, bytes leídos, bytes totales) tras cada bloque
+            cancel_event: Evento que cancela la carga progresiva al activarse
+            
+        Returns:
+            threading.Thread: Hilo que ejecuta la carga (ya iniciado)
+        """
+        def task():
+            try:
+                _, metadata = self.load_csv(file_path, chunksize=chunksize,
+                                            progress_callback=progress_callback,
+                                            cancel_event=cancel_event)
+            except Exception as e:
+                on_done(None, e)
+                return
+            on_done(metadata, None)
+            
+        thread = threading.Thread(target=task, name="DataRepositoryLoad", daemon=True)
+        thread.start()
+        return thread
+    
+    def prefetch_mongodb(self, connection_string: str, db_name: str, collection_name: str,
+                         raw_bson: Optional[bool] = None) -> None:
+        """
+        Empezar a cargar una colección MongoDB en segundo plano antes de que se pida.
+        
+        Args:
+            connection_string: Cadena de conexión a MongoDB
+            db_name: Nombre de la base de datos
+            collection_name: Nombre de la colección
+            raw_bson: Leer lotes BSON sin decodificar (None = modo del cargador)
+        """
+        # Mismo identificador que calculará load_from_mongodb, para que la carga normal espere a esta
+        identifier = self._mongo_identifier(self._normalize_mongo_db(db_name), collection_name)
+        self._schedule_prefetch(identifier,
+                                lambda: self.load_from_mongodb(connection_string, db_name, collection_name,
+                                                               raw_bson=raw_bson))
+    
+    def _schedule_prefetch(self, identifier: str, task: Callable[[], Any]) -> None:
+        """
+        Encolar una precarga; sustituye a la pendiente, que el usuario ya dejó atrás.
+        
+        Args:
+            identifier: Identificador del dataset
+            task: Carga a ejecutar en el hilo de precarga
+        """
+        with self._prefetch_condition:
+            if identifier == self._prefetch_running:
+                return
+            self._prefetch_pending = (identifier, task)
+            if self._prefetch_thread is None:
+                self._prefetch_thread = threading.Thread(target=self._prefetch_worker,
+                                                         name="DataRepositoryPrefetch", daemon=True)
+                self._prefetch_thread.start()
+            self._prefetch_condition.notify_all()
+    
+    def _prefetch_worker(self) -> None:
+        """Ejecutar las precargas pendientes hasta vaciar la cola."""
+        while True:
+            with self._prefetch_condition:
+                if self._prefetch_pending is None:
+                    self._prefetch_thread = None
+                    return
+                identifier, task = self._prefetch_pending
+                self._prefetch_pending = None
+                self._prefetch_running = identifier
+                
+            try:
+                logging.info(f"Precargando dataset en segundo plano: {identifier}")
+                task()
+            except Exception as e:
+                # Una precarga fallida no es un error: la carga normal lo volverá a intentar
+                logging.info(f"Precarga descartada para {identifier}: {str(e)}")
+            finally:
+                with self._prefetch_condition:
+                    self._prefetch_running = None
+                    self._prefetch_condition.notify_all()
+    
+    def wait_for_prefetch(self, identifier: str, timeout: Optional[float] = None) -> bool:
+        """
+        Esperar a que termine la precarga de un dataset para no cargarlo dos veces.
+        
+        Si la precarga aún no había empezado se descarta: quien la espera va a
+        cargar el dataset de todos modos.
+        
+        Args:
+            identifier: Identificador del dataset
+            timeout: Segundos máximos de espera (None = sin límite)
+            
+        Returns:
+            bool: True si no queda ninguna precarga en curso para el dataset
+        """
+        with self._prefetch_condition:
+            if threading.current_thread() is self._prefetch_thread:
+                return True
+            if self._prefetch_pending is not None and self._prefetch_pending[0] == identifier:
+                self._prefetch_pending = None
+            return self._prefetch_condition.wait_for(lambda: self._prefetch_running != identifier, timeout)
+    
+    def _publish_version(self, identifier: str, changed: Optional[List[str]] = None) -> int:
+        """
+        Registrar una nueva versión del dataset (llamar con el cerrojo de escritura).
+        
+        Args:
+            identifier: Identificador del dataset
+            changed: Columnas cuyos valores cambiaron (None = todo el dataset, p. ej. recargas o filas nuevas)
+            
+        Returns:
+            int: Número de la nueva versión
+        """
+        self._release_evicted()
+        version = next(self._version_counter)
+        self.dataset_versions[identifier] = version
+        log = self.version_log.setdefault(identifier, [])
+        log.append((version, None if changed is None else frozenset(changed)))
+        del log[:-self.VERSION_LOG_LENGTH]
+        return version
+    
+    def get_version(self, identifier: str) -> int:
+        """
+        Obtener la versión vigente de un dataset.
+        
+        Args:
+            identifier: Identificador del dataset
+            
+        Returns:
+            int: Número de versión (0 si el dataset no está cargado)
+        """
+        with self._lock.read():
+            return self.dataset_versions.get(identifier, 0)
+    
+    def get_snapshot(self, identifier: str) -> Tuple[pd.DataFrame, int]:
+        """
+        Obtener el DataFrame vigente de un dataset junto con su versión.
+        
+        El DataFrame no cambia aunque después se publiquen versiones nuevas,
+        así que puede usarse sin cerrojo; conservarlo solo ocupa memoria por
+        las columnas que las versiones posteriores sustituyan.
+        
+        Args:
+            identifier: Identificador del dataset
+            
+        Returns:
+            Tuple[pd.DataFrame, int]: Datos y número de versión
+            
+        Raises:
+            ValueError: Si el dataset no está cargado
+        """
+        with self._lock.read():
+            if identifier not in self.cached_data:
+                raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            return self.cached_data[identifier], self.dataset_versions.get(identifier, 0)
+    
+    def changed_columns(self, identifier: str, since_version: int) -> Optional[List[str]]:
+        """
+        Indicar qué columnas cambiaron desde una versión anterior del dataset.
+        
+        Permite a gráficos, estadísticas o modelos calculados sobre una versión
+        saber si siguen valiendo sin comparar los datos.
+        
+        Args:
+            identifier: Identificador del dataset
+            since_version: Versión con la que se calculó el resultado
+            
+        Returns:
+            Optional[List[str]]: Columnas modificadas o añadidas ([] = ninguna); None si
+            cambió todo el dataset o la versión ya no está en el registro
+        """
+        with self._lock.read():
+            current = self.dataset_versions.get(identifier)
+            if current == since_version:
+                return []
+            log = self.version_log.get(identifier, [])
+            if current is None or not log or since_version < log[0][0]:
+                return None
+            changed = set()
+            for version, columns in log:
+                if version <= since_version:
+                    continue
+                if columns is None:
+                    return None
+                changed |= columns
+            return sorted(changed)
+    
+    def update_columns(self, identifier: str, values: Dict[str, pd.Series],
+                       expected_version: Optional[int] = None) -> int:
+        """
+        Publicar una versión del dataset con los valores de algunas columnas sustituidos.
+        
+        La versión nueva es una copia superficial de la anterior: comparte los
+        búferes de las columnas no modificadas y solo ocupa memoria nueva por las
+        sustituidas. Las estadísticas, índices ordenados y niveles de la pirámide
+        de agregados se descartan solo para esas columnas.
         
-    def load_csv(self, file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        Args:
+            identifier: Identificador del dataset
+            values: Nuevos valores por columna (mismas filas que el dataset)
+            expected_version: Versión sobre la que se calcularon los valores (None = no comprobar)
+            
+        Returns:
+            int: Número de la nueva versión
+            
+        Raises:
+            ValueError: Si el dataset no está cargado, cambió desde expected_version
+                o los valores no tienen las filas del dataset
         """
-        Cargar datos desde un archivo CSV con cache automático.
+        columns = list(values)
+        with self._lock.write():
+            if identifier not in self.cached_data:
+                raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            if expected_version is not None and self.dataset_versions.get(identifier) != expected_version:
+                raise ValueError(f"El dataset '{identifier}' cambió mientras se calculaban los valores nuevos")
+            current = self.cached_data[identifier]
+            for column, series in values.items():
+                if len(series) != len(current):
+                    raise ValueError(f"La columna '{column}' tiene {len(series)} filas y el dataset {len(current)}")
+                    
+            df = current.copy(deep=False)
+            replaced_bytes = 0
+            for column, series in values.items():
+                if column in current.columns:
+                    replaced_bytes += int(current[column].memory_usage(deep=True, index=False))
+                df[column] = series.set_axis(df.index) if isinstance(series, pd.Series) else series
+            added_bytes = sum(int(df[column].memory_usage(deep=True, index=False)) for column in columns)
+            self.cached_data.put(identifier, df,
+                                 nbytes=self.cached_data.nbytes(identifier) - replaced_bytes + added_bytes)
+            
+            # Invalidación precisa de los índices derivados
+            stats = self.column_stats.get(identifier)
+            if stats is not None:
+                stats.add_columns(df[columns])
+            indexes = self.sorted_indexes.get(identifier, {})
+            for column in columns:
+                indexes.pop(column, None)
+            pyramid = self.aggregate_pyramids.get(identifier)
+            if pyramid is not None:
+                if pyramid.x_column in columns:
+                    self.aggregate_pyramids.pop(identifier, None)
+                else:
+                    pyramid.discard(columns)
+            self.validators[identifier] = ValidatorCSV(df)
+            version = self._publish_version(identifier, columns)
+            
+        logging.debug(f"Versión {version} de {identifier}: columnas sustituidas {columns}")
+        return version
+    
+    def _on_evict(self, identifier: str, spilled: bool) -> None:
+        """
+        Liberar las estructuras que mantienen vivo un dataset desalojado de memoria.
         
         Args:
-            file_path: Ruta al archivo CSV
+            identifier: Identificador del dataset desalojado
+            spilled: Si el dataset se volcó a disco y puede recuperarse
+        """
+        # Se llama desde el cache con su cerrojo tomado, también durante lecturas que
+        # recuperan un dataset volcado: tomar aquí el cerrojo de escritura podría
+        # bloquearse, así que solo se anota y la liberación se hace en la siguiente
+        # escritura del catálogo (_release_evicted). Hasta entonces las estructuras
+        # siguen siendo coherentes; solo retienen memoria.
+        self._evicted.append(identifier)
+        
+    def _release_evicted(self) -> None:
+        """
+        Liberar las estructuras derivadas de los datasets desalojados (llamar con el cerrojo de escritura).
+        
+        Los datasets que volvieron a memoria desde el desalojo conservan las suyas.
+        """
+        while self._evicted:
+            identifier = self._evicted.popleft()
+            if self.cached_data.is_resident(identifier):
+                continue
+            # El validador guarda su propia copia del DataFrame; se recrea al validar
+            self.validators.pop(identifier, None)
+            self.epoch_views.pop(identifier, None)
+            self.aggregate_pyramids.pop(identifier, None)
+            self.sorted_indexes.pop(identifier, None)
+        
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Obtener los contadores del cache de datasets en memoria.
+        
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, desalojos, volcados, recuperaciones y ocupación en bytes
+        """
+        return self.cached_data.stats()
+    
+    def _materialize_datetimes(self, identifier: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convertir a datetime64[ns] las columnas de fecha de datos recién leídos.
+        
+        Los formatos se infieren una sola vez por dataset y se reutilizan en
+        recargas, columnas cargadas bajo demanda y filas añadidas en seguimiento.
+        
+        Args:
+            identifier: Identificador del dataset
+            df: DataFrame recién leído de la fuente
             
         Returns:
-            Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame con los datos y metadatos
+            pd.DataFrame: DataFrame con las fechas ya convertidas
+        """
+        with self._lock.read():
+            known = self.datetime_formats.get(identifier)
+        df, formats = materialize_datetimes(df, known)
+        with self._lock.write():
+            self.datetime_formats[identifier] = formats
+            self.epoch_views.pop(identifier, None)
+        return df
+    
+    def get_epoch_view(self, identifier: str, column: str) -> np.ndarray:
+        """
+        Obtener una columna de fechas como nanosegundos desde epoch (int64).
+        
+        La vista se calcula una vez por versión del DataFrame cacheado y se
+        reutiliza en cada refresco del gráfico; para columnas datetime64[ns]
+        comparte memoria con la columna original.
+        
+        Args:
+            identifier: Identificador del dataset
+            column: Columna de fechas
+            
+        Returns:
+            np.ndarray: Instantes de la columna en nanosegundos
             
         Raises:
-            FileNotFoundError: Si el archivo no existe
-            pd.errors.EmptyDataError: Si el archivo está vacío
-            pd.errors.ParserError: Si el formato del archivo es inválido
+            ValueError: Si el dataset no está cargado o la columna no es de fechas
         """
-        # Validar existencia del archivo
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"El archivo {file_path} no existe")
+        with self._lock.read():
+            if identifier not in self.cached_data:
+                raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            df = self.cached_data[identifier]
+            version = self.dataset_versions.get(identifier)
+        if column not in df.columns:
+            raise ValueError(f"La columna '{column}' no existe en el dataset")
+        return self._cached_epoch_view(identifier, version, df[column])
+    
+    def _cached_epoch_view(self, identifier: str, version: Optional[int], values: pd.Series) -> np.ndarray:
+        """
+        Obtener la vista en nanosegundos de una columna de fechas de una versión del dataset.
+        
+        Args:
+            identifier: Identificador del dataset
+            version: Versión del dataset a la que pertenece la columna
+            values: Columna de fechas de esa versión
             
-        try:
-            # Verificar cache antes de cargar
-            if file_path in self.cached_data:
-                logging.debug(f"Datos cargados desde cache: {file_path}")
-                return self.cached_data[file_path], self._get_metadata(file_path)
-                
-            # Cargar archivo CSV
-            logging.info(f"Cargando archivo CSV: {file_path}")
-            df = pd.read_csv(file_path)
+        Returns:
+            np.ndarray: Instantes de la columna en nanosegundos (de la cache si ya se calculó)
             
-            # Almacenar en cache para futuras consultas
-            self.cached_data[file_path] = df
+        Raises:
+            ValueError: Si la columna no es de fechas
+        """
+        column = values.name
+        with self._lock.read():
+            view_version, views = self.epoch_views.get(identifier, (None, {}))
             
-            # Crear validador para este dataset
-            self.validators[file_path] = ValidatorCSV(df)
+        # Las vistas solo valen para la versión del DataFrame con la que se calcularon
+        if view_version == version and column in views:
+            return views[column]
+        view = epoch_view(values)
+        
+        with self._lock.write():
+            # Una columna de una versión ya sustituida no se guarda
+            if self.dataset_versions.get(identifier) != version:
+                return view
+            # Invalidar las vistas si se publicó otra versión (recarga, filas o valores nuevos)
+            view_version, views = self.epoch_views.get(identifier, (None, {}))
+            if view_version != version:
+                views = {}
+                self.epoch_views[identifier] = (version, views)
+            views[column] = view
+        return view
+    
+    def _get_stats_index(self, identifier: str) -> ColumnStatistics:
+        """
+        Obtener el índice de estadísticas de un dataset, creándolo si no existe o quedó desfasado.
+        
+        Args:
+            identifier: Identificador del dataset
             
-            logging.info(f"CSV cargado exitosamente: {len(df)} filas, {len(df.columns)} columnas")
-            return df, self._get_metadata(file_path)
+        Returns:
+            ColumnStatistics: Índice del dataset en memoria
             
-        except pd.errors.EmptyDataError:
-            raise pd.errors.EmptyDataError("El archivo CSV está vacío")
-        except pd.errors.ParserError:
-            raise pd.errors.ParserError("Formato de archivo CSV inválido")
-        except Exception as e:
-            logging.error(f"Error al cargar el archivo {file_path}: {str(e)}")
-            raise
+        Raises:
+            ValueError: Si el dataset no está cargado
+        """
+        with self._lock.read():
+            df = self.cached_data.get(identifier)
+            stats = self.column_stats.get(identifier)
+            version = self.dataset_versions.get(identifier)
+        if df is None:
+            raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            
+        if stats is None or stats.rows != len(df) or len(stats.dtypes) != len(df.columns):
+            stats = ColumnStatistics(df)
+            with self._lock.write():
+                # Solo se publica si el dataset no cambió mientras se creaba
+                if self.dataset_versions.get(identifier) == version:
+                    self.column_stats[identifier] = stats
+        return stats
     
-    def load_from_mongodb(self, connection_string: str, db_name: str, collection_name: str,
-                        query: Dict[str, Any] = None, limit: int = 0) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    def get_column_stats(self, identifier: str, columns: Optional[List[str]] = None,
+                         distinct: bool = False) -> Dict[str, Dict[str, Any]]:
         """
-        Cargar datos desde una colección de MongoDB con cache automático.
+        Obtener estadísticas por columna (count, nulls, min, max, sum, mean, m2, std, distinct).
+        
+        Cada columna se resume una sola vez; después las consultas no recorren los
+        datos y el seguimiento de archivos actualiza los resúmenes con las filas nuevas.
         
         Args:
-            connection_string: Cadena de conexión a MongoDB
-            db_name: Nombre de la base de datos
-            collection_name: Nombre de la colección
-            query: Filtro de consulta MongoDB (opcional)
-            limit: Límite de documentos a cargar (0 = sin límite)
+            identifier: Identificador del dataset
+            columns: Columnas a consultar (None = todas)
+            distinct: Incluir la estimación de valores distintos
             
         Returns:
-            Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame con los datos y metadatos
+            Dict[str, Dict[str, Any]]: Estadísticas por columna
             
         Raises:
-            ConnectionError: Si no se puede establecer conexión con MongoDB
-            RuntimeError: Si hay un error al cargar los datos
+            ValueError: Si el dataset no está cargado o alguna columna no existe
         """
-        # Normalizar nombre de base de datos
-        db_name = "PeasonFlow"
+        stats = self._get_stats_index(identifier)
+        with self._lock.read():
+            columns = list(stats.dtypes) if columns is None else list(columns)
+            unknown = [col for col in columns if col not in stats.dtypes]
+            pending = [col for col in columns if col in stats.dtypes and (not stats.has_summary(col)
+                       or (distinct and stats.distinct_estimate(col) is None))]
+            if pending:
+                df = self.cached_data.get(identifier)
+                version = self.dataset_versions.get(identifier)
+                updated = stats.copy()
+        if unknown:
+            raise ValueError(f"Las columnas {unknown} no existen en el dataset")
+            
+        if pending:
+            if df is None:
+                raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            # Los resúmenes se calculan sobre una copia del índice, sin bloquear a nadie,
+            # y el índice completado sustituye al publicado si el dataset no cambió
+            if updated.rows != len(df):
+                updated = ColumnStatistics(df)
+            updated.ensure(df, pending, distinct=distinct)
+            with self._lock.write():
+                if (self.column_stats.get(identifier) is stats
+                        and self.dataset_versions.get(identifier) == version):
+                    self.column_stats[identifier] = updated
+            # La copia no publicada es privada; la publicada solo cambia con el cerrojo de escritura
+            stats = updated
+        with self._lock.read():
+            return {col: stats.get(col) for col in columns}
+    
+    def get_value_range(self, identifier: str, columns: List[str]) -> Tuple[Any, Any]:
+        """
+        Obtener el mínimo y el máximo conjuntos de varias columnas del dataset completo.
         
-        # Crear identificador único para cache
-        conn_id = f"mongodb://{db_name}/{collection_name}"
+        Args:
+            identifier: Identificador del dataset
+            columns: Columnas a considerar
+            
+        Returns:
+            Tuple[Any, Any]: (mínimo, máximo); None si las columnas no tienen valores
+        """
+        self.get_column_stats(identifier, columns)
+        with self._lock.read():
+            return self.column_stats[identifier].value_range(list(columns))
+    
+    def _get_sorted_index(self, identifier: str, column: str) -> SortedIndex:
+        """
+        Obtener el índice ordenado de una columna, creándolo o actualizándolo si hace falta.
         
-        # Verificar cache antes de conectar
-        if conn_id in self.cached_data:
-            logging.debug(f"Datos MongoDB cargados desde cache: {conn_id}")
-            return self.cached_data[conn_id], self._get_metadata(conn_id)
+        Args:
+            identifier: Identificador del dataset
+            column: Columna de fechas o numérica
             
-        try:
-            # Inicializar cargador MongoDB si es necesario
-            if self.mongo_loader is None:
-                self.mongo_loader = MongoDBLoader()
+        Returns:
+            SortedIndex: Índice al día con las filas en memoria
+            
+        Raises:
+            ValueError: Si el dataset no está cargado o la columna no existe o no es indexable
+        """
+        while True:
+            with self._lock.read():
+                df = self.cached_data.get(identifier)
+                index = self.sorted_indexes.get(identifier, {}).get(column)
+                version = self.dataset_versions.get(identifier)
+            if df is None:
+                raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            if column not in df.columns:
+                raise ValueError(f"La columna '{column}' no existe en el dataset")
+            if index is not None and index.rows == len(df):
+                return index
+                
+            # Las fechas se indexan por la vista en nanosegundos compartida con el resto del repositorio
+            keys = self._axis_epoch_view(identifier, version, df[column])
+            if index is None or index.rows > len(df):
+                # Índice nuevo: se construye sin bloquear a los lectores y solo se publica
+                # si el dataset sigue en la versión leída; si no, se reconstruye
+                built = SortedIndex(df[column], keys)
+                with self._lock.write():
+                    if self.dataset_versions.get(identifier) == version:
+                        self.sorted_indexes.setdefault(identifier, {})[column] = built
+                        return built
+            else:
+                # Filas añadidas en seguimiento, solo sobre la versión leída
+                with self._lock.write():
+                    if (self.dataset_versions.get(identifier) == version
+                            and self.sorted_indexes.get(identifier, {}).get(column) is index):
+                        if index.rows < len(df):
+                            index.append(df[column], keys)
+                        return index
+    
+    def _axis_epoch_view(self, identifier: str, version: Optional[int], values: Any) -> Optional[np.ndarray]:
+        """Vista en nanosegundos cacheada de una columna de fechas; None si no es de fechas."""
+        if not isinstance(values, pd.Series) or not is_datetime_like(values):
+            return None
+        return self._cached_epoch_view(identifier, version, values)
+    
+    def get_range(self, identifier: str, x_column: str, x_min: Any = None, x_max: Any = None,
+                  columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Obtener las filas cuyo valor en x_column está dentro de [x_min, x_max].
+        
+        La consulta se resuelve con búsqueda binaria sobre un índice ordenado de
+        la columna, sin recorrer los datos. Si la columna ya está ordenada se
+        devuelve una vista sin copia; si no, solo se copian las filas del rango,
+        en orden ascendente de x_column.
+        
+        Args:
+            identifier: Identificador del dataset
+            x_column: Columna de fechas o numérica por la que filtrar
+            x_min: Inicio del rango, incluido (fecha, número o texto; None = sin límite)
+            x_max: Fin del rango, incluido (None = sin límite)
+            columns: Columnas a devolver además de x_column (None = todas las cargadas)
+            
+        Returns:
+            pd.DataFrame: Filas del rango
             
-            # Establecer conexión
-            logging.info(f"Conectando a MongoDB: {db_name}/{collection_name}")
-            if not self.mongo_loader.connect(connection_string, db_name):
-                raise ConnectionError(f"No se pudo conectar a la base de datos MongoDB: {db_name}")
+        Raises:
+            ValueError: Si el dataset no está cargado, la columna no es indexable
+                o los límites no pueden interpretarse
+        """
+        if columns is not None:
+            # Cargar bajo demanda las columnas que aún no están en memoria
+            columns = list(dict.fromkeys([x_column] + list(columns)))
+            with self._lock.read():
+                current = self.cached_data.get(identifier)
+            if current is None or not set(columns) <= set(current.columns):
+                self.get_columns(identifier, columns)
                 
-            # Cargar datos de la colección
-            df = self.mongo_loader.load_collection(collection_name, query, limit)
+        # El índice y las filas se leen de la misma versión del dataset
+        while True:
+            index = self._get_sorted_index(identifier, x_column)
+            with self._lock.read():
+                df = self.cached_data[identifier]
+                if (self.sorted_indexes.get(identifier, {}).get(x_column) is index
+                        and index.rows == len(df)):
+                    positions = index.positions(x_min, x_max)
+                    break
+        if columns is not None:
+            df = df[columns]
+        return df.iloc[positions]
+    
+    def query(self, identifier: str) -> Query:
+        """
+        Empezar una consulta diferida sobre un dataset (select, filter, groupby, resample, limit).
+        
+        Args:
+            identifier: Identificador del dataset (ruta, patrón de fragmentos o identificador MongoDB)
             
-            # Validar que se cargaron datos
-            if df.empty:
-                raise RuntimeError(f"La colección {collection_name} está vacía o no se encontraron documentos")
+        Returns:
+            Query: Consulta vacía; se ejecuta con collect()
+        """
+        return Query(self, identifier)
+    
+    def execute_query(self, identifier: str, plan: QueryPlan) -> pd.DataFrame:
+        """
+        Ejecutar el plan de una consulta contra el origen más barato disponible.
+        
+        - Dataset en memoria y al día: condiciones sobre el DataFrame cacheado
+          (acotadas por búsqueda binaria si la columna tiene índice ordenado).
+        - CSV no cargado: lectura por bloques de solo las columnas usadas,
+          descartando en cada bloque las filas que no cumplen las condiciones.
+        - MongoDB no cargado: pipeline de agregación ejecutado en el servidor.
+        
+        Args:
+            identifier: Identificador del dataset
+            plan: Plan optimizado (Query.optimize)
+            
+        Returns:
+            pd.DataFrame: Resultado de la consulta
+            
+        Raises:
+            ValueError: Si el dataset no existe o la consulta no es válida para sus columnas
+        """
+        if self._can_query_cache(identifier, plan):
+            return plan.apply(self._scan_cached(identifier, plan))
+        if identifier.startswith("mongodb://") and identifier in self.mongo_sources:
+            return self._query_mongodb(identifier, plan)
+        if os.path.isfile(identifier):
+            return plan.apply(self._scan_csv(identifier, plan))
+        if os.path.exists(identifier) or MultiCSVLoader.is_shard_pattern(identifier):
+            # Fragmentos: se combinan una vez en memoria y se consultan desde el cache
+            self.load_csv(identifier, dtype_profile=self.dtype_profiles.get(identifier))
+            return plan.apply(self._scan_cached(identifier, plan))
+        raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+    
+    def _can_query_cache(self, identifier: str, plan: QueryPlan) -> bool:
+        """Indicar si el DataFrame cacheado está al día y contiene las columnas que usa el plan."""
+        signature = self._get_file_signature(identifier) if os.path.isfile(identifier) else None
+        with self._lock.read():
+            if identifier not in self.cached_data:
+                return False
+            if signature is not None and self.file_signatures.get(identifier) != signature:
+                return False
+            if identifier in self.projections:
+                loaded = self.cached_data[identifier].columns
+                return plan.columns is not None and all(column in loaded for column in plan.columns)
+            return True
+    
+    def _scan_cached(self, identifier: str, plan: QueryPlan) -> pd.DataFrame:
+        """
+        Leer del cache las filas que cumplen las condiciones del plan.
+        
+        Args:
+            identifier: Identificador del dataset en memoria
+            plan: Plan optimizado
+            
+        Returns:
+            pd.DataFrame: Filas y columnas requeridas por el plan
+        """
+        with self._lock.read():
+            df = self.cached_data[identifier]
+            indexed = set(self.sorted_indexes.get(identifier, {}))
+        
+        # Con un índice ordenado ya construido, acotar primero las filas por búsqueda binaria
+        for predicate in plan.predicates:
+            bounds = predicate.bounds()
+            if bounds is None or predicate.column not in indexed:
+                continue
+            try:
+                index = self._get_sorted_index(identifier, predicate.column)
+                with self._lock.read():
+                    if index.rows != len(df):
+                        continue
+                    positions = index.positions(*bounds)
+            except ValueError:
+                continue
+            if not isinstance(positions, slice):
+                positions = np.sort(positions)   # Conservar el orden original de las filas
+            df = df.iloc[positions]
+            break
+            
+        if plan.columns is not None:
+            df = df[plan.columns]
+        if plan.predicates:
+            mask = plan.predicates[0].mask(df)
+            for predicate in plan.predicates[1:]:
+                mask &= predicate.mask(df)
+            df = df[mask]
+        if plan.limit is not None:
+            df = df.iloc[:plan.limit]
+        return df
+    
+    def _scan_csv(self, file_path: str, plan: QueryPlan) -> pd.DataFrame:
+        """
+        Recorrer un CSV por bloques conservando solo las filas y columnas que usa el plan.
+        
+        La memoria usada depende del resultado y no del tamaño del archivo; con
+        un límite la lectura se detiene en cuanto se alcanza.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            plan: Plan optimizado
+            
+        Returns:
+            pd.DataFrame: Filas que cumplen las condiciones
+        """
+        loader = CSVLoader(file_path, engine="c")
+        chunks = []
+        rows = 0
+        for chunk in loader.iter_chunks(plan.columns):
+            chunk = self._materialize_datetimes(file_path, chunk)
+            for predicate in plan.predicates:
+                chunk = chunk[predicate.mask(chunk)]
+            if not chunk.empty:
+                chunks.append(chunk)
+                rows += len(chunk)
+            if plan.limit is not None and rows >= plan.limit:
+                break
                 
-            # Almacenar en cache
-            self.cached_data[conn_id] = df
+        if not chunks:
+            columns = plan.columns if plan.columns is not None else list(loader.read_schema(1).columns)
+            return pd.DataFrame(columns=columns)
+        df = MultiCSVLoader.concat_frames(chunks)
+        return df if plan.limit is None else df.iloc[:plan.limit]
+    
+    def _query_mongodb(self, identifier: str, plan: QueryPlan) -> pd.DataFrame:
+        """
+        Ejecutar el plan como pipeline de agregación en MongoDB.
+        
+        Args:
+            identifier: Identificador MongoDB del dataset
+            plan: Plan optimizado
             
-            # Crear validador para este dataset
-            self.validators[conn_id] = ValidatorCSV(df)
+        Returns:
+            pd.DataFrame: Resultado de la consulta
             
-            logging.info(f"MongoDB cargado exitosamente: {len(df)} filas, {len(df.columns)} columnas")
-            return df, self._get_metadata(conn_id)
+        Raises:
+            ConnectionError: Si no se puede establecer conexión con MongoDB
+            RuntimeError: Si el servidor rechaza el pipeline
+        """
+        source = self.mongo_sources[identifier]
+        
+        with self._mongo_lock:
+            if self.mongo_loader is None:
+                self.mongo_loader = MongoDBLoader()
+            if not self.mongo_loader.connect(source['connection_string'], source['db_name']):
+                raise ConnectionError(f"No se pudo conectar a la base de datos MongoDB: {source['db_name']}")
             
-        except Exception as e:
-            logging.error(f"Error al cargar datos de MongoDB: {str(e)}")
-            raise
+            # Las fechas escritas como texto solo coinciden con fechas BSON si se convierten
+            text_columns = sorted({predicate.column for predicate in plan.predicates if predicate.has_text_value()})
+            date_columns = self.mongo_loader.date_fields(source['collection_name'], text_columns) if text_columns else []
+            pipeline, steps = plan.mongo_pipeline(source['query'], source['limit'], date_columns)
+            logging.debug(f"Pipeline MongoDB para {identifier}: {pipeline}")
+            df = self.mongo_loader.aggregate(source['collection_name'], pipeline)
+        if df.empty and len(df.columns) == 0:
+            return df
+        return QueryPlan(None, [], None, steps).apply(df)
+    
+    def _get_aggregate_pyramid(self, identifier: str, x_column: Optional[str],
+                               columns: List[str]) -> AggregatePyramid:
+        """
+        Obtener la pirámide de agregados de un dataset con los niveles de las columnas pedidas.
+        
+        Se construye una vez por eje X; las filas añadidas en seguimiento solo
+        recalculan los tramos finales.
+        
+        Args:
+            identifier: Identificador del dataset
+            x_column: Columna del eje X (None = índice)
+            columns: Columnas numéricas requeridas
+            
+        Returns:
+            AggregatePyramid: Pirámide actualizada
+            
+        Raises:
+            ValueError: Si el dataset no está cargado o el eje X no está ordenado
+        """
+        with self._lock.read():
+            df = self.cached_data.get(identifier)
+            pyramid = self.aggregate_pyramids.get(identifier)
+            version = self.dataset_versions.get(identifier)
+            stale = pyramid is not None and df is not None and (
+                pyramid.rows < len(df) or any(column not in pyramid.columns for column in columns))
+            updated = pyramid.copy() if stale else pyramid
+        if df is None:
+            raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+            
+        if pyramid is None or pyramid.x_column != x_column or pyramid.rows > len(df):
+            # Pirámide nueva: se construye sin bloquear a los lectores y después se publica
+            keys = self._axis_epoch_view(identifier, version, df[x_column]) if x_column is not None else None
+            updated = AggregatePyramid(df, x_column, keys)
+            updated.ensure(df, columns)
+        elif stale:
+            # La publicada es compartida: se actualiza una copia fuera del cerrojo
+            if updated.rows < len(df):
+                keys = self._axis_epoch_view(identifier, version, df[x_column]) if x_column is not None else None
+                updated.append(df, keys)
+            updated.ensure(df, columns)
+        else:
+            return pyramid
+            
+        with self._lock.write():
+            # Sustituir a la publicada solo si nadie la cambió ni cambió el dataset entretanto
+            if (self.aggregate_pyramids.get(identifier) is pyramid
+                    and self.dataset_versions.get(identifier) == version):
+                self.aggregate_pyramids[identifier] = updated
+        return updated
+    
+    def get_zoom_data(self, identifier: str, columns: List[str], x_column: Optional[str] = None,
+                      x_min: Any = None, x_max: Any = None,
+                      max_points: int = 1000) -> Tuple[pd.DataFrame, int]:
+        """
+        Obtener los datos de un rango del eje X con la resolución justa para dibujarlo.
+        
+        Si las filas del rango caben en max_points se devuelven tal cual; si no,
+        se leen los tramos del nivel de la pirámide de agregados que las resume
+        en max_points tramos o menos, sin recorrer las filas originales.
+        
+        Args:
+            identifier: Identificador del dataset
+            columns: Columnas numéricas a consultar
+            x_column: Columna del eje X (None = índice)
+            x_min: Inicio del rango (fecha, número o posición; None = desde el principio)
+            x_max: Fin del rango (None = hasta el final)
+            max_points: Tramos máximos (normalmente el ancho del gráfico en píxeles)
+            
+        Returns:
+            Tuple[pd.DataFrame, int]: DataFrame indexado por X con columnas (columna, estadístico)
+            para min, max, mean y count, y filas por tramo (1 = datos originales)
+            
+        Raises:
+            ValueError: Si el dataset no está cargado o el eje X no está ordenado
+        """
+        pyramid = self._get_aggregate_pyramid(identifier, x_column, list(columns))
+        if pyramid.is_datetime:
+            x_min = None if x_min is None else pd.Timestamp(x_min).value
+            x_max = None if x_max is None else pd.Timestamp(x_max).value
+            
+        with self._lock.read():
+            row_start, row_end = pyramid.row_range(x_min, x_max)
+            level = pyramid.level_for(row_end - row_start, max_points)
+            
+            if level is None:
+                # Pocas filas en el rango: usar los datos originales (vista sin copia)
+                keys = pyramid.keys[row_start:row_end]
+                window = self.cached_data[identifier].iloc[row_start:row_end]
+                data = {}
+                for column in columns:
+                    values = window[column].to_numpy(dtype='float64', na_value=np.nan)
+                    data[column] = {'min': values, 'max': values, 'mean': values,
+                                    'count': (~np.isnan(values)).astype(np.int64)}
+                bucket_size = 1
+            else:
+                keys, data = pyramid.aggregate(level, row_start, row_end, list(columns))
+                bucket_size = pyramid.bucket_size(level)
+            
+        index = pd.to_datetime(keys) if pyramid.is_datetime else pd.Index(keys)
+        frame = pd.concat({column: pd.DataFrame(stats, index=index) for column, stats in data.items()},
+                          axis=1)
+        return frame, bucket_size
+    
+    @staticmethod
+    def _normalize_mongo_db(db_name: str) -> str:
+        """Base de datos MongoDB efectiva: la aplicación trabaja siempre sobre PeasonFlow."""
+        return "PeasonFlow"
+    
+    @staticmethod
+    def _mongo_identifier(db_name: str, collection_name: str) -> str:
+        """Identificador de cache de una colección MongoDB."""
+        return f"mongodb://{db_name}/{collection_name}"
+    
+    @staticmethod
+    def _cache_variant(dtype_profile: Optional[str], engine: str) -> str:
+        """Etiqueta del cache columnar según las opciones que cambian el DataFrame parseado."""
+        variant = dtype_profile or ""
+        return f"{variant}|arrow" if engine == ARROW_ENGINE else variant
+    
+    @staticmethod
+    def _is_arrow_backed(dtype_profile: Optional[str], engine: str) -> bool:
+        """Indicar si los datos de un CSV se conservan en búferes Arrow."""
+        return engine == ARROW_ENGINE and not dtype_profile
+    
+    @staticmethod
+    def _get_file_signature(file_path: str) -> Tuple[int, int, int]:
+        """
+        Obtener la identidad de un archivo en disco para validar el cache.
+        
+        Args:
+            file_path: Ruta al archivo
+            
+        Returns:
+            Tuple[int, int, int]: Fecha de modificación (ns), tamaño en bytes e inodo
+        """
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
     
     def _get_metadata(self, identifier: str) -> Dict[str, Any]:
         """
@@ -133,21 +1786,48 @@ class DataRepository:
         Returns:
             Dict[str, Any]: Diccionario con metadatos del dataset
         """
-        df = self.cached_data.get(identifier)
-        if df is None:
+        with self._lock.read():
+            df = self.cached_data.get(identifier)
+            projection = self.projections.get(identifier)
+        if df is None and projection is None:
             return {}
             
+        # El índice de estadísticas puede crearse aquí: fuera del bloque de lectura
+        stats = self._get_stats_index(identifier) if projection is None else None
+        
+        with self._lock.read():
+            return self._build_metadata(identifier, df, projection, stats)
+    
+    def _build_metadata(self, identifier: str, df: Optional[pd.DataFrame],
+                        projection: Optional[Dict[str, Any]],
+                        stats: Optional[ColumnStatistics]) -> Dict[str, Any]:
+        """Componer los metadatos de un dataset a partir de su estado en el catálogo."""
         # Detectar tipo de fuente por el identificador
         is_mongo = identifier.startswith("mongodb://")
         
         # Metadatos base comunes
-        base_metadata = {
-            'rows': len(df),
-            'columns': len(df.columns),
-            'column_names': list(df.columns),
-            'numeric_columns': list(df.select_dtypes(include=['int64', 'float64']).columns),
-            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()}
-        }
+        if projection is None:
+            # Esquema tomado del índice de estadísticas, que se mantiene al añadir filas
+            base_metadata = {
+                'rows': stats.rows,
+                'columns': len(stats.dtypes),
+                'column_names': list(stats.dtypes),
+                'numeric_columns': stats.numeric_columns,
+                'dtypes': dict(stats.dtypes)
+            }
+        else:
+            # Dataset cargado en parte: describir el esquema completo, no solo lo que hay en memoria
+            base_metadata = {
+                'rows': len(df) if df is not None else None,
+                'columns': len(projection['column_names']),
+                'column_names': list(projection['column_names']),
+                'numeric_columns': list(projection['numeric_columns']),
+                'dtypes': dict(projection['dtypes']),
+                'loaded_columns': list(df.columns) if df is not None else [],
+                # Columnas cuyo tipo sale solo de la muestra (puede cambiar al cargarlas)
+                'provisional_columns': list(projection['provisional'])
+            }
+        base_metadata['dtype_report'] = self.dtype_reports.get(identifier, {})
         
         if is_mongo:
             # Extraer información específica de MongoDB
@@ -163,12 +1843,19 @@ class DataRepository:
             }
         else:
             # Metadatos específicos para archivo CSV
-            return {
+            metadata = {
                 'source': 'csv',
                 'filename': os.path.basename(identifier),
                 'filepath': identifier,
                 **base_metadata
             }
+            
+            # Información adicional para datasets fragmentados
+            if identifier in self.shard_files:
+                metadata['shard_count'] = len(self.shard_files[identifier])
+                metadata['files'] = self.shard_files[identifier]
+                
+            return metadata
         
     def validate_column(self, identifier: str, column_name: str, 
                        expected_type: str, fill_null_with: Optional[Any] = None) -> Dict[str, Any]:
@@ -187,16 +1874,32 @@ class DataRepository:
         Raises:
             ValueError: Si la columna no existe o el dataset no está cargado
         """
+        # Cargar la columna si el dataset solo está en memoria en parte
+        with self._lock.read():
+            partial = (identifier in self.projections
+                       and column_name in self.projections[identifier]['column_names'])
+        if partial:
+            self.get_columns(identifier, [column_name])
+            
         # Verificar que el dataset está disponible
-        if identifier not in self.validators:
-            raise ValueError(f"El dataset '{identifier}' no está cargado")
+        with self._lock.read():
+            if identifier not in self.cached_data:
+                raise ValueError(f"El dataset '{identifier}' no está cargado")
+            df = self.cached_data[identifier]
+            version = self.dataset_versions.get(identifier)
             
-        validator = self.validators[identifier]
+        # Validador propio de esta llamada: las conversiones de validate_column_types
+        # sustituyen columnas en su vista y no deben verse desde otros hilos
+        validator = ValidatorCSV(df)
         
         # Validar existencia de la columna
         if not validator.validate_column_exists(column_name):
             raise ValueError(f"La columna '{column_name}' no existe en el dataset")
             
+        # Responder nulos y rangos desde el índice de estadísticas
+        self.get_column_stats(identifier, [column_name])
+        validator.stats = self.column_stats[identifier]
+            
         # Contar valores nulos
         null_counts = validator.validate_no_nulls([column_name])
         nulls = null_counts.get(column_name, 0)
@@ -214,11 +1917,17 @@ class DataRepository:
                 validator.validate_column_types({column_name: expected_type})
                 fill_action = None
                 
+            # La columna convertida (y rellenada) se publica como una versión nueva que
+            # comparte el resto de columnas; sin cambios no hay nada que publicar
+            converted = validator.dataframe[column_name]
+            if fill_null_with is not None or converted.dtype != df[column_name].dtype:
+                self.update_columns(identifier, {column_name: converted}, expected_version=version)
+                
             # Retornar resultado exitoso
             return {
                 'column': column_name,
                 'expected_type': expected_type,
-                'actual_type': str(self.cached_data[identifier][column_name].dtype),
+                'actual_type': str(converted.dtype),
                 'null_count': nulls,
                 'validated': True,
                 'fill_action': fill_action
@@ -229,14 +1938,15 @@ class DataRepository:
             return {
                 'column': column_name,
                 'expected_type': expected_type,
-                'actual_type': str(self.cached_data[identifier][column_name].dtype),
+                'actual_type': str(df[column_name].dtype),
                 'null_count': nulls,
                 'validated': False,
                 'error': str(e)
             }
     
     def get_data_for_visualization(self, identifier: str, x_column: Optional[str] = None, 
-                                 n_points: int = 50) -> Tuple[Any, pd.DataFrame, str]:
+                                 n_points: int = 50,
+                                 y_columns: Optional[List[str]] = None) -> Tuple[Any, pd.DataFrame, str]:
         """
         Preparar datos optimizados para visualización con muestreo automático.
         
@@ -244,6 +1954,7 @@ class DataRepository:
             identifier: Identificador del dataset (ruta o identificador MongoDB)
             x_column: Columna para el eje X (opcional, usa índice si no se especifica)
             n_points: Número máximo de puntos a mostrar para optimizar rendimiento
+            y_columns: Columnas Y a graficar; si se indican, solo se cargan estas y la columna X
             
         Returns:
             Tuple[Any, pd.DataFrame, str]: Valores X, DataFrame con valores Y, nombre de columna X
@@ -254,26 +1965,37 @@ class DataRepository:
         # Determinar tipo de fuente y cargar datos
         is_mongo = identifier.startswith("mongodb://")
         
-        if not is_mongo and os.path.exists(identifier):
-            # Manejar archivo CSV con recarga automática
+        if y_columns:
+            # Proyección: cargar únicamente las columnas que se van a graficar
+            needed = list(dict.fromkeys(([x_column] if x_column else []) + list(y_columns)))
+            df = self.get_columns(identifier, needed)
+        elif (not is_mongo and n_points > 0 and identifier not in self.cached_data
+              and os.path.isfile(identifier)):
+            # Archivo aún no cargado: leer solo las últimas filas desde el final
+            df = self.load_csv_tail(identifier, n_points, self.dtype_profiles.get(identifier))
+        elif not is_mongo and (os.path.exists(identifier) or MultiCSVLoader.is_shard_pattern(identifier)):
+            # Manejar archivo CSV: solo se vuelve a leer si cambió la versión en disco
             try:
-                if not os.path.exists(identifier):
-                    raise FileNotFoundError(f"El archivo {identifier} no existe")
-                    
-                # Recargar datos del archivo para asegurar actualización
-                df = pd.read_csv(identifier)
-                self.cached_data[identifier] = df.copy()
+                df, _ = self.load_csv(identifier, dtype_profile=self.dtype_profiles.get(identifier))
                 
             except Exception as e:
                 # Fallback a cache si hay error de lectura
-                if identifier not in self.cached_data:
-                    raise ValueError(f"Error al cargar el archivo: {str(e)}")
-                df = self.cached_data[identifier].copy()
+                with self._lock.read():
+                    if identifier not in self.cached_data:
+                        raise ValueError(f"Error al cargar el archivo: {str(e)}")
+                    df = self.cached_data[identifier]
+        elif is_mongo and identifier not in self.cached_data and identifier in self.mongo_sources:
+            # Dataset MongoDB desalojado de memoria sin volcado: repetir la consulta
+            source = self.mongo_sources[identifier]
+            df, _ = self.load_from_mongodb(source['connection_string'], source['db_name'],
+                                           source['collection_name'], source['query'], source['limit'],
+                                           raw_bson=source.get('raw_bson'))
         else:
             # Usar datos de cache para MongoDB u otros identificadores
-            if identifier not in self.cached_data:
-                raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
-            df = self.cached_data[identifier].copy()
+            with self._lock.read():
+                if identifier not in self.cached_data:
+                    raise ValueError(f"No se encontró el dataset '{identifier}' en la caché")
+                df = self.cached_data[identifier]
         
         # Aplicar muestreo para optimizar rendimiento
         if n_points <= 0:
@@ -281,8 +2003,10 @@ class DataRepository:
         elif n_points > len(df):
             n_points = len(df)
             
-        # Tomar muestra de los últimos n_points registros
-        df = df.tail(n_points).copy()
+        # Tomar los últimos n_points registros como vista del DataFrame cacheado
+        # (iloc no copia; tail sí lo hace en pandas >= 3); las columnas Arrow se
+        # pasan a NumPy solo en este recorte, que es lo que se grafica
+        df = to_numpy_backed(df.iloc[len(df) - n_points:])
         
         # Configurar columna X para el eje horizontal
         if not x_column:
@@ -294,18 +2018,12 @@ class DataRepository:
             if x_column not in df.columns:
                 raise ValueError(f"La columna '{x_column}' no existe en el dataset")
                 
-            # Intentar conversión a datetime para series temporales
-            try:
-                if df[x_column].dtype == 'object':
-                    df[x_column] = pd.to_datetime(df[x_column], errors='ignore')
-                x_values = df[x_column]
-            except Exception:
-                x_values = df[x_column]
-            
+            # Las fechas ya se convirtieron a datetime64 al cargar: no se reinterpretan textos
+            x_values = df[x_column]
             x_col = x_column
             
         # Seleccionar columnas numéricas para el eje Y
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+        numeric_cols = pd.Index(get_numeric_columns(df))
         
         # Excluir columna X si es numérica para evitar redundancia
         if x_col in numeric_cols and x_col != "Índice":
@@ -324,20 +2042,54 @@ class DataRepository:
         Args:
             identifier: Identificador específico a limpiar (si es None, limpia todo el cache)
         """
-        if identifier:
-            # Limpiar entrada específica del cache
-            if identifier in self.cached_data:
-                del self.cached_data[identifier]
-                logging.debug(f"Cache eliminado para: {identifier}")
-            if identifier in self.validators:
-                del self.validators[identifier]
-        else:
-            # Limpiar todo el cache y cerrar conexiones
-            self.cached_data = {}
-            self.validators = {}
-            logging.info("Cache completo limpiado")
-            
+        with self._lock.write():
+            self._release_evicted()
+            if identifier:
+                # Limpiar entrada específica del cache
+                if identifier in self.cached_data:
+                    del self.cached_data[identifier]
+                    logging.debug(f"Cache eliminado para: {identifier}")
+                if identifier in self.validators:
+                    del self.validators[identifier]
+                self.file_signatures.pop(identifier, None)
+                self.dtype_profiles.pop(identifier, None)
+                self.dtype_reports.pop(identifier, None)
+                self.parse_engines.pop(identifier, None)
+                self.shard_files.pop(identifier, None)
+                self.projections.pop(identifier, None)
+                self.tail_cache.pop(identifier, None)
+                self.datetime_formats.pop(identifier, None)
+                self.epoch_views.pop(identifier, None)
+                self.column_stats.pop(identifier, None)
+                self.aggregate_pyramids.pop(identifier, None)
+                self.sorted_indexes.pop(identifier, None)
+                self.dataset_versions.pop(identifier, None)
+                self.version_log.pop(identifier, None)
+            else:
+                # Limpiar todo el cache y cerrar conexiones
+                self.cached_data.clear()
+                self.validators = {}
+                self.file_signatures = {}
+                self.dtype_profiles = {}
+                self.dtype_reports = {}
+                self.parse_engines = {}
+                self.shard_files = {}
+                self.projections = {}
+                self.mongo_sources = {}
+                self.tail_cache = {}
+                self.follow_offsets = {}
+                self.datetime_formats = {}
+                self.epoch_views = {}
+                self.column_stats = {}
+                self.aggregate_pyramids = {}
+                self.sorted_indexes = {}
+                self.dataset_versions = {}
+                self.version_log = {}
+                logging.info("Cache completo limpiado")
+                
+        if not identifier:
             # Cerrar conexión MongoDB si está activa
-            if self.mongo_loader:
-                self.mongo_loader.close()
-                self.mongo_loader = None 
\ No newline at end of file
+            with self._mongo_lock:
+                if self.mongo_loader:
+                    self.mongo_loader.close()
+                    self.mongo_loader = None 
\ No newline at end of file
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox, font
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 from matplotlib.figure import Figure
 import pandas as pd
 import numpy as np
@@ -10,9 +11,27 @@ import os
 import sys
 from core.chart_factory import ChartFactory
 from core.data_repository import DataRepository
+from core.csv_loader import CSVLoader
 from core.ai_models import ModelFactory
+from utils.dtype_optimizer import get_numeric_columns, to_numpy_backed
+from utils.downsampling import downsample, LTTB
+from utils.datetime_utils import is_datetime_like
 
 class DataVisualizerGUI:
+    # Datasets CSV con más columnas que este umbral se cargan columna a columna bajo demanda
+    LAZY_COLUMN_THRESHOLD = 50
+    # Columnas numéricas graficadas por defecto en modo bajo demanda si no hay selección
+    LAZY_DEFAULT_PLOT_COLUMNS = 10
+    # Archivos CSV a partir de este tamaño se abren leyendo solo sus últimas filas
+    TAIL_MODE_MIN_BYTES = 256 * 1024 * 1024
+    # Filas finales cargadas al abrir un archivo en modo cola
+    TAIL_MODE_ROWS = 1000
+    # Intervalo de comprobación de filas nuevas en modo seguimiento (ms)
+    FOLLOW_INTERVAL_MS = 2000
+    
+    # Espera tras el último cambio de zoom o desplazamiento antes de releer los datos
+    ZOOM_REFRESH_MS = 150
+    
     # Paleta de colores
     COLORS = {
         'primary': '#3498db',  # Azul principal
@@ -31,8 +50,10 @@ class DataVisualizerGUI:
         Args:
             file_path: Ruta al archivo CSV o identificador de MongoDB a visualizar
         """
-        # Inicializar repositorio de datos
-        self.data_repository = DataRepository()
+        # Catálogo de datos compartido con el resto de ventanas
+        self.data_repository = DataRepository.get_shared_instance()
+        self.lazy_columns = False  # True si las columnas se cargan bajo demanda
+        self.tail_only = False     # True si solo están en memoria las últimas filas del archivo
         
         # Cargar datos
         try:
@@ -66,9 +87,10 @@ class DataVisualizerGUI:
             else:
                 # Es un archivo CSV
                 print(f"DataVisualizerGUI: Cargando datos desde CSV: {file_path}")
-                self.dataframe, self.metadata = self.data_repository.load_csv(file_path)
+                self.dataframe, self.metadata = self._load_csv_dataset(file_path)
             
             self.file_path = file_path
+            self.data_version = self.data_repository.get_version(file_path)  # Versión de self.dataframe
             print(f"DataVisualizerGUI: Datos cargados correctamente: {len(self.dataframe)} filas, {len(self.dataframe.columns)} columnas")
         except Exception as e:
             print(f"DataVisualizerGUI: Error al cargar los datos: {str(e)}")
@@ -82,16 +104,231 @@ class DataVisualizerGUI:
         self.create_widgets()
         self.current_canvas = None
         self.current_toolbar = None
+        self._zoom = None       # Ejes y series que se releen al hacer zoom
+        self._zoom_job = None
         
         # Actualizar el gráfico automáticamente al inicio
         self.root.after(100, self.show_chart)
 
+    def _load_csv_dataset(self, file_path: str):
+        """
+        Cargar un CSV completo o, si es muy ancho, solo las columnas del gráfico inicial.
+        
+        Args:
+            file_path: Ruta al archivo CSV, directorio o patrón de fragmentos
+            
+        Returns:
+            Tuple[pd.DataFrame, Dict[str, Any]]: Datos en memoria y metadatos del dataset
+        """
+        # Los fragmentos se combinan completos; la proyección aplica a archivos individuales
+        if not os.path.isfile(file_path):
+            return self.data_repository.load_csv(file_path)
+            
+        # Archivos muy grandes: empezar leyendo solo el final, que es lo que se grafica
+        if os.path.getsize(file_path) >= self.TAIL_MODE_MIN_BYTES and \
+                CSVLoader(file_path).supports_byte_seeking():
+            self.tail_only = True
+            print(f"DataVisualizerGUI: Archivo grande, leyendo las últimas {self.TAIL_MODE_ROWS} filas")
+            df = self.data_repository.load_csv_tail(file_path, self.TAIL_MODE_ROWS)
+            return df, self._build_tail_metadata(df)
+            
+        # Leer primero solo el esquema para decidir cómo cargar
+        _, metadata = self.data_repository.load_csv(file_path, columns=[])
+        if metadata['columns'] <= self.LAZY_COLUMN_THRESHOLD:
+            return self.data_repository.load_csv(file_path)
+            
+        self.lazy_columns = True
+        # Los tipos del esquema salen de una muestra: si no reconoce ninguna columna
+        # numérica se cargan las primeras para tener filas y conocer sus tipos reales
+        initial = (metadata['numeric_columns'] or metadata['column_names'])[:self.LAZY_DEFAULT_PLOT_COLUMNS]
+        print(f"DataVisualizerGUI: Dataset ancho ({metadata['columns']} columnas), "
+              f"cargando columnas bajo demanda")
+        return self.data_repository.load_csv(file_path, columns=initial)
+    
+    def _build_tail_metadata(self, df):
+        """
+        Construir los metadatos de un archivo del que solo se leyeron las últimas filas.
+        
+        Args:
+            df: Últimas filas del archivo
+            
+        Returns:
+            Dict[str, Any]: Metadatos con columnas y tipos; las filas son las leídas
+        """
+        return {
+            'source': 'csv',
+            'rows': len(df),
+            'columns': len(df.columns),
+            'column_names': list(df.columns),
+            'numeric_columns': get_numeric_columns(df),
+            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+            'tail_only': True
+        }
+    
+    def _get_tail(self, n_points):
+        """
+        Obtener las últimas n_points filas en modo cola, leyendo más del final si hace falta.
+        
+        Args:
+            n_points: Filas requeridas (<= 0 carga el archivo completo y sale del modo cola)
+            
+        Returns:
+            pd.DataFrame: Últimas filas del archivo
+        """
+        if n_points <= 0:
+            self.dataframe, self.metadata = self.data_repository.load_csv(self.file_path)
+            self.data_version = self.data_repository.get_version(self.file_path)
+            self.tail_only = False
+            return self.dataframe
+            
+        if n_points > len(self.dataframe):
+            self.dataframe = self.data_repository.load_csv_tail(self.file_path, n_points)
+        return self.dataframe.iloc[max(len(self.dataframe) - n_points, 0):]
+    
+    def _get_columns(self, columns):
+        """
+        Obtener las columnas indicadas, cargándolas del origen si aún no están en memoria.
+        
+        Args:
+            columns: Columnas requeridas
+            
+        Returns:
+            pd.DataFrame: DataFrame con las columnas solicitadas
+        """
+        columns = list(dict.fromkeys(columns))
+        if not self.lazy_columns:
+            return self.dataframe[columns]
+            
+        # Los metadatos se renuevan: los tipos de las columnas cargadas sustituyen a los de la muestra
+        df, self.metadata = self.data_repository.load_csv(self.file_path, columns=columns)
+        
+        # Mantener la vista local al día con las columnas ya cargadas
+        self._sync_dataframe()
+        return df
+    
+    def _sync_dataframe(self):
+        """Tomar la versión vigente del dataset si cambió en el repositorio (columnas, filas o valores)."""
+        if self.tail_only:
+            return
+        version = self.data_repository.get_version(self.file_path)
+        if version and version != self.data_version:
+            self.dataframe, self.data_version = self.data_repository.get_snapshot(self.file_path)
+
+    def _cached_x_keys(self, x_column, n_points):
+        """
+        Obtener del repositorio la vista en nanosegundos de los últimos puntos de la columna X.
+        
+        Args:
+            x_column: Columna de fechas del eje X
+            n_points: Últimas filas mostradas
+            
+        Returns:
+            np.ndarray: Instantes de esas filas, o None si la vista local no es la versión vigente
+        """
+        if self.data_repository.get_version(self.file_path) != self.data_version:
+            return None
+        try:
+            keys = self.data_repository.get_epoch_view(self.file_path, x_column)
+        except ValueError:
+            return None
+        if len(keys) != len(self.dataframe):
+            return None
+        return keys[len(keys) - n_points:]
+    
+    def _x_range_requested(self):
+        """Indicar si el usuario pidió un rango del eje X en lugar de los últimos N puntos."""
+        return bool(self.x_from.get().strip() or self.x_to.get().strip())
+    
+    def _get_x_range(self, columns=None):
+        """
+        Obtener las filas del rango X indicado en los controles, con búsqueda binaria en el repositorio.
+        
+        Args:
+            columns: Columnas requeridas además de la columna X (None = todas las cargadas)
+            
+        Returns:
+            pd.DataFrame: Filas del rango, en orden ascendente de la columna X
+            
+        Raises:
+            ValueError: Si no hay columna X seleccionada o los límites no son válidos
+        """
+        x_column = self.x_combo.get()
+        if not x_column:
+            raise ValueError("Seleccione una columna X para filtrar por rango")
+            
+        # El rango puede caer fuera de las últimas filas: pasar al archivo completo
+        if self.tail_only:
+            self._get_tail(0)
+            
+        df = self.data_repository.get_range(self.file_path, x_column, self.x_from.get(), self.x_to.get(),
+                                            columns)
+        if self.lazy_columns:
+            # Mantener la vista local al día con las columnas ya cargadas
+            self._sync_dataframe()
+        return df
+    
+    def toggle_follow(self):
+        """Activar o desactivar el seguimiento de filas añadidas al archivo."""
+        if self.follow_file.get():
+            try:
+                self.data_repository.start_following(self.file_path)
+            except Exception as e:
+                self.follow_file.set(False)
+                messagebox.showerror("Error", f"No se puede seguir el archivo: {str(e)}")
+                return
+            self.data_repository.add_update_listener(self._on_data_appended)
+            self.status_text.set("Siguiendo el archivo: se añadirán las filas nuevas")
+            self._follow_job = self.root.after(self.FOLLOW_INTERVAL_MS, self._poll_followed_file)
+        else:
+            if self._follow_job is not None:
+                self.root.after_cancel(self._follow_job)
+                self._follow_job = None
+            self.data_repository.remove_update_listener(self._on_data_appended)
+            self.data_repository.stop_following(self.file_path)
+            self.status_text.set("Seguimiento del archivo desactivado")
+    
+    def _poll_followed_file(self):
+        """Comprobar periódicamente si el archivo en seguimiento tiene filas nuevas."""
+        self._follow_job = None
+        if not self.follow_file.get():
+            return
+        try:
+            self.data_repository.refresh_followed(self.file_path)
+        except Exception as e:
+            print(f"DataVisualizerGUI: Error al leer filas nuevas: {str(e)}")
+        self._follow_job = self.root.after(self.FOLLOW_INTERVAL_MS, self._poll_followed_file)
+    
+    def _on_data_appended(self, identifier, new_rows):
+        """
+        Actualizar los datos en memoria y redibujar cuando el repositorio añade filas.
+        
+        Args:
+            identifier: Identificador del dataset actualizado
+            new_rows: Número de filas nuevas
+        """
+        if identifier != self.file_path:
+            return
+            
+        if self.tail_only:
+            self.dataframe = self.data_repository.load_csv_tail(self.file_path, len(self.dataframe))
+        else:
+            self._sync_dataframe()
+            self.metadata['rows'] = len(self.dataframe)
+            
+        self.status_text.set(f"{new_rows} filas nuevas recibidas")
+        self.show_chart()
+
     def run(self):
         """Ejecutar el bucle principal de la interfaz."""
         try:
             self.root.mainloop()
         except Exception as e:
             messagebox.showerror("Error", f"Error en la ejecución: {str(e)}")
+        finally:
+            # El repositorio sobrevive a la ventana: retirar su oyente y su seguimiento
+            self.data_repository.remove_update_listener(self._on_data_appended)
+            if self._follow_job is not None:
+                self.data_repository.stop_following(self.file_path)
 
     def setup_style(self):
         """Configurar el estilo general de la aplicación."""
@@ -279,7 +516,7 @@ class DataVisualizerGUI:
         ttk.Label(controls, text="Columna X:").grid(row=0, column=2, sticky="w", padx=5, pady=5)
         
         self.x_combo = ttk.Combobox(controls, width=15)
-        self.x_combo['values'] = list(self.dataframe.columns)
+        self.x_combo['values'] = list(self.metadata['column_names'])
         self.x_combo.grid(row=0, column=3, sticky="w", padx=5, pady=5)
         
         # Número de puntos a mostrar
@@ -298,6 +535,24 @@ class DataVisualizerGUI:
         rotate_check = ttk.Checkbutton(controls, text="Rotar Etiquetas", variable=self.rotate_labels)
         rotate_check.grid(row=1, column=3, sticky="w", padx=5, pady=5)
         
+        # Rango del eje X: si se indica, sustituye a los últimos N puntos
+        ttk.Label(controls, text="Rango X desde:").grid(row=3, column=0, sticky="w", padx=5, pady=5)
+        self.x_from = tk.StringVar(value="")
+        ttk.Entry(controls, textvariable=self.x_from, width=20).grid(row=3, column=1, sticky="w", padx=5, pady=5)
+        
+        ttk.Label(controls, text="hasta:").grid(row=3, column=2, sticky="w", padx=5, pady=5)
+        self.x_to = tk.StringVar(value="")
+        ttk.Entry(controls, textvariable=self.x_to, width=20).grid(row=3, column=3, sticky="w", padx=5, pady=5)
+        
+        # Seguimiento de archivos CSV que crecen mientras se visualizan
+        self.follow_file = tk.BooleanVar(value=False)
+        self._follow_job = None
+        follow_check = ttk.Checkbutton(controls, text="Seguir archivo (filas nuevas)",
+                                       variable=self.follow_file, command=self.toggle_follow)
+        follow_check.grid(row=2, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        if not os.path.isfile(str(self.file_path)):
+            follow_check.config(state="disabled")
+        
         # Botón para actualizar gráfico
         self.update_btn = ttk.Button(controls, text="Actualizar Gráfico", 
                                    command=self.show_chart, style='Accent.TButton')
@@ -333,8 +588,8 @@ class DataVisualizerGUI:
         self.columns_frame = ttk.Frame(ai_controls)
         self.columns_frame.grid(row=0, column=3, rowspan=2, sticky="nw", padx=5, pady=5)
         
-        # Obtener columnas numéricas
-        numeric_cols = list(self.dataframe.select_dtypes(include=['int64', 'float64']).columns)
+        # Obtener columnas numéricas (de los metadatos: en modo bajo demanda no están todas en memoria)
+        numeric_cols = list(self.metadata['numeric_columns'])
         
         # Crear el gestor de checkboxes con un callback que actualiza el estado de la UI
         def on_column_selection_changed(selected_columns):
@@ -391,22 +646,27 @@ class DataVisualizerGUI:
         # Tabla con estilo
         self.tree = ttk.Treeview(table_frame, yscrollcommand=y_scroll.set,
                                 xscrollcommand=x_scroll.set, style="Treeview")
-        self.tree["columns"] = list(self.dataframe.columns)
+        # En modo bajo demanda se muestra la muestra del esquema con todas las columnas
+        max_rows = 1000  # Limitar filas para evitar sobrecargas
+        if self.lazy_columns:
+            df_display = self.data_repository.get_preview(self.file_path, max_rows)
+        else:
+            df_display = self.dataframe.iloc[:max_rows]
+            
+        self.tree["columns"] = list(df_display.columns)
         self.tree["show"] = "headings"
         
         # Configurar columnas
-        for col in self.dataframe.columns:
+        for col in df_display.columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=100, minwidth=50)
         
         # Insertar datos (optimizado para conjuntos de datos grandes)
-        max_rows = 1000  # Limitar filas para evitar sobrecargas
-        df_display = self.dataframe.head(max_rows)
         for _, row in df_display.iterrows():
             self.tree.insert("", "end", values=list(row))
         
         if len(self.dataframe) > max_rows:
-            self.tree.insert("", "end", values=[f"... mostrando {max_rows} de {len(self.dataframe)} filas"] + [""] * (len(self.dataframe.columns) - 1))
+            self.tree.insert("", "end", values=[f"... mostrando {max_rows} de {len(self.dataframe)} filas"] + [""] * (len(df_display.columns) - 1))
         
         # Configurar scrollbars
         y_scroll.config(command=self.tree.yview)
@@ -421,6 +681,8 @@ class DataVisualizerGUI:
         # Mostrar información resumida del DataFrame usando los metadatos
         num_rows = self.metadata['rows']
         num_cols = self.metadata['columns']
+        if self.tail_only:
+            num_rows = f"últimas {num_rows}"
         ttk.Label(stats_frame, text=f"Filas: {num_rows} | Columnas: {num_cols}", 
                  style="Subtitle.TLabel").pack(side="left")
 
@@ -567,6 +829,9 @@ class DataVisualizerGUI:
                 messagebox.showinfo("Información", "Seleccione un modelo de IA primero.")
                 return
             
+            # Ajustar el modelo sobre la versión vigente de los datos
+            self._sync_dataframe()
+            
             # Obtener columnas seleccionadas usando el checkbox manager
             selected_columns = self.checkbox_manager.get_selected()
             
@@ -622,7 +887,7 @@ class DataVisualizerGUI:
                     # Obtener columnas seleccionadas y verificar que sean numéricas
                     numeric_cols = []
                     for col in selected_columns:
-                        if col in self.dataframe.columns and pd.api.types.is_numeric_dtype(self.dataframe[col]):
+                        if col in self.metadata['numeric_columns']:
                             numeric_cols.append(col)
                         else:
                             print(f"Advertencia: La columna '{col}' no es numérica o no existe. Será ignorada.")
@@ -640,7 +905,11 @@ class DataVisualizerGUI:
                                             f"Solo se utilizarán {len(numeric_cols)} columnas numéricas de las {len(selected_columns)} seleccionadas.")
                     
                     # Usar solo las columnas numéricas para el modelo
-                    model_data = self.dataframe[numeric_cols].copy()
+                    # Vista sin copia: dropna y el modelo devuelven DataFrames nuevos
+                    if self._x_range_requested():
+                        model_data = to_numpy_backed(self._get_x_range(numeric_cols)[numeric_cols])
+                    else:
+                        model_data = to_numpy_backed(self._get_columns(numeric_cols))
                     
                     # Eliminar filas con valores NaN
                     original_len = len(model_data)
@@ -732,6 +1001,7 @@ class DataVisualizerGUI:
             self.update_btn.config(state="disabled")
             self.status_text.set("Generando gráfico...")
             self.root.update_idletasks()  # Actualizar la interfaz
+            self._sync_dataframe()
             
             # Guardar dimensiones actuales del frame antes de limpiar
             original_width = self.chart_frame.winfo_width() or 800
@@ -759,15 +1029,39 @@ class DataVisualizerGUI:
             chart_type = self.chart_combo.get()
             x_column = self.x_combo.get() if self.x_combo.get() else None
             
-            # Limitar datos a los últimos N puntos
             try:
-                n_points = int(self.n_points.get())
-                if n_points <= 0:
-                    n_points = len(self.dataframe)
+                requested_points = int(self.n_points.get())
             except ValueError:
-                n_points = len(self.dataframe)
+                requested_points = 0
+            
+            # Cargar solo las filas o columnas necesarias si el archivo es grande o ancho
+            x_range = self._x_range_requested()
+            if x_range:
+                y_columns = None
+                if self.lazy_columns:
+                    y_columns = self.checkbox_manager.get_selected() or \
+                        self.metadata['numeric_columns'][:self.LAZY_DEFAULT_PLOT_COLUMNS]
+                source_df = self._get_x_range(y_columns)
+                if source_df.empty:
+                    messagebox.showinfo("Información", "No hay filas en el rango X indicado.")
+                    self.update_btn.config(state="normal")
+                    return
+                # El rango completo sustituye a los últimos N puntos
+                requested_points = 0
+            elif self.tail_only:
+                source_df = self._get_tail(requested_points)
+            elif self.lazy_columns:
+                y_columns = self.checkbox_manager.get_selected() or \
+                    self.metadata['numeric_columns'][:self.LAZY_DEFAULT_PLOT_COLUMNS]
+                source_df = self._get_columns(([x_column] if x_column else []) + list(y_columns))
+            else:
+                source_df = self.dataframe
+            
+            # Limitar datos a los últimos N puntos
+            n_points = requested_points if requested_points > 0 else len(source_df)
                 
-            df_display = self.dataframe.iloc[-n_points:].copy()
+            # Vista de solo lectura de los últimos puntos (sin duplicar búferes; no se modifica)
+            df_display = to_numpy_backed(source_df.iloc[-n_points:])
             
             # Preparar valores X
             x_values = None
@@ -780,7 +1074,7 @@ class DataVisualizerGUI:
             chart = ChartFactory.create_chart(chart_type, self.COLORS['chart_colors'])
             
             # Seleccionar columnas numéricas para graficar
-            numeric_cols = df_display.select_dtypes(include=['int64', 'float64']).columns
+            numeric_cols = pd.Index(get_numeric_columns(df_display))
             
             # Excluir la columna X de los datos Y si es numérica
             if x_column in numeric_cols:
@@ -793,8 +1087,35 @@ class DataVisualizerGUI:
                 
             y_data = df_display[numeric_cols]
             
+            # Si se muestra el dataset completo, el rango Y sale del índice de estadísticas
+            y_range = None
+            if not self.tail_only and not x_range and n_points >= len(source_df):
+                try:
+                    y_range = self.data_repository.get_value_range(self.file_path, list(numeric_cols))
+                except ValueError:
+                    y_range = None
+            
+            # LTTB sobre fechas usa la vista en nanosegundos cacheada por el repositorio
+            x_keys = None
+            if chart.downsampling == LTTB and source_df is self.dataframe and not self.tail_only \
+                    and x_column in df_display.columns and is_datetime_like(x_values):
+                x_keys = self._cached_x_keys(x_column, len(df_display))
+            
+            # Reducir los puntos a los que caben en el ancho del gráfico (nivel de detalle);
+            # el tiempo de dibujo queda acotado por los píxeles y no por el tamaño del dataset
+            x_plot, y_plot = downsample(x_values, y_data, original_width, chart.downsampling, x_keys)
+            
             # Dibujar el gráfico
-            ax = chart.plot(ax, x_values, y_data, x_col=x_column)
+            n_lines, n_collections = len(ax.lines), len(ax.collections)
+            ax = chart.plot(ax, x_plot, y_plot, x_col=x_column, y_range=y_range)
+            
+            # Al hacer zoom, releer el rango visible desde la pirámide de agregados
+            self._zoom = None
+            if chart.downsampling and not self.tail_only:
+                artists = ax.lines[n_lines:] if chart.downsampling == 'minmax' else ax.collections[n_collections:]
+                self._enable_zoom(ax, chart.downsampling, x_column if x_column in df_display.columns else None,
+                                  is_datetime_like(x_values), list(numeric_cols), list(artists),
+                                  original_width)
             
             # Si hay un modelo de IA aplicado, añadir sus resultados al gráfico
             model_desc = ""
@@ -897,6 +1218,80 @@ class DataVisualizerGUI:
             # Reactivar el botón de actualización
             self.update_btn.config(state="normal")
 
+    def _enable_zoom(self, ax, method, x_column, datetime_axis, columns, artists, width):
+        """
+        Preparar la relectura de datos al hacer zoom o desplazar el gráfico.
+        
+        Args:
+            ax: Ejes del gráfico
+            method: Reducción del gráfico ('minmax' para líneas, 'lttb' para dispersión)
+            x_column: Columna del eje X (None = índice)
+            datetime_axis: Si el eje X es de fechas
+            columns: Columnas Y dibujadas, en el orden de sus series
+            artists: Series de matplotlib de cada columna
+            width: Ancho del gráfico en píxeles
+        """
+        if len(artists) != len(columns):
+            return
+            
+        # Construir la pirámide ahora para que el primer zoom ya sea inmediato
+        try:
+            self.data_repository.get_zoom_data(self.file_path, columns, x_column, max_points=width)
+        except (ValueError, KeyError) as e:
+            print(f"DataVisualizerGUI: Zoom sin relectura de datos: {str(e)}")
+            return
+            
+        self._zoom = {
+            'ax': ax, 'method': method, 'x_column': x_column, 'columns': columns,
+            'artists': artists, 'width': width, 'datetime': datetime_axis
+        }
+        ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+    
+    def _on_xlim_changed(self, ax):
+        """Programar la relectura del rango visible cuando el usuario deja de mover el gráfico."""
+        if self._zoom is None or self._zoom['ax'] is not ax:
+            return
+        if self._zoom_job is not None:
+            self.root.after_cancel(self._zoom_job)
+        self._zoom_job = self.root.after(self.ZOOM_REFRESH_MS, self._refresh_zoom)
+    
+    def _refresh_zoom(self):
+        """Redibujar las series con la resolución adecuada al rango visible del eje X."""
+        self._zoom_job = None
+        zoom = self._zoom
+        if zoom is None:
+            return
+            
+        ax = zoom['ax']
+        x_min, x_max = ax.get_xlim()
+        if zoom['datetime']:
+            x_min, x_max = mdates.num2date(x_min), mdates.num2date(x_max)
+            
+        try:
+            data, bucket_size = self.data_repository.get_zoom_data(
+                self.file_path, zoom['columns'], zoom['x_column'], x_min, x_max, zoom['width'])
+        except (ValueError, KeyError) as e:
+            # Dataset desalojado o recargado con otras columnas: conservar el gráfico actual
+            print(f"DataVisualizerGUI: Zoom sin relectura de datos: {str(e)}")
+            self._zoom = None
+            return
+            
+        x = data.index.to_numpy()
+        for column, artist in zip(zoom['columns'], zoom['artists']):
+            if zoom['method'] == 'minmax' and bucket_size > 1:
+                # Envolvente de cada tramo: mínimo y máximo en la misma posición X
+                artist.set_data(np.repeat(x, 2),
+                                np.column_stack([data[(column, 'min')], data[(column, 'max')]]).ravel())
+            elif zoom['method'] == 'minmax':
+                artist.set_data(x, data[(column, 'mean')].to_numpy())
+            else:
+                x_numeric = mdates.date2num(x) if zoom['datetime'] else x
+                artist.set_offsets(np.column_stack([x_numeric, data[(column, 'mean')].to_numpy()]))
+                
+        ax.figure.canvas.draw_idle()
+        detail = "filas originales" if bucket_size == 1 else f"{bucket_size} filas por punto"
+        self.status_text.set(f"Zoom: {len(data)} puntos ({detail})")
+
     def show_ai_analysis_chart(self, model_data, selected_columns):
         """Mostrar el gráfico de análisis de IA."""
         try:
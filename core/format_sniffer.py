@@ -0,0 +1,344 @@
+import codecs
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+from typing import Optional, Dict, Any, List
+
+from core.columnar_cache import ColumnarCache
+from core.compressed_stream import read_head
+from utils.datetime_utils import DATETIME_FORMATS, infer_datetime_format
+
+
+class FormatSniffer:
+    """
+    Detector del formato de archivos CSV a partir de una muestra de bytes.
+
+    En una sola pasada sobre la muestra determina codificación, delimitador,
+    separadores decimal y de miles, fila de cabecera y columnas de fecha con
+    su formato. El resultado (perfil de formato) se guarda en disco junto al
+    cache columnar y se reutiliza mientras el inicio del archivo no cambie.
+    """
+
+    SAMPLE_SIZE = 64 * 1024             # Bytes analizados del inicio del archivo
+    MAX_SAMPLE_ROWS = 200               # Filas de la muestra usadas para decidir tipos
+    DELIMITERS = [',', ';', '\t', '|']
+    PROFILE_VERSION = 3                 # Cambiar al modificar el formato o la detección del perfil
+
+    # Formatos de fecha probados, de más a menos específico
+    DATETIME_FORMATS = DATETIME_FORMATS
+
+    # Patrones numéricos para deducir los separadores decimal y de miles
+    _NUMBER_PLAIN = re.compile(r'^[-+]?\d+$')
+    _NUMBER_DOT_DECIMAL = re.compile(r'^[-+]?\d+\.\d+$')
+    _NUMBER_COMMA_DECIMAL = re.compile(r'^[-+]?\d+,\d+$')
+    _NUMBER_DOT_THOUSANDS = re.compile(r'^[-+]?\d{1,3}(\.\d{3})+(,\d+)?$')
+    _NUMBER_COMMA_THOUSANDS = re.compile(r'^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$')
+    # Coma seguida de exactamente tres dígitos: puede ser decimal (1,500 = 1.5) o de miles (1,500 = 1500)
+    _NUMBER_COMMA_AMBIGUOUS = re.compile(r'^[-+]?\d{1,3},\d{3}$')
+    # Lo mismo con punto: 1.500 es 1.5 o 1500 según el separador decimal del resto del archivo
+    _NUMBER_DOT_AMBIGUOUS = re.compile(r'^[-+]?\d{1,3}\.\d{3}$')
+
+    # Perfiles ya resueltos en este proceso: ruta absoluta -> (resumen de la muestra, perfil)
+    _memory_cache: Dict[str, Any] = {}
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Inicializar el detector de formato.
+
+        Args:
+            cache_dir: Directorio del cache (por defecto el mismo que el cache columnar)
+        """
+        base_dir = cache_dir or os.environ.get("PEARSONFLOW_CACHE_DIR", ColumnarCache.DEFAULT_CACHE_DIR)
+        self.profile_dir = os.path.join(base_dir, "profiles")
+
+    def get_profile(self, file_path: str) -> Dict[str, Any]:
+        """
+        Obtener el perfil de formato de un archivo, detectándolo solo si hace falta.
+
+        Args:
+            file_path: Ruta al archivo CSV
+
+        Returns:
+            Dict[str, Any]: Perfil de formato del archivo
+        """
+        sample = self._read_sample(file_path)
+        digest = hashlib.sha1(sample).hexdigest()
+        key = os.path.abspath(file_path)
+
+        cached = self._memory_cache.get(key)
+        if cached and cached[0] == digest:
+            return cached[1]
+
+        profile = self._load_profile(key, digest)
+        if profile is None:
+            profile = self.sniff_sample(sample, complete=len(sample) < self.SAMPLE_SIZE)
+            self._store_profile(key, digest, profile)
+            logging.info(f"Formato detectado para {file_path}: separador '{profile['sep']}', "
+                         f"codificación {profile['encoding']}, fechas {list(profile['datetime_columns'])}")
+
+        self._memory_cache[key] = (digest, profile)
+        return profile
+
+    def sniff(self, file_path: str) -> Dict[str, Any]:
+        """
+        Detectar el formato de un archivo sin consultar ni actualizar el cache.
+
+        Args:
+            file_path: Ruta al archivo CSV
+
+        Returns:
+            Dict[str, Any]: Perfil de formato del archivo
+        """
+        sample = self._read_sample(file_path)
+        return self.sniff_sample(sample, complete=len(sample) < self.SAMPLE_SIZE)
+
+    @classmethod
+    def sniff_sample(cls, sample: bytes, complete: bool = False) -> Dict[str, Any]:
+        """
+        Detectar el formato a partir de una muestra de bytes del inicio del archivo.
+
+        Args:
+            sample: Bytes iniciales del archivo
+            complete: True si la muestra contiene el archivo entero
+
+        Returns:
+            Dict[str, Any]: Perfil con encoding, sep, decimal, thousands, header,
+            quotechar y datetime_columns (columna -> formato strftime)
+        """
+        encoding, text = cls._detect_encoding(sample, complete)
+
+        # Descartar la última línea si puede estar cortada por el tamaño de la muestra
+        if not complete and '\n' in text:
+            text = text[:text.rfind('\n') + 1]
+
+        sep, rows = cls._detect_delimiter(text)
+        header = 0 if rows and cls._has_header(rows) else None
+        body = rows[1:] if header == 0 else rows
+
+        if header == 0:
+            names = [name.strip() for name in rows[0]]
+        else:
+            names = [str(i) for i in range(len(rows[0]) if rows else 0)]
+
+        columns = {}
+        for index, name in enumerate(names):
+            columns[name] = [row[index].strip() for row in body[:cls.MAX_SAMPLE_ROWS]
+                             if index < len(row) and row[index].strip()]
+
+        decimal, thousands = cls._detect_number_format(columns.values(), sep)
+
+        datetime_columns = {}
+        for name, values in columns.items():
+            fmt = cls.infer_datetime_format(values)
+            if fmt:
+                # Sin cabecera, pandas nombra las columnas con enteros
+                datetime_columns[name if header == 0 else int(name)] = fmt
+
+        return {
+            'version': cls.PROFILE_VERSION,
+            'encoding': encoding,
+            'sep': sep,
+            'decimal': decimal,
+            'thousands': thousands,
+            'header': header,
+            'quotechar': '"',
+            'datetime_columns': datetime_columns
+        }
+
+    @staticmethod
+    def to_read_options(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convertir un perfil de formato en argumentos explícitos para pandas.read_csv.
+
+        Args:
+            profile: Perfil de formato
+
+        Returns:
+            Dict[str, Any]: Opciones de lectura (sep, encoding, decimal, thousands, header)
+        """
+        options = {
+            'sep': profile['sep'],
+            'encoding': profile['encoding'],
+            'decimal': profile['decimal'],
+            'header': profile['header'],
+            'quotechar': profile.get('quotechar', '"')
+        }
+        if profile.get('thousands'):
+            options['thousands'] = profile['thousands']
+        return options
+
+    @classmethod
+    def infer_datetime_format(cls, values: List[str], ambiguous: bool = False) -> Optional[str]:
+        """
+        Buscar un formato de fecha que interprete todos los valores de la muestra.
+
+        Args:
+            values: Valores de texto no vacíos de una columna
+            ambiguous: Aceptar un orden día/mes que la muestra no decide
+
+        Returns:
+            Optional[str]: Formato strftime reconocido o None si la columna no es de fechas
+        """
+        return infer_datetime_format(values, ambiguous)
+
+    def _read_sample(self, file_path: str) -> bytes:
+        """Leer los bytes iniciales (descomprimidos) del archivo usados para la detección."""
+        return read_head(file_path, self.SAMPLE_SIZE)
+
+    @staticmethod
+    def _detect_encoding(sample: bytes, complete: bool):
+        """
+        Determinar la codificación de la muestra y devolverla decodificada.
+
+        Prueba marcas BOM y UTF-8 estricto; si falla, recurre a latin-1,
+        que acepta cualquier secuencia de bytes.
+        """
+        if sample.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig', sample.decode('utf-8-sig', errors='replace')
+        if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            return 'utf-16', sample.decode('utf-16', errors='replace')
+
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            # Un carácter multibyte cortado al final de la muestra no invalida UTF-8
+            return 'utf-8', decoder.decode(sample, final=complete)
+        except UnicodeDecodeError:
+            return 'latin-1', sample.decode('latin-1')
+
+    @classmethod
+    def _detect_delimiter(cls, text: str):
+        """
+        Elegir el delimitador que produce un número de campos más consistente.
+
+        Returns:
+            Tuple[str, List[List[str]]]: Delimitador y filas de la muestra separadas con él
+        """
+        best_sep, best_rows, best_score = ',', [], (-1.0, 0)
+
+        for sep in cls.DELIMITERS:
+            rows = [row for row in csv.reader(io.StringIO(text), delimiter=sep, quotechar='"') if row]
+            rows = rows[:cls.MAX_SAMPLE_ROWS + 1]
+            if not rows:
+                continue
+
+            counts = [len(row) for row in rows]
+            mode = max(set(counts), key=counts.count)
+            if mode < 2:
+                continue
+
+            # Proporción de filas con el número de campos más frecuente, y número de campos
+            score = (counts.count(mode) / len(counts), mode)
+            if score > best_score:
+                best_sep, best_rows, best_score = sep, rows, score
+
+        if not best_rows:
+            best_rows = [row for row in csv.reader(io.StringIO(text)) if row]
+        return best_sep, best_rows
+
+    @classmethod
+    def _has_header(cls, rows: List[List[str]]) -> bool:
+        """
+        Decidir si la primera fila es una cabecera.
+
+        La primera fila se trata como datos solo si todos sus campos parecen
+        números o fechas y al menos uno es un número con parte decimal, que no
+        es un nombre de columna verosímil. Una fila solo de enteros o fechas
+        (p. ej. años: 2020,2021) sigue siendo la cabecera, igual que asume
+        pandas por defecto.
+        """
+        first = [value.strip() for value in rows[0] if value.strip()]
+        if not first:
+            return True
+        if not all(cls._looks_numeric(value) or cls.infer_datetime_format([value], ambiguous=True) for value in first):
+            return True
+        return not any(cls._looks_numeric(value) and not cls._NUMBER_PLAIN.match(value) for value in first)
+
+    @classmethod
+    def _looks_numeric(cls, value: str) -> bool:
+        """Indicar si un texto representa un número en cualquiera de los formatos reconocidos."""
+        return bool(cls._NUMBER_PLAIN.match(value) or cls._NUMBER_DOT_DECIMAL.match(value)
+                    or cls._NUMBER_COMMA_DECIMAL.match(value) or cls._NUMBER_DOT_THOUSANDS.match(value)
+                    or cls._NUMBER_COMMA_THOUSANDS.match(value))
+
+    @classmethod
+    def _detect_number_format(cls, columns, sep: str):
+        """
+        Deducir separador decimal y de miles contando votos en los valores numéricos.
+
+        Los valores con una coma seguida de exactamente tres dígitos (1,000) no
+        votan por la coma decimal: solo se leen como decimales si otros valores
+        descartan la agrupación de miles; si no, se toman como miles. Del mismo
+        modo, 1.000 no vota por el punto decimal: si el resto de valores usa la
+        coma decimal se toma como separador de miles.
+
+        Returns:
+            Tuple[str, Optional[str]]: Separador decimal y separador de miles (o None)
+        """
+        comma_decimal = dot_decimal = dot_thousands = comma_thousands = ambiguous_comma = ambiguous_dot = 0
+
+        for values in columns:
+            for value in values:
+                if cls._NUMBER_DOT_THOUSANDS.match(value) and ',' in value:
+                    dot_thousands += 1
+                    comma_decimal += 1
+                elif cls._NUMBER_COMMA_THOUSANDS.match(value) and '.' in value:
+                    comma_thousands += 1
+                    dot_decimal += 1
+                elif cls._NUMBER_COMMA_AMBIGUOUS.match(value):
+                    ambiguous_comma += 1
+                elif cls._NUMBER_DOT_AMBIGUOUS.match(value):
+                    ambiguous_dot += 1
+                elif cls._NUMBER_COMMA_THOUSANDS.match(value):
+                    comma_thousands += 1
+                elif cls._NUMBER_COMMA_DECIMAL.match(value):
+                    comma_decimal += 1
+                elif cls._NUMBER_DOT_DECIMAL.match(value):
+                    dot_decimal += 1
+
+        # La coma solo puede ser decimal si no es el delimitador
+        if sep != ',' and comma_decimal > dot_decimal:
+            return ',', '.' if dot_thousands or ambiguous_dot else None
+        return '.', ',' if (comma_thousands or ambiguous_comma) and sep != ',' else None
+
+    def _profile_path(self, key: str) -> str:
+        """Ruta del archivo JSON donde se guarda el perfil de un CSV."""
+        name = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.profile_dir, f"{name}.json")
+
+    def _load_profile(self, key: str, digest: str) -> Optional[Dict[str, Any]]:
+        """Leer un perfil guardado si corresponde a la muestra actual del archivo."""
+        path = self._profile_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as handle:
+                stored = json.load(handle)
+        except (OSError, ValueError) as e:
+            logging.warning(f"No se pudo leer el perfil de formato {path}: {str(e)}")
+            return None
+
+        profile = stored.get('profile', {})
+        if stored.get('digest') != digest or profile.get('version') != self.PROFILE_VERSION:
+            return None
+
+        # JSON convierte en texto las claves enteras de archivos sin cabecera
+        if profile.get('header') is None:
+            profile['datetime_columns'] = {int(col): fmt for col, fmt in profile['datetime_columns'].items()}
+        return profile
+
+    def _store_profile(self, key: str, digest: str, profile: Dict[str, Any]) -> None:
+        """Guardar un perfil en disco; los errores de escritura no interrumpen la carga."""
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = self._profile_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump({'source': key, 'digest': digest, 'profile': profile}, handle)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"No se pudo guardar el perfil de formato de {key}: {str(e)}")
@@ -0,0 +1,342 @@
+import struct
+import numpy as np
+import pandas as pd
+from bson import decode_all
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Documentos pedidos al servidor por lote y convertidos a columnas de una vez
+BATCH_SIZE = 10_000
+
+# Valor de los campos ausentes en un documento (como pandas: NaN, mientras que un None explícito se conserva)
+_MISSING = np.nan
+
+# Tipos BSON de tamaño fijo que se leen directamente a NumPy: código -> (bytes, dtype de lectura)
+_FIXED_TYPES = {
+    0x01: (8, '<f8'),   # double
+    0x08: (1, 'u1'),    # booleano
+    0x09: (8, '<i8'),   # fecha (milisegundos desde epoch)
+    0x0A: (0, None),    # null
+    0x10: (4, '<i4'),   # int32
+    0x12: (8, '<i8'),   # int64
+}
+# Documentos consecutivos con la misma disposición a partir de los cuales compensa leerlos
+# directamente; tramos más cortos (disposición cambiante) se decodifican con bson
+MIN_UNIFORM_RUN = 256
+
+_STRING = 0x02
+_OBJECT_ID = 0x07
+_DATETIME = 0x09
+
+
+def _null_dtype(dtype: Any) -> Any:
+    """Tipo con el que se rellenan los huecos de una columna (los enteros y booleanos no admiten nulos)."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return object
+    if pd.api.types.is_integer_dtype(dtype) and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        return 'float64'
+    return dtype
+
+
+class ColumnBuilder:
+    """
+    Construye un DataFrame a partir de documentos recibidos en lotes, sin acumular diccionarios.
+
+    Cada documento se reparte en las listas de valores de su lote, una por
+    campo; al completar el lote cada lista se convierte en un array tipado
+    (mismas reglas de inferencia que pandas) y se descarta. En memoria solo
+    conviven las columnas ya convertidas y los valores de un lote. Los campos
+    ausentes en parte de los documentos se guardan como tramos de nulos y se
+    materializan al final con el tipo de la columna. El DataFrame final se
+    ensambla columna a columna, de modo que el pico de memoria apenas supera
+    el tamaño del resultado.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, exclude: Sequence[str] = ('_id',)):
+        """
+        Inicializar el constructor vacío.
+        
+        Args:
+            batch_size: Documentos por lote convertido a columnas
+            exclude: Campos que no se incorporan (por defecto, el _id de MongoDB)
+        """
+        self.batch_size = max(int(batch_size), 1)
+        self.exclude = frozenset(exclude)
+        self.rows = 0   # Documentos ya convertidos a columnas
+        self._chunks: Dict[str, List[Union[pd.Series, int]]] = {}   # Campo -> arrays o tramos de nulos
+        self._batch: Dict[str, List[Any]] = {}
+        self._batch_rows = 0
+
+    def add(self, document: Mapping[str, Any]) -> None:
+        """
+        Incorporar un documento al lote en curso.
+        
+        Args:
+            document: Documento con sus campos de primer nivel
+        """
+        position = self._batch_rows
+        batch = self._batch
+        present = 0
+        for key, value in document.items():
+            if key in self.exclude:
+                continue
+            values = batch.get(key)
+            if values is None:
+                # Campo nuevo en este lote: nulo en los documentos anteriores del lote
+                values = batch[key] = [_MISSING] * position
+            values.append(value)
+            present += 1
+        
+        # Campos ausentes en este documento
+        position += 1
+        if present < len(batch):
+            for values in batch.values():
+                if len(values) < position:
+                    values.append(_MISSING)
+        self._batch_rows = position
+        
+        if position >= self.batch_size:
+            self.flush()
+
+    def extend(self, documents: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Incorporar una secuencia de documentos (p. ej. un cursor) lote a lote.
+        
+        Args:
+            documents: Documentos a incorporar
+        """
+        for document in documents:
+            self.add(document)
+
+    def flush(self) -> None:
+        """Convertir el lote en curso a arrays tipados y liberar sus valores."""
+        n = self._batch_rows
+        if not n:
+            return
+        
+        batch = self._batch
+        self._batch = {}
+        self._batch_rows = 0
+        self._append({key: n if values.count(None) + values.count(_MISSING) == n else pd.Series(values)
+                      for key, values in batch.items()}, n)
+    
+    def add_columns(self, columns: Dict[str, Union[np.ndarray, pd.Series, int]], n: int) -> None:
+        """
+        Incorporar un lote ya convertido a columnas.
+        
+        Args:
+            columns: Campo -> array de n valores, o n si el campo es nulo en todo el lote
+            n: Documentos del lote
+        """
+        self.flush()
+        if n:
+            self._append({key: chunk if isinstance(chunk, (int, pd.Series)) else pd.Series(chunk)
+                          for key, chunk in columns.items()}, n)
+    
+    def _append(self, columns: Dict[str, Union[pd.Series, int]], n: int) -> None:
+        """Registrar los arrays (o tramos de nulos) de un lote de n documentos."""
+        for key, chunk in columns.items():
+            chunks = self._chunks.get(key)
+            if chunks is None:
+                # Campo que aparece por primera vez: nulo en los lotes anteriores
+                chunks = self._chunks[key] = [self.rows] if self.rows else []
+            chunks.append(chunk)
+        
+        # Campos conocidos ausentes en todo el lote
+        for key, chunks in self._chunks.items():
+            if key not in columns:
+                chunks.append(n)
+        
+        self.rows += n
+    
+    def _assemble(self, chunks: List[Union[pd.Series, int]]) -> pd.Series:
+        """Unir los arrays de una columna rellenando sus tramos de nulos con el tipo de la columna."""
+        typed = [chunk for chunk in chunks if not isinstance(chunk, int)]
+        if not typed:
+            return pd.Series(np.full(self.rows, None, dtype=object))
+        if len(typed) == len(chunks):
+            return typed[0] if len(typed) == 1 else pd.concat(typed, ignore_index=True)
+        
+        null_dtype = _null_dtype(typed[0].dtype)
+        parts = [pd.Series(index=pd.RangeIndex(chunk), dtype=null_dtype) if isinstance(chunk, int) else chunk
+                 for chunk in chunks]
+        return pd.concat(parts, ignore_index=True)
+
+    def build(self) -> pd.DataFrame:
+        """
+        Obtener el DataFrame con todos los documentos incorporados.
+        
+        Las columnas se ensamblan de una en una y sus arrays parciales se liberan
+        en cuanto la columna está completa.
+        
+        Returns:
+            pd.DataFrame: Una columna por campo, en el orden en que aparecieron
+        """
+        self.flush()
+        columns = {}
+        for key in list(self._chunks):
+            columns[key] = self._assemble(self._chunks.pop(key))
+        return pd.DataFrame(columns, index=pd.RangeIndex(self.rows)) if columns else pd.DataFrame()
+
+
+def documents_to_frame(documents: Iterable[Mapping[str, Any]], batch_size: int = BATCH_SIZE,
+                       exclude: Sequence[str] = ('_id',)) -> pd.DataFrame:
+    """
+    Convertir documentos a un DataFrame por lotes, sin guardar la lista completa de diccionarios.
+
+    Args:
+        documents: Documentos o cursor de MongoDB
+        batch_size: Documentos por lote convertido a columnas
+        exclude: Campos que no se incorporan
+
+    Returns:
+        pd.DataFrame: Datos de los documentos (vacío si no hay ninguno)
+    """
+    builder = ColumnBuilder(batch_size, exclude)
+    builder.extend(documents)
+    return builder.build()
+
+
+def _document_layout(data: bytes, length: int,
+                     exclude: frozenset) -> Optional[Tuple[List[Tuple[str, int, int, int]], List[int]]]:
+    """
+    Analizar la disposición del primer documento de un lote BSON.
+    
+    Args:
+        data: Lote de documentos BSON concatenados
+        length: Longitud en bytes del primer documento
+        exclude: Campos que no se incorporan
+        
+    Returns:
+        Optional[Tuple]: Campos como (nombre, tipo, desplazamiento, bytes) y posiciones
+        de los bytes estructurales (longitudes, tipos y nombres); None si algún
+        campo no es de un tipo que pueda leerse directamente
+    """
+    fields = []
+    structural = list(range(4)) + [length - 1]
+    pos = 4
+    while pos < length - 1:
+        kind = data[pos]
+        key_end = data.index(b'\x00', pos + 1)
+        key = data[pos + 1:key_end].decode('utf-8')
+        value = key_end + 1
+        structural.extend(range(pos, value))
+        
+        if kind in _FIXED_TYPES:
+            size = _FIXED_TYPES[kind][0]
+        elif kind == _STRING:
+            # Longitud (incluye el nulo final), texto y nulo final
+            size = struct.unpack_from('<i', data, value)[0] - 1
+            structural.extend(range(value, value + 4))
+            structural.append(value + 4 + size)
+            value += 4
+        elif kind == _OBJECT_ID and key in exclude:
+            pos = value + 12
+            continue
+        else:
+            return None
+        
+        if key not in exclude:
+            fields.append((key, kind, value, size))
+        pos = value + size + (1 if kind == _STRING else 0)
+    return fields, structural
+
+
+def _decode_uniform_run(data: bytes, start: int,
+                        exclude: frozenset) -> Optional[Tuple[Dict[str, Union[np.ndarray, int]], int, int]]:
+    """
+    Decodificar a columnas el tramo de documentos que comparten disposición byte a byte.
+    
+    Es el caso de los documentos con los mismos campos, en el mismo orden, con
+    el mismo tipo y (para textos) la misma longitud, típico al proyectar campos
+    numéricos o de fecha. El tramo empieza en start y llega hasta el primer
+    documento con otra disposición; se ve como una matriz de documentos por
+    bytes y cada campo se extrae como una columna de la matriz, sin crear
+    objetos Python por documento.
+    
+    Args:
+        data: Lote de documentos BSON concatenados
+        start: Posición del primer documento del tramo
+        exclude: Campos que no se incorporan
+        
+    Returns:
+        Optional[Tuple]: Columnas del tramo, número de documentos y bytes que ocupan;
+        None si el primer documento contiene tipos que no se leen directamente
+    """
+    length = struct.unpack_from('<i', data, start)[0]
+    if length <= 4 or start + length > len(data):
+        return None
+    layout = _document_layout(data[start:start + length], length, exclude)
+    if layout is None:
+        return None
+    fields, structural = layout
+    
+    # Con los mismos bytes estructurales (longitud incluida) el documento tiene la misma disposición
+    candidates = (len(data) - start) // length
+    matrix = np.frombuffer(data, dtype=np.uint8, count=candidates * length, offset=start).reshape(candidates, length)
+    structural = np.asarray(structural)
+    same = (matrix[:, structural] == matrix[0, structural]).all(axis=1)
+    n = candidates if same.all() else int(np.argmin(same))
+    matrix = matrix[:n]
+    
+    columns: Dict[str, Union[np.ndarray, int]] = {}
+    for key, kind, offset, size in fields:
+        if kind == _STRING:
+            if not size:
+                columns[key] = np.full(n, '', dtype=object)
+                continue
+            raw = np.ascontiguousarray(matrix[:, offset:offset + size]).view(f'S{size}').ravel()
+            columns[key] = np.char.decode(raw, 'utf-8').astype(object)
+            continue
+        
+        read_dtype = _FIXED_TYPES[kind][1]
+        if read_dtype is None:
+            columns[key] = n
+            continue
+        values = np.ascontiguousarray(matrix[:, offset:offset + size]).view(read_dtype).ravel()
+        if kind == _DATETIME:
+            # Microsegundos, la unidad que infiere pandas para los datetime decodificados
+            # (sin desbordamiento: cubre cualquier fecha BSON en milisegundos)
+            values = values.view('datetime64[ms]').astype('datetime64[us]')
+        elif read_dtype == 'u1':
+            values = values != 0
+        elif read_dtype == '<i4':
+            values = values.astype(np.int64)
+        columns[key] = values
+    return columns, n, n * length
+
+
+def raw_batches_to_frame(batches: Iterable[bytes], exclude: Sequence[str] = ('_id',)) -> pd.DataFrame:
+    """
+    Convertir lotes de BSON sin decodificar (p. ej. de find_raw_batches) a un DataFrame.
+    
+    Los tramos de documentos uniformes (mismos campos, tipos y longitudes) se
+    leen directamente a arrays de NumPy, de modo que un lote que cambia de
+    disposición (p. ej. un campo que aparece a partir de cierto documento) se
+    lee en varios tramos. Cuando la disposición cambia de un documento a otro
+    (textos de longitud variable, campos ausentes salteados) el resto del lote
+    se decodifica con el decodificador C de bson y se vuelca en columnas como
+    cualquier otro lote. El resultado es el mismo que con documents_to_frame;
+    los campos ausentes en parte de los documentos quedan como NaN/NaT.
+    
+    Args:
+        batches: Lotes de documentos BSON concatenados
+        exclude: Campos que no se incorporan
+        
+    Returns:
+        pd.DataFrame: Datos de los documentos (vacío si no hay ninguno)
+    """
+    exclude = frozenset(exclude)
+    builder = ColumnBuilder(exclude=exclude)
+    for data in batches:
+        if not data:
+            continue
+        start = 0
+        while start < len(data):
+            run = _decode_uniform_run(data, start, exclude)
+            if run is None or (run[1] < MIN_UNIFORM_RUN and start + run[2] < len(data)):
+                builder.extend(decode_all(data[start:] if start else data))
+                break
+            columns, n, size = run
+            builder.add_columns(columns, n)
+            start += size
+    return builder.build()
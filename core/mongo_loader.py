@@ -3,6 +3,8 @@ from pymongo import MongoClient
 from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
 
+from core.mongo_columns import BATCH_SIZE, documents_to_frame, raw_batches_to_frame
+
 class MongoDBLoader:
     """
     Cargador especializado para datos de MongoDB con soporte para context managers.
@@ -11,16 +13,20 @@ class MongoDBLoader:
     en bases de datos MongoDB, con conversión automática a pandas DataFrame.
     """
     
-    def __init__(self, connection_string: Optional[str] = None, db_name: Optional[str] = None):
+    def __init__(self, connection_string: Optional[str] = None, db_name: Optional[str] = None,
+                 raw_bson: bool = False):
         """
         Inicializar el cargador de MongoDB con parámetros de conexión.
         
         Args:
             connection_string: URI de conexión a MongoDB (por defecto: mongodb://localhost:27017)
             db_name: Nombre de la base de datos a utilizar
+            raw_bson: Si True, las cargas piden lotes de BSON sin decodificar y leen los
+                      campos directamente a columnas (ver load_collection)
         """
         self.connection_string = connection_string or "mongodb://localhost:27017"
         self.db_name = db_name
+        self.raw_bson = raw_bson
         self.client = None  # Cliente de conexión MongoDB
         self.db = None      # Referencia a la base de datos activa
         
@@ -86,15 +92,27 @@ class MongoDBLoader:
         return self.db.list_collection_names()
     
     def load_collection(self, collection_name: str, query: Optional[Dict[str, Any]] = None, 
-                      limit: int = 0, projection: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+                      limit: int = 0, projection: Optional[Dict[str, Any]] = None,
+                      sort: Optional[List[Tuple[str, int]]] = None,
+                      batch_size: int = BATCH_SIZE, raw_bson: Optional[bool] = None) -> pd.DataFrame:
         """
         Cargar datos de una colección MongoDB en un DataFrame de pandas.
         
+        Los documentos se piden en lotes de batch_size y cada lote se vuelca
+        directamente en columnas tipadas, sin guardar la lista de documentos.
+        En modo raw_bson los lotes llegan sin decodificar: los tramos de
+        documentos con la misma disposición (mismos campos y tipos, lo habitual
+        al proyectar campos numéricos o de fecha) se leen directamente a arrays
+        de NumPy sin crear un diccionario por documento.
+        
         Args:
             collection_name: Nombre de la colección a consultar
             query: Filtro de consulta MongoDB (opcional)
             limit: Límite máximo de documentos a cargar (0 = sin límite)
             projection: Campos específicos a incluir o excluir (opcional)
+            sort: Orden de los documentos como lista de (campo, dirección) (opcional)
+            batch_size: Documentos por lote pedido al servidor y convertido a columnas
+            raw_bson: Decodificar lotes BSON directamente a columnas (None = modo del cargador)
             
         Returns:
             pd.DataFrame: DataFrame con los datos de la colección
@@ -110,31 +128,35 @@ class MongoDBLoader:
             # Obtener referencia a la colección
             collection = self.db[collection_name]
             
+            raw_bson = self.raw_bson if raw_bson is None else raw_bson
+            if raw_bson:
+                # El _id no se incorpora: no pedirlo ahorra bytes en cada lote
+                projection = dict(projection or {})
+                projection.setdefault('_id', 0)
+            
             # Construir y ejecutar consulta MongoDB
-            cursor = collection.find(
+            find = collection.find_raw_batches if raw_bson else collection.find
+            cursor = find(
                 query or {},        # Filtro de consulta (vacío por defecto)
                 projection or None  # Proyección de campos
-            )
+            ).batch_size(batch_size)
             
+            # Aplicar orden estable si se especifica (necesario para combinar proyecciones)
+            if sort:
+                cursor = cursor.sort(sort)
+                
             # Aplicar límite de documentos si se especifica
             if limit > 0:
                 cursor = cursor.limit(limit)
                 
-            # Convertir cursor a lista de documentos
-            documents = list(cursor)
+            # Volcar el cursor en columnas lote a lote (sin el _id específico de MongoDB)
+            df = raw_batches_to_frame(cursor) if raw_bson else documents_to_frame(cursor, batch_size)
             
             # Manejar caso de colección vacía
-            if not documents:
+            if len(df) == 0:
                 logging.info(f"La colección {collection_name} está vacía o no hay documentos que coincidan con la consulta")
                 return pd.DataFrame()
                 
-            # Convertir documentos a DataFrame
-            df = pd.DataFrame(documents)
-            
-            # Remover campo _id específico de MongoDB para limpieza
-            if '_id' in df.columns:
-                df = df.drop('_id', axis=1)
-                
             logging.info(f"Cargados {len(df)} documentos de la colección {collection_name}")
             return df
             
@@ -143,6 +165,63 @@ class MongoDBLoader:
             logging.error(error_msg)
             raise RuntimeError(error_msg)
     
+    def aggregate(self, collection_name: str, pipeline: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Ejecutar un pipeline de agregación y devolver el resultado como DataFrame.
+        
+        Args:
+            collection_name: Nombre de la colección a consultar
+            pipeline: Etapas del pipeline de agregación
+            
+        Returns:
+            pd.DataFrame: Documentos resultantes (vacío si no hay ninguno)
+            
+        Raises:
+            ConnectionError: Si no hay conexión establecida a MongoDB
+            RuntimeError: Si ocurre un error al ejecutar el pipeline
+        """
+        if self.db is None:
+            raise ConnectionError("No hay conexión establecida a MongoDB")
+            
+        try:
+            cursor = self.db[collection_name].aggregate(pipeline, allowDiskUse=True, batchSize=BATCH_SIZE)
+            df = documents_to_frame(cursor)
+            logging.info(f"Agregación sobre {collection_name}: {len(df)} documentos")
+            return df
+            
+        except Exception as e:
+            error_msg = f"Error al ejecutar la agregación sobre {collection_name}: {str(e)}"
+            logging.error(error_msg)
+            raise RuntimeError(error_msg)
+    
+    def date_fields(self, collection_name: str, fields: List[str]) -> List[str]:
+        """
+        Averiguar cuáles de los campos indicados guardan fechas BSON.
+        
+        Args:
+            collection_name: Nombre de la colección a consultar
+            fields: Campos a comprobar
+        
+        Returns:
+            List[str]: Campos con al menos un documento de tipo fecha
+        
+        Raises:
+            ConnectionError: Si no hay conexión establecida a MongoDB
+            RuntimeError: Si ocurre un error al consultar la colección
+        """
+        if self.db is None:
+            raise ConnectionError("No hay conexión establecida a MongoDB")
+        
+        try:
+            collection = self.db[collection_name]
+            return [field for field in fields
+                    if collection.find_one({field: {'$type': 'date'}}, {'_id': 1}) is not None]
+        
+        except Exception as e:
+            error_msg = f"Error al consultar los tipos de {collection_name}: {str(e)}"
+            logging.error(error_msg)
+            raise RuntimeError(error_msg)
+    
     def save_dataframe_to_collection(self, df: pd.DataFrame, collection_name: str, 
                                    drop_existing: bool = False) -> int:
         """
@@ -0,0 +1,199 @@
+from .data_loader import DataLoader
+from .csv_loader import CSVLoader
+from .compressed_stream import CSV_FILE_PATTERNS
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+import glob
+import os
+import logging
+from typing import Optional, Dict, Any, List
+
+
+def _parse_shard(path: str, dtype_profile: Optional[str], csv_options: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Parsear un fragmento CSV dentro de un proceso trabajador.
+
+    Se define a nivel de módulo para que pueda serializarse hacia el pool de procesos.
+    """
+    return CSVLoader(path, dtype_profile=dtype_profile, **csv_options).parse()
+
+
+def _is_arrow(dtype) -> bool:
+    """Indicar si un tipo está respaldado por Arrow (pd.ArrowDtype)."""
+    arrow_dtype = getattr(pd, "ArrowDtype", None)
+    return arrow_dtype is not None and isinstance(dtype, arrow_dtype)
+
+
+def _is_arrow_numeric(dtype) -> bool:
+    """Indicar si un tipo es numérico respaldado por Arrow."""
+    return _is_arrow(dtype) and dtype.numpy_dtype.kind in 'biuf'
+
+
+class MultiCSVLoader(DataLoader):
+    """
+    Cargador de datasets repartidos en varios archivos CSV (fragmentos).
+
+    Acepta un directorio o un patrón glob, parsea los fragmentos en paralelo
+    usando un pool de procesos y los concatena en un único DataFrame con
+    tipos de datos consistentes.
+    """
+
+    def __init__(self, pattern: str, max_workers: Optional[int] = None,
+                 dtype_profile: Optional[str] = None, **kwargs):
+        """
+        Inicializar el cargador de fragmentos.
+
+        Args:
+            pattern: Directorio con archivos CSV o patrón glob (p. ej. 'exports/*.csv')
+            max_workers: Número máximo de procesos (por defecto, uno por núcleo)
+            dtype_profile: Perfil de reducción de tipos aplicado a cada fragmento
+            **kwargs: Argumentos adicionales para pandas.read_csv
+        """
+        super().__init__(pattern)
+        self.max_workers = max_workers
+        self.dtype_profile = dtype_profile
+        self.csv_options = kwargs
+
+        self.metadata = {
+            "file_type": "csv",
+            "pattern": pattern
+        }
+
+    @staticmethod
+    def is_shard_pattern(path: str) -> bool:
+        """
+        Indicar si una ruta designa un conjunto de fragmentos en lugar de un archivo.
+
+        Args:
+            path: Ruta o patrón a evaluar
+
+        Returns:
+            bool: True si es un directorio o contiene comodines glob
+        """
+        return bool(path) and (os.path.isdir(path) or glob.has_magic(path))
+
+    def resolve_paths(self) -> List[str]:
+        """
+        Obtener la lista ordenada de archivos que componen el dataset.
+
+        Returns:
+            List[str]: Rutas de los fragmentos CSV
+
+        Raises:
+            FileNotFoundError: Si el patrón no coincide con ningún archivo
+        """
+        if os.path.isdir(self.path):
+            # Incluir también los fragmentos comprimidos (.csv.gz, .csv.zst, etc.)
+            patterns = [os.path.join(self.path, pattern) for pattern in CSV_FILE_PATTERNS]
+        else:
+            patterns = [self.path]
+
+        paths = sorted({p for pattern in patterns for p in glob.glob(pattern) if os.path.isfile(p)})
+        if not paths:
+            raise FileNotFoundError(f"No se encontraron archivos CSV para: {self.path}")
+        return paths
+
+    def load(self) -> pd.DataFrame:
+        """
+        Parsear todos los fragmentos en paralelo y combinarlos.
+
+        Returns:
+            pd.DataFrame: Dataset combinado
+
+        Raises:
+            FileNotFoundError: Si el patrón no coincide con ningún archivo
+            ValueError: Si algún fragmento no puede parsearse
+        """
+        paths = self.resolve_paths()
+        workers = min(self.max_workers or os.cpu_count() or 1, len(paths))
+        logging.info(f"Cargando {len(paths)} fragmentos CSV con {workers} procesos: {self.path}")
+
+        try:
+            if workers <= 1:
+                frames = [_parse_shard(path, self.dtype_profile, self.csv_options) for path in paths]
+            else:
+                # Parsear fragmentos en paralelo; map conserva el orden de los archivos
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    frames = list(executor.map(_parse_shard, paths,
+                                               [self.dtype_profile] * len(paths),
+                                               [self.csv_options] * len(paths)))
+        except pd.errors.EmptyDataError as e:
+            raise ValueError(f"Uno de los fragmentos CSV está vacío: {str(e)}")
+        except pd.errors.ParserError as e:
+            raise ValueError(f"Error al analizar un fragmento CSV: {str(e)}")
+
+        df = self.concat_frames(frames)
+
+        self.metadata.update({
+            "files": paths,
+            "shard_count": len(paths),
+            "rows": len(df),
+            "columns": len(df.columns)
+        })
+        self._dataframe = df
+        logging.info(f"Fragmentos combinados: {len(df)} filas, {len(df.columns)} columnas")
+        return df
+
+    @classmethod
+    def concat_frames(cls, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Concatenar fragmentos unificando antes los tipos de cada columna.
+
+        Args:
+            frames: DataFrames parseados de cada fragmento
+
+        Returns:
+            pd.DataFrame: DataFrame combinado con índice continuo
+        """
+        if len(frames) == 1:
+            return frames[0]
+
+        frames = cls._harmonize_dtypes(frames)
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _harmonize_dtypes(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """
+        Llevar cada columna a un tipo común en todos los fragmentos.
+
+        Los numéricos se promueven al tipo más amplio (p. ej. int8 + int16 -> int16),
+        las categorías se unifican y cualquier otra mezcla se convierte a object.
+        """
+        columns = {}
+        for frame in frames:
+            for column, dtype in frame.dtypes.items():
+                columns.setdefault(column, []).append(dtype)
+
+        targets = {}
+        for column, dtypes in columns.items():
+            if all(dtype == dtypes[0] for dtype in dtypes) and not isinstance(dtypes[0], pd.CategoricalDtype):
+                continue
+
+            if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+                # Unión ordenada de las categorías de todos los fragmentos
+                categories = pd.Index([])
+                for dtype in dtypes:
+                    categories = categories.union(dtype.categories)
+                targets[column] = pd.CategoricalDtype(categories)
+            elif all(isinstance(dtype, np.dtype) and dtype.kind in 'biuf' for dtype in dtypes):
+                targets[column] = np.result_type(*dtypes)
+            elif all(_is_arrow_numeric(dtype) for dtype in dtypes):
+                # Columnas Arrow (motor 'arrow'): promover sin salir de los búferes Arrow
+                common = np.result_type(*[dtype.numpy_dtype for dtype in dtypes])
+                targets[column] = pd.api.types.pandas_dtype(f"{common}[pyarrow]")
+            elif all(_is_arrow(dtype) for dtype in dtypes):
+                # Fechas o textos Arrow con distinta unidad o ancho: adoptar el del primer fragmento
+                targets[column] = dtypes[0]
+            else:
+                targets[column] = np.dtype(object)
+
+        if not targets:
+            return frames
+
+        harmonized = []
+        for frame in frames:
+            conversions = {col: dtype for col, dtype in targets.items()
+                           if col in frame.columns and frame[col].dtype != dtype}
+            harmonized.append(frame.astype(conversions) if conversions else frame)
+        return harmonized
@@ -0,0 +1,420 @@
+import operator
+from typing import Dict, List, Optional, Tuple, Any, Union
+
+import numpy as np
+import pandas as pd
+
+# Operadores de comparación admitidos por Query.filter
+FILTER_OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in', 'between')
+
+# Funciones de agregación admitidas por groupby y resample
+AGGREGATIONS = ('sum', 'mean', 'min', 'max', 'count', 'first', 'last', 'median', 'std')
+
+_COMPARATORS = {
+    '==': operator.eq, '!=': operator.ne, '<': operator.lt,
+    '<=': operator.le, '>': operator.gt, '>=': operator.ge
+}
+
+_MONGO_OPERATORS = {
+    '==': '$eq', '!=': '$ne', '<': '$lt', '<=': '$lte', '>': '$gt', '>=': '$gte', 'in': '$in'
+}
+
+# Acumuladores de $group equivalentes a cada agregación (median no tiene equivalente)
+_MONGO_ACCUMULATORS = {
+    'sum': '$sum', 'mean': '$avg', 'min': '$min', 'max': '$max',
+    'first': '$first', 'last': '$last', 'std': '$stdDevSamp'
+}
+
+# Pasos que reducen las filas a grupos: las columnas de origen dejan de ser accesibles después
+_AGGREGATING_STEPS = ('groupby', 'resample')
+
+
+def _mongo_value(value: Any) -> Any:
+    """Convertir valores de pandas/NumPy a tipos que acepta el driver de MongoDB."""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple, set)):
+        return [_mongo_value(item) for item in value]
+    return value
+
+
+def _mongo_date(value: Any) -> Any:
+    """Convertir un valor de fecha (texto, Timestamp o datetime) al datetime UTC sin zona que guarda MongoDB."""
+    if isinstance(value, (list, tuple, set)):
+        return [_mongo_date(item) for item in value]
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return value
+    try:
+        timestamp = pd.Timestamp(value.strip() if isinstance(value, str) else value)
+    except (ValueError, TypeError):
+        return _mongo_value(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp.to_pydatetime()
+
+
+class Predicate:
+    """Condición simple sobre una columna (columna, operador, valor)."""
+
+    def __init__(self, column: str, op: str, value: Any):
+        """
+        Crear una condición.
+
+        Args:
+            column: Nombre de la columna
+            op: Operador de FILTER_OPERATORS
+            value: Valor de comparación; lista para 'in' y (mínimo, máximo) para 'between'
+
+        Raises:
+            ValueError: Si el operador no está soportado o el valor no encaja con él
+        """
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Operador no soportado: {op}. Use uno de {FILTER_OPERATORS}")
+        if op == 'between' and (not isinstance(value, (list, tuple)) or len(value) != 2):
+            raise ValueError("El operador 'between' requiere un par (mínimo, máximo)")
+        if op == 'in' and not isinstance(value, (list, tuple, set)):
+            raise ValueError("El operador 'in' requiere una lista de valores")
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Evaluar la condición sobre un DataFrame (los nulos nunca la cumplen).
+
+        Args:
+            df: Datos con la columna de la condición
+
+        Returns:
+            pd.Series: Máscara booleana por fila
+        """
+        series = df[self.column]
+        if self.op == 'in':
+            return series.isin(list(self.value))
+        if self.op == 'between':
+            return series.between(self.value[0], self.value[1])
+        return _COMPARATORS[self.op](series, self.value).fillna(False).astype(bool)
+
+    def bounds(self) -> Optional[Tuple[Any, Any]]:
+        """
+        Límites inclusivos del rango que abarca la condición, para búsquedas en un índice ordenado.
+
+        Returns:
+            Optional[Tuple[Any, Any]]: (mínimo, máximo) con None si no hay límite,
+            o None si la condición no es un rango
+        """
+        if self.op in ('>', '>='):
+            return self.value, None
+        if self.op in ('<', '<='):
+            return None, self.value
+        if self.op == '==':
+            return self.value, self.value
+        if self.op == 'between':
+            return self.value[0], self.value[1]
+        return None
+
+    def has_text_value(self) -> bool:
+        """Indicar si algún valor de la condición es texto (posible fecha escrita como cadena)."""
+        values = self.value if isinstance(self.value, (list, tuple, set)) else [self.value]
+        return any(isinstance(value, str) for value in values)
+
+    def to_mongo(self, is_date: bool = False) -> Dict[str, Any]:
+        """
+        Expresar la condición como filtro de MongoDB.
+
+        Args:
+            is_date: Si el campo guarda fechas; los valores de texto se convierten
+                     entonces a fecha, igual que en los datos cargados con pandas
+
+        Returns:
+            Dict[str, Any]: Filtro sobre el campo de la condición
+        """
+        convert = _mongo_date if is_date else _mongo_value
+        if self.op == 'between':
+            low, high = self.value
+            return {self.column: {'$gte': convert(low), '$lte': convert(high)}}
+        return {self.column: {_MONGO_OPERATORS[self.op]: convert(self.value)}}
+
+    def __repr__(self) -> str:
+        return f"{self.column} {self.op} {self.value!r}"
+
+
+def apply_steps(df: pd.DataFrame, steps: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Ejecutar con pandas los pasos de un plan que no se delegaron al origen.
+
+    Args:
+        df: Datos leídos del origen
+        steps: Pasos restantes del plan, en orden
+
+    Returns:
+        pd.DataFrame: Resultado de la consulta
+    """
+    for step in steps:
+        kind = step['op']
+        if kind == 'select':
+            df = df[step['columns']]
+        elif kind == 'filter':
+            df = df[step['predicate'].mask(df)]
+        elif kind == 'groupby':
+            agg = step['agg']
+            df = df.groupby(step['keys'], sort=True)[list(agg)].agg(agg).reset_index()
+        elif kind == 'resample':
+            agg = step['agg']
+            df = df.resample(step['rule'], on=step['on'])[list(agg)].agg(agg).reset_index()
+        elif kind == 'limit':
+            df = df.iloc[:step['n']]
+    return df
+
+
+class QueryPlan:
+    """
+    Plan optimizado de una consulta.
+
+    Separa lo que se delega al origen de datos (columnas a leer, condiciones
+    y límite de filas) de los pasos que se ejecutan después con pandas.
+    """
+
+    def __init__(self, columns: Optional[List[str]], predicates: List[Predicate],
+                 limit: Optional[int], steps: List[Dict[str, Any]]):
+        """
+        Args:
+            columns: Columnas a leer del origen (None = todas)
+            predicates: Condiciones evaluadas al leer, antes de acumular filas
+            limit: Filas máximas a leer del origen tras aplicar las condiciones (None = sin límite)
+            steps: Pasos restantes, ejecutados sobre las filas leídas
+        """
+        self.columns = columns
+        self.predicates = predicates
+        self.limit = limit
+        self.steps = steps
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Ejecutar los pasos restantes sobre las filas leídas del origen."""
+        if df.empty and len(df.columns) == 0:
+            return df
+        return apply_steps(df, self.steps)
+
+    def mongo_pipeline(self, base_query: Optional[Dict[str, Any]] = None, source_limit: int = 0,
+                       date_columns: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Traducir el plan a un pipeline de agregación de MongoDB.
+
+        Las condiciones, la proyección, el límite y una agrupación cuyas
+        funciones tengan acumulador en MongoDB se ejecutan en el servidor.
+
+        Args:
+            base_query: Filtro con el que se definió el dataset
+            source_limit: Límite de documentos del dataset (0 = sin límite)
+            date_columns: Campos que guardan fechas (sus condiciones de texto se comparan como fecha)
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Pipeline y pasos
+            que quedan por ejecutar con pandas
+        """
+        pipeline: List[Dict[str, Any]] = []
+        if base_query:
+            pipeline.append({'$match': base_query})
+        if source_limit > 0:
+            # El dataset son los primeros documentos: limitar antes de filtrar
+            pipeline.append({'$limit': source_limit})
+        if self.predicates:
+            date_columns = set(date_columns or ())
+            pipeline.append({'$match': {'$and': [predicate.to_mongo(predicate.column in date_columns)
+                                                 for predicate in self.predicates]}})
+
+        steps = list(self.steps)
+        group_at = next((i for i, step in enumerate(steps) if step['op'] in _AGGREGATING_STEPS), None)
+        groupable = (group_at is not None and steps[group_at]['op'] == 'groupby'
+                     and all(step['op'] == 'select' for step in steps[:group_at])
+                     and all(func == 'count' or func in _MONGO_ACCUMULATORS
+                             for func in steps[group_at]['agg'].values()))
+
+        if groupable:
+            step = steps[group_at]
+            if self.limit is not None:
+                pipeline.append({'$limit': self.limit})
+            group: Dict[str, Any] = {'_id': {key: f'${key}' for key in step['keys']}}
+            for column, func in step['agg'].items():
+                if func == 'count':
+                    # count de pandas cuenta valores no nulos
+                    group[column] = {'$sum': {'$cond': [{'$gt': [f'${column}', None]}, 1, 0]}}
+                else:
+                    group[column] = {_MONGO_ACCUMULATORS[func]: f'${column}'}
+            pipeline.append({'$group': group})
+            pipeline.append({'$sort': {f'_id.{key}': 1 for key in step['keys']}})
+            projection = {'_id': 0}
+            projection.update({key: f'$_id.{key}' for key in step['keys']})
+            projection.update({column: 1 for column in step['agg']})
+            pipeline.append({'$project': projection})
+            steps = steps[group_at + 1:]
+
+            # Un límite inmediatamente posterior a la agrupación también se delega
+            if steps and steps[0]['op'] == 'limit':
+                pipeline.append({'$limit': steps[0]['n']})
+                steps = steps[1:]
+        else:
+            if self.columns is not None:
+                projection = {'_id': 0}
+                projection.update({column: 1 for column in self.columns})
+                pipeline.append({'$project': projection})
+            if self.limit is not None:
+                pipeline.append({'$limit': self.limit})
+        return pipeline, steps
+
+    def __str__(self) -> str:
+        lines = [f"Lectura: columnas={self.columns if self.columns is not None else 'todas'}",
+                 f"  condiciones={self.predicates or 'ninguna'}",
+                 f"  límite={self.limit if self.limit is not None else 'ninguno'}"]
+        for step in self.steps:
+            details = {key: value for key, value in step.items() if key != 'op'}
+            lines.append(f"{step['op']}: {details}")
+        return "\n".join(lines)
+
+
+class Query:
+    """
+    Constructor de consultas diferidas sobre un dataset del repositorio.
+
+    Cada método devuelve una consulta nueva con un paso más; nada se lee
+    hasta llamar a collect. Antes de ejecutar, el plan se optimiza: las
+    condiciones previas a cualquier agregación se delegan a la lectura
+    (bloques del CSV, filtro de MongoDB o índice ordenado del cache), solo se
+    leen las columnas que la consulta usa y un límite sin agregación previa
+    detiene la lectura en cuanto se alcanza.
+
+    Ejemplo:
+        repo.query(ruta).filter('fecha', '>=', '2024-01-01') \\
+            .resample('fecha', 'D', {'temperatura': 'mean'}).collect()
+    """
+
+    def __init__(self, repository: Any, identifier: str, steps: Tuple[Dict[str, Any], ...] = ()):
+        """
+        Args:
+            repository: DataRepository que ejecuta la consulta
+            identifier: Identificador del dataset (ruta, patrón de fragmentos o identificador MongoDB)
+            steps: Pasos acumulados
+        """
+        self.repository = repository
+        self.identifier = identifier
+        self.steps = steps
+
+    def _extend(self, step: Dict[str, Any]) -> "Query":
+        return Query(self.repository, self.identifier, self.steps + (step,))
+
+    @staticmethod
+    def _check_agg(agg: Dict[str, str]) -> Dict[str, str]:
+        if not agg:
+            raise ValueError("Indique al menos una columna a agregar")
+        unknown = [func for func in agg.values() if func not in AGGREGATIONS]
+        if unknown:
+            raise ValueError(f"Funciones de agregación no soportadas: {unknown}. Use {AGGREGATIONS}")
+        return dict(agg)
+
+    def select(self, *columns: str) -> "Query":
+        """Conservar solo las columnas indicadas."""
+        if not columns:
+            raise ValueError("Indique al menos una columna")
+        return self._extend({'op': 'select', 'columns': list(columns)})
+
+    def filter(self, column: str, op: str, value: Any) -> "Query":
+        """
+        Conservar las filas que cumplen una condición.
+
+        Args:
+            column: Columna a evaluar
+            op: Operador de FILTER_OPERATORS
+            value: Valor de comparación; lista para 'in' y (mínimo, máximo) para 'between'
+        """
+        return self._extend({'op': 'filter', 'predicate': Predicate(column, op, value)})
+
+    def groupby(self, keys: Union[str, List[str]], agg: Dict[str, str]) -> "Query":
+        """
+        Agrupar por una o varias columnas y agregar.
+
+        Args:
+            keys: Columna o columnas de agrupación (quedan como columnas del resultado)
+            agg: Función de AGGREGATIONS por columna agregada
+        """
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        return self._extend({'op': 'groupby', 'keys': keys, 'agg': self._check_agg(agg)})
+
+    def resample(self, on: str, rule: str, agg: Dict[str, str]) -> "Query":
+        """
+        Agregar por intervalos regulares de una columna de fechas.
+
+        Args:
+            on: Columna de fechas
+            rule: Frecuencia de pandas ('h', 'D', 'W', etc.)
+            agg: Función de AGGREGATIONS por columna agregada
+        """
+        return self._extend({'op': 'resample', 'on': on, 'rule': rule, 'agg': self._check_agg(agg)})
+
+    def limit(self, n: int) -> "Query":
+        """Conservar las primeras n filas."""
+        if n < 0:
+            raise ValueError("El límite no puede ser negativo")
+        return self._extend({'op': 'limit', 'n': int(n)})
+
+    @staticmethod
+    def _prune_select(step: Dict[str, Any], columns: List[str]) -> Optional[Dict[str, Any]]:
+        """Reducir una selección a las columnas que se leen (None si no queda ninguna)."""
+        kept = [column for column in step['columns'] if column in columns]
+        return {'op': 'select', 'columns': kept} if kept else None
+
+    def optimize(self) -> QueryPlan:
+        """
+        Construir el plan optimizado de la consulta.
+
+        Returns:
+            QueryPlan: Columnas, condiciones y límite delegados a la lectura, y pasos restantes
+        """
+        steps = list(self.steps)
+        agg_at = next((i for i, step in enumerate(steps) if step['op'] in _AGGREGATING_STEPS), len(steps))
+        boundary = next((i for i, step in enumerate(steps) if step['op'] == 'limit'), len(steps))
+        boundary = min(boundary, agg_at)
+
+        # Condiciones anteriores a cualquier límite o agregación: se evalúan al leer
+        predicates = [step['predicate'] for step in steps[:boundary] if step['op'] == 'filter']
+        remaining = [step for i, step in enumerate(steps) if i >= boundary or step['op'] != 'filter']
+
+        # Columnas usadas por la consulta (None = todas si nada las restringe)
+        filter_columns = [step['predicate'].column for step in steps[:agg_at] if step['op'] == 'filter']
+        if agg_at < len(steps):
+            step = steps[agg_at]
+            keys = step['keys'] if step['op'] == 'groupby' else [step['on']]
+            columns = list(dict.fromkeys(filter_columns + keys + list(step['agg'])))
+            # Las selecciones previas a la agregación se recortan a las columnas leídas
+            before = set(id(step) for step in steps[:agg_at] if step['op'] == 'select')
+            remaining = [self._prune_select(step, columns) if id(step) in before else step
+                         for step in remaining]
+            remaining = [step for step in remaining if step is not None]
+        else:
+            selects = [step['columns'] for step in steps if step['op'] == 'select']
+            columns = list(dict.fromkeys(filter_columns + selects[0])) if selects else None
+
+        # Un límite que solo sigue a condiciones y selecciones detiene la lectura
+        limit = None
+        if boundary < len(steps) and steps[boundary]['op'] == 'limit':
+            limit = steps[boundary]['n']
+            remaining.remove(steps[boundary])
+
+        return QueryPlan(columns, predicates, limit, remaining)
+
+    def explain(self) -> str:
+        """Describir el plan optimizado en texto."""
+        return str(self.optimize())
+
+    def collect(self) -> pd.DataFrame:
+        """
+        Ejecutar la consulta.
+
+        Returns:
+            pd.DataFrame: Resultado
+
+        Raises:
+            ValueError: Si el dataset no existe o la consulta no es válida para sus columnas
+        """
+        return self.repository.execute_query(self.identifier, self.optimize())
@@ -91,10 +91,6 @@ class App:
                 self.show_error("No se ha seleccionado ninguna fuente de datos.")
                 return
             
-            # Importar repositorio de datos (lazy loading)
-            from core.data_repository import DataRepository
-            repo = DataRepository()
-                
             # Determinar tipo de fuente y procesar apropiadamente
             is_mongodb = isinstance(data_source, str) and data_source.startswith("mongodb://")
             logging.info(f"Tipo de fuente de datos: {'MongoDB' if is_mongodb else 'Archivo'}")
@@ -158,16 +154,25 @@ class App:
         try:
             logging.info(f"Procesando archivo: {file_path}")
             
-            # Validar existencia del archivo
-            if not os.path.exists(file_path):
+            # Validar existencia del archivo (o del conjunto de fragmentos)
+            from core.multi_csv_loader import MultiCSVLoader
+            if not os.path.exists(file_path) and not MultiCSVLoader.is_shard_pattern(file_path):
                 self.show_error(f"El archivo no existe: {file_path}")
                 logging.error(f"El archivo no existe: {file_path}")
                 self.load_data()
                 return
                 
-            # Validar formato y contenido del archivo
+            # Validar formato y contenido del archivo en el catálogo compartido, que
+            # reutilizará el visualizador sin volver a parsear
             try:
-                df = pd.read_csv(file_path)
+                from core.data_repository import DataRepository
+                repo = DataRepository.get_shared_instance()
+                if os.path.isfile(file_path):
+                    # Leer solo el esquema y una muestra: el visualizador decide cómo cargar el resto
+                    repo.load_csv(file_path, columns=[])
+                    df = repo.get_preview(file_path, 1)
+                else:
+                    df, _ = repo.load_csv(file_path)
                 
                 # Verificar que el archivo contiene datos
                 if df.empty:
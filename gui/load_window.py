@@ -1,10 +1,13 @@
 from tkinter import Tk, Label, Button, Entry, filedialog, StringVar, OptionMenu, Frame, ttk, messagebox, font
 import tkinter as tk
 from core.csv_loader import CSVLoader
+from core.data_loader import LoadCancelledError
+from core.compressed_stream import CSV_FILE_PATTERNS
 from utils.csv_validator import ValidatorCSV
 import pandas as pd
 import logging
 import os
+import threading
 
 class LoadWindow(CSVLoader):
     """Ventana para subir un archivo CSV."""
@@ -21,6 +24,7 @@ class LoadWindow(CSVLoader):
     
     TIPOS_DATOS = ["int64", "float64", "object"]
     FUENTES_DATOS = ["Archivo CSV", "MongoDB"]
+    CHUNK_SIZE = 100000  # Filas por bloque en la carga progresiva de archivos
 
     def __init__(self):
         super().__init__(path="")
@@ -98,6 +102,8 @@ class LoadWindow(CSVLoader):
         self.mongodb_collection = StringVar(value="datos_prueba")
         self.validation_result_var = StringVar()  # Para mostrar resultados de validación
         self.data_identifier = None  # Para guardar la ruta del archivo o el ID de la conexión MongoDB
+        self.data_schema = {}  # Tipos por columna del archivo cargado (los datos viven en el repositorio)
+        self.data_rows = 0     # Filas del archivo cargado
 
     def _load_mongodb_config(self):
         """Cargar configuración de MongoDB de forma segura desde config.py"""
@@ -186,6 +192,13 @@ class LoadWindow(CSVLoader):
         )
         self.widgets['upload_button'].pack(side="left", padx=(0, 10))
         
+        # Botón para cancelar la carga en curso (visible solo mientras se carga)
+        self.widgets['cancel_load_button'] = ttk.Button(
+            btn_frame,
+            text="Cancelar carga",
+            command=self.cancel_load
+        )
+        
         # Mensaje de ayuda
         ttk.Label(self.csv_frame, text="Seleccione un archivo CSV para comenzar la validación.", 
                  style="Info.TLabel").pack(anchor="w", pady=(0, 5))
@@ -313,7 +326,7 @@ class LoadWindow(CSVLoader):
             
             # Cargar los datos
             print(f"Cargando datos desde: {conn_string}, {db_name}, {collection_name}")
-            repo = DataRepository()
+            repo = DataRepository.get_shared_instance()
             df, metadata = repo.load_from_mongodb(conn_string, db_name, collection_name)
             
             # Crear identificador para la conexión
@@ -401,47 +414,103 @@ class LoadWindow(CSVLoader):
         # Abrir diálogo para seleccionar archivo
         file_path = filedialog.askopenfilename(
             title="Seleccionar archivo CSV",
-            filetypes=[("Archivos CSV", "*.csv"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos CSV", " ".join(CSV_FILE_PATTERNS)), ("Todos los archivos", "*.*")]
         )
         
         if not file_path:
             return  # Cancelado por el usuario
             
+        # Preparar carga progresiva por bloques con posibilidad de cancelación
+        self.cancel_event = threading.Event()
+        self.widgets['upload_button'].config(state="disabled")
+        self.widgets['cancel_load_button'].pack(side="left", padx=(0, 10))
+        self.message_var.set("Cargando archivo...")
+        self.set_path(file_path)
+        
+        # Cargar el archivo una sola vez, en el catálogo compartido y en un hilo de trabajo:
+        # la ventana sigue respondiendo y el visualizador se abre con los datos ya en memoria
+        from core.data_repository import DataRepository
+        DataRepository.get_shared_instance().load_csv_in_background(
+            file_path,
+            on_done=lambda metadata, error: self._post(self._on_file_loaded, file_path, metadata, error),
+            chunksize=self.CHUNK_SIZE,
+            progress_callback=lambda *progress: self._post(self._on_load_progress, *progress),
+            cancel_event=self.cancel_event
+        )
+    
+    def _post(self, callback, *args):
+        """Ejecutar callback en el hilo de la interfaz (llamable desde el hilo de carga)."""
         try:
-            # Cargar el archivo CSV
-            self.set_path(file_path)
-            df = self.get_data()
-            
-            # Verificar que se cargó correctamente
-            if df.empty:
-                self.message_var.set("El archivo está vacío.")
-                return
-                
-            # Mostrar la ruta del archivo
-            self.file_path_var.set(file_path)
-            
-            # Guardar el identificador para uso posterior
-            self.data_identifier = file_path
-            
-            # Mostrar mensaje de éxito con información sobre el dataset
-            self.message_var.set(
-                f"Archivo cargado con éxito. "
-                f"Filas: {len(df)}, Columnas: {len(df.columns)}"
-            )
-            
-            # Activar botones
-            self.widgets['visualize_button'].config(state="normal")
-            self.widgets['validate_button'].config(state="normal")
-            
-            # Mostrar opciones de validación
-            self.validation_frame.pack(fill="x", pady=(0, 15))
+            self.root.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            # La ventana ya se cerró
+            pass
+    
+    def _on_file_loaded(self, file_path, metadata, error):
+        """
+        Mostrar el resultado de la carga en segundo plano de un archivo.
+        
+        Args:
+            file_path: Ruta al archivo cargado
+            metadata: Metadatos del dataset (None si la carga falló)
+            error: Excepción de la carga (None si terminó bien)
+        """
+        # Restaurar controles de carga
+        self.widgets['cancel_load_button'].pack_forget()
+        self.widgets['upload_button'].config(state="normal")
+        
+        if isinstance(error, LoadCancelledError):
+            self.set_path("")
+            self.message_var.set("Carga del archivo cancelada.")
+            return
+        if error is not None:
+            self.message_var.set(f"Error al cargar archivo: {str(error)}")
+            messagebox.showerror("Error", f"No se pudo cargar el archivo:\n{str(error)}")
+            return
             
-            # Actualizar lista de columnas disponibles
-            self.update_column_list(df.columns)
+        # La ventana solo conserva el esquema y el número de filas
+        self.data_schema = dict(metadata['dtypes'])
+        self.data_rows = metadata['rows']
+        
+        # Verificar que se cargó correctamente
+        if not self.data_rows:
+            self.message_var.set("El archivo está vacío.")
+            return
             
-        except Exception as e:
-            self.message_var.set(f"Error al cargar archivo: {str(e)}")
-            messagebox.showerror("Error", f"No se pudo cargar el archivo:\n{str(e)}")
+        # Mostrar la ruta del archivo
+        self.file_path_var.set(file_path)
+        
+        # Guardar el identificador para uso posterior
+        self.data_identifier = file_path
+        
+        # Mostrar mensaje de éxito con información sobre el dataset
+        self.message_var.set(
+            f"Archivo cargado con éxito. "
+            f"Filas: {self.data_rows}, Columnas: {len(self.data_schema)}"
+        )
+        
+        # Activar botones
+        self.widgets['visualize_button'].config(state="normal")
+        self.widgets['validate_button'].config(state="normal")
+        
+        # Mostrar opciones de validación
+        self.validation_frame.pack(fill="x", pady=(0, 15))
+        
+        # Actualizar lista de columnas disponibles
+        self.update_column_list(list(self.data_schema))
+    
+    def _on_load_progress(self, rows_read, bytes_read, total_bytes):
+        """Mostrar el progreso de la carga en segundo plano."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            return
+        percent = (bytes_read / total_bytes * 100) if total_bytes else 100
+        self.message_var.set(f"Cargando archivo... {rows_read} filas leídas ({percent:.0f}%)")
+    
+    def cancel_load(self):
+        """Solicitar la cancelación de la carga de archivo en curso."""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.message_var.set("Cancelando carga...")
     
     def connect_to_mongodb(self):
         """Conectar a MongoDB y cargar los datos."""
@@ -488,8 +557,8 @@ class LoadWindow(CSVLoader):
                     messagebox.showerror("Error", f"La colección '{collection_name}' no existe en la base de datos.")
                     return
                     
-                # Crear repositorio y cargar datos
-                repo = DataRepository()
+                # Cargar en el catálogo compartido
+                repo = DataRepository.get_shared_instance()
                 df, metadata = repo.load_from_mongodb(conn_string, db_name, collection_name)
                 
                 # Si llegamos aquí, la carga fue exitosa
@@ -550,6 +619,12 @@ class LoadWindow(CSVLoader):
         for collection in collections:
             listbox.insert(tk.END, collection)
         
+        # Precargar la colección resaltada mientras el usuario decide
+        listbox.bind(
+            "<<ListboxSelect>>",
+            lambda event: self.prefetch_highlighted_collection(listbox, conn_string, db_name)
+        )
+        
         # Frame para botones
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill="x", pady=15)
@@ -571,6 +646,15 @@ class LoadWindow(CSVLoader):
         )
         cancel_btn.pack(side="right", padx=5)
     
+    def prefetch_highlighted_collection(self, listbox, conn_string, db_name):
+        """Empezar a cargar en segundo plano la colección resaltada en la lista."""
+        selection = listbox.curselection()
+        if not selection:
+            return
+            
+        from core.data_repository import DataRepository
+        DataRepository.get_shared_instance().prefetch_mongodb(conn_string, db_name, listbox.get(selection[0]))
+    
     def on_collection_selected(self, window, listbox, conn_string, db_name):
         """Manejar selección de colección."""
         # Obtener índice seleccionado
@@ -602,9 +686,9 @@ class LoadWindow(CSVLoader):
             # Actualizar el campo de colección
             self.mongodb_collection.set(collection_name)
             
-            # Crear un repositorio para cargar los datos
+            # Cargar en el catálogo compartido, que reutilizará el visualizador
             from core.data_repository import DataRepository
-            repo = DataRepository()
+            repo = DataRepository.get_shared_instance()
             
             # Cargar los datos
             print(f"Intentando cargar datos de MongoDB: {conn_string}, {db_name}, {collection_name}")
@@ -657,8 +741,8 @@ class LoadWindow(CSVLoader):
             # Importar dinámicamente
             from core.data_repository import DataRepository
             
-            # Crear un repositorio temporal para la validación
-            repo = DataRepository()
+            # Usar el catálogo compartido: el dataset ya cargado no se vuelve a leer
+            repo = DataRepository.get_shared_instance()
             
             # Cargar los datos según la fuente
             if self.data_source_var.get() == "Archivo CSV":
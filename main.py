@@ -10,6 +10,7 @@ import os
 import logging
 import traceback
 import argparse
+import glob
 from typing import Optional, Union
 
 # Importar dependencias específicas al inicio
@@ -60,7 +61,7 @@ def parse_args() -> argparse.Namespace:
     source_group = parser.add_mutually_exclusive_group()
     source_group.add_argument(
         '--file', '-f', 
-        help='Ruta al archivo CSV para cargar automáticamente'
+        help='Ruta al archivo CSV, directorio o patrón glob de fragmentos CSV para cargar automáticamente'
     )
     source_group.add_argument(
         '--mongodb', '-m', 
@@ -85,6 +86,17 @@ def setup_file_data_source(file_path: str) -> Optional[str]:
     Returns:
         Identificador de la fuente de datos o None si hubo un error
     """
+    # Directorios y patrones glob se cargan como datasets fragmentados
+    if os.path.isdir(file_path) or glob.has_magic(file_path):
+        from core.multi_csv_loader import MultiCSVLoader
+        try:
+            MultiCSVLoader(file_path).resolve_paths()
+        except FileNotFoundError:
+            logging.error(f"No se encontraron archivos CSV para: {file_path}")
+            return None
+        logging.info(f"Usando fragmentos CSV: {file_path}")
+        return file_path
+    
     if not os.path.exists(file_path):
         logging.error(f"El archivo no existe: {file_path}")
         return None
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Permitir ejecutar las pruebas desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_repository import DataRepository
+
+
+@pytest.fixture
+def repository():
+    """Repositorio aislado sin volcado a disco."""
+    repo = DataRepository(spill_to_disk=False)
+    yield repo
+    repo.clear_cache()
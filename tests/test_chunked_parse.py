@@ -0,0 +1,31 @@
+import pandas as pd
+
+from core.csv_loader import CSVLoader
+
+
+def test_chunked_parse_matches_single_read(tmp_path):
+    """La lectura por bloques da el mismo DataFrame que la lectura de una vez."""
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='') as handle:
+        handle.write("n,x,texto\n")
+        for i in range(25):
+            # Un nulo en el último bloque convierte la columna entera en float
+            n = '' if i == 23 else str(i)
+            handle.write(f"{n},{i / 4},t{i % 3}\n")
+
+    progress = []
+    chunked = CSVLoader(path, chunksize=10, sniff_format=False,
+                        progress_callback=lambda *args: progress.append(args)).parse()
+
+    pd.testing.assert_frame_equal(chunked, pd.read_csv(path))
+    assert [rows for rows, _, _ in progress] == [10, 20, 25]
+
+
+def test_single_chunk_is_returned_as_is(tmp_path):
+    """Un archivo que cabe en un bloque se devuelve sin reensamblar."""
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='') as handle:
+        handle.write("a,b\n1,2\n3,4\n")
+
+    df = CSVLoader(path, chunksize=10, sniff_format=False).parse()
+    assert df.to_dict('list') == {'a': [1, 3], 'b': [2, 4]}
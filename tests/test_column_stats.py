@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.column_stats import ColumnStatistics
+from utils.csv_validator import ValidatorCSV
+
+
+def _merged_stats(frame, splits):
+    """Estadísticas construidas con el primer bloque y actualizadas con el resto."""
+    bounds = [0] + list(splits) + [len(frame)]
+    parts = [frame.iloc[start:end] for start, end in zip(bounds, bounds[1:])]
+    stats = ColumnStatistics(parts[0])
+    stats.ensure(parts[0], distinct=True)
+    for part in parts[1:]:
+        stats.append(part)
+    return stats
+
+
+def test_merged_summary_matches_pandas():
+    """Combinar bloques (Chan) da la misma media y desviación que pandas sobre todo el dataset."""
+    rng = np.random.default_rng(0)
+    values = rng.normal(1e9, 3.0, 1000)   # Media grande: la suma de cuadrados perdería precisión
+    values[[5, 500]] = np.nan
+    frame = pd.DataFrame({'v': values, 'n': rng.integers(0, 50, 1000)})
+
+    stats = _merged_stats(frame, [100, 101, 700])
+
+    for column in frame.columns:
+        summary = stats.get(column)
+        series = frame[column]
+        assert summary['count'] == series.count()
+        assert summary['nulls'] == series.isna().sum()
+        assert summary['min'] == series.min() and summary['max'] == series.max()
+        assert summary['mean'] == pytest.approx(series.mean(), rel=1e-12)
+        # Con sumas de cuadrados (Σx² - n·media²) el error superaría al propio m2
+        assert summary['std'] == pytest.approx(series.std(), rel=1e-6)
+    assert stats.get('n')['distinct'] == frame['n'].nunique()
+    assert stats.rows == len(frame)
+
+
+def test_merge_with_empty_block():
+    """Un bloque sin valores no altera media ni desviación."""
+    frame = pd.DataFrame({'v': [1.0, 2.0, 3.0, np.nan, np.nan]})
+    summary = _merged_stats(frame, [3]).get('v')
+    assert summary['mean'] == pytest.approx(2.0)
+    assert summary['std'] == pytest.approx(1.0)
+    assert summary['nulls'] == 2
+
+
+def test_datetime_range_is_merged():
+    """Las fechas conservan mínimo y máximo al añadir filas."""
+    dates = pd.Series(pd.to_datetime(['2024-01-02', None, '2024-01-01', '2024-03-01']), name='fecha')
+    stats = _merged_stats(dates.to_frame(), [2])
+    summary = stats.get('fecha')
+    assert summary['min'] == pd.Timestamp('2024-01-01')
+    assert summary['max'] == pd.Timestamp('2024-03-01')
+    assert summary['mean'] is None
+
+
+def test_bool_range_validation_scans_values():
+    """Los booleanos no tienen rango indexado: la validación recorre los valores."""
+    frame = pd.DataFrame({'activo': [True, False, True]})
+    stats = ColumnStatistics(frame)
+    stats.ensure(frame)
+    validator = ValidatorCSV(frame, stats)
+
+    assert validator.validate_value_ranges({'activo': {'min': 0, 'max': 1}})
+    with pytest.raises(ValueError):
+        validator.validate_value_ranges({'activo': {'min': 0, 'max': 0}})
+    assert validator.validate_value_range('activo', 0, 0) == (False, [True, True])
+
+
+def test_indexed_range_skips_scan():
+    """Con el mínimo y el máximo indexados dentro del rango la validación no recorre la columna."""
+    frame = pd.DataFrame({'v': [1.0, 5.0, 3.0]})
+    stats = ColumnStatistics(frame)
+    stats.ensure(frame)
+    validator = ValidatorCSV(frame, stats)
+
+    assert validator.validate_value_range('v', 0, 10) == (True, [])
+    assert validator.validate_value_range('v', 2, 10) == (False, [1.0])
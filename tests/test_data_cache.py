@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.columnar_cache import ColumnarCache
+from core.data_cache import DataCache
+
+
+def _frame(rows, start=0):
+    return pd.DataFrame({'x': np.arange(start, start + rows, dtype='int64'),
+                         'y': np.arange(start, start + rows) / 2})
+
+
+def _cache(tmp_path=None, entries=2, **kwargs):
+    """Cache con presupuesto para el número indicado de frames de 100 filas."""
+    spill = ColumnarCache(str(tmp_path)) if tmp_path is not None else None
+    return DataCache(max_bytes=entries * DataCache.measure(_frame(100)), spill_cache=spill, **kwargs)
+
+
+def test_lru_eviction_without_spill():
+    """Sin cache columnar se descarta la entrada usada hace más tiempo."""
+    evicted = []
+    cache = _cache(on_evict=lambda key, spilled: evicted.append((key, spilled)))
+    cache['a'] = _frame(100)
+    cache['b'] = _frame(100)
+    cache.get('a')              # 'b' pasa a ser la menos reciente
+    cache['c'] = _frame(100)
+
+    assert evicted == [('b', False)]
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.stats()['evictions'] == 1
+
+
+def test_spilled_entry_is_reloaded(tmp_path):
+    """Una entrada desalojada se vuelca a disco y se recupera igual al pedirla."""
+    pytest.importorskip('pyarrow')
+    cache = _cache(tmp_path)
+    cache['a'] = _frame(100)
+    cache['b'] = _frame(100)
+    cache['c'] = _frame(100)
+
+    assert not cache.is_resident('a') and 'a' in cache
+    pd.testing.assert_frame_equal(cache['a'], _frame(100))
+    assert cache.is_resident('a')
+    stats = cache.stats()
+    assert stats['spills'] >= 1 and stats['reloads'] == 1
+
+
+def test_appended_rows_are_spilled_with_entry(tmp_path):
+    """Las filas añadidas sin unir se incluyen en el volcado."""
+    pytest.importorskip('pyarrow')
+    cache = _cache(tmp_path, entries=3)
+    cache['a'] = _frame(100)
+    cache.append('a', _frame(20, start=100))
+    cache['b'] = _frame(100)
+    cache['c'] = _frame(100)
+
+    assert not cache.is_resident('a')
+    pd.testing.assert_frame_equal(cache['a'], _frame(120))
+
+
+def test_missing_spill_is_dropped(tmp_path):
+    """Si el archivo de volcado desaparece la entrada deja de estar disponible."""
+    pytest.importorskip('pyarrow')
+    cache = _cache(tmp_path)
+    cache['a'] = _frame(100)
+    cache['b'] = _frame(100)
+    cache['c'] = _frame(100)
+    assert 'a' in cache
+
+    for name in os.listdir(tmp_path):
+        os.remove(os.path.join(tmp_path, name))
+
+    assert 'a' not in cache
+    assert cache.get('a') is None
+    assert cache.stats()['spilled'] == 0
+
+
+def test_pop_discards_spill(tmp_path):
+    """Eliminar una entrada volcada borra también su archivo."""
+    pytest.importorskip('pyarrow')
+    spill = ColumnarCache(str(tmp_path))
+    cache = DataCache(max_bytes=2 * DataCache.measure(_frame(100)), spill_cache=spill)
+    cache['a'] = _frame(100)
+    cache['b'] = _frame(100)
+    cache['c'] = _frame(100)
+    assert spill.has_spill('a')
+
+    del cache['a']
+    assert not spill.has_spill('a') and 'a' not in cache
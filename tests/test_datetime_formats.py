@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from utils.datetime_utils import infer_datetime_format, materialize_datetimes
+
+
+@pytest.mark.parametrize('values, expected', [
+    (['25/03/2024', '01/04/2024'], '%d/%m/%Y'),
+    (['03/25/2024', '04/01/2024'], '%m/%d/%Y'),
+    (['13/01/2024 08:30', '01/02/2024 09:00'], '%d/%m/%Y %H:%M'),
+    (['2024-01-02', '2024-12-31'], '%Y-%m-%d'),
+])
+def test_slash_order_settled_by_component_over_12(values, expected):
+    """Un componente mayor que 12 decide el orden de día y mes."""
+    assert infer_datetime_format(values) == expected
+
+
+def test_ambiguous_slash_dates_stay_text():
+    """Si ningún componente supera 12 la columna no se convierte."""
+    values = ['01/02/2024', '03/04/2024', '12/12/2024']
+    assert infer_datetime_format(values) is None
+    assert infer_datetime_format(values, ambiguous=True) == '%d/%m/%Y'
+
+    df, formats = materialize_datetimes(pd.DataFrame({'fecha': values}))
+    assert formats['fecha'] is None
+    assert df['fecha'].tolist() == values
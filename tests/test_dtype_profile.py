@@ -0,0 +1,19 @@
+from core.csv_loader import CSVLoader
+from utils.datetime_utils import materialize_datetimes
+
+
+def test_compact_profile_keeps_low_cardinality_dates(tmp_path):
+    """El perfil 'compact' deja las fechas en texto repetidas para materialize_datetimes."""
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='') as handle:
+        handle.write("fecha,tienda,importe\n")
+        for i in range(30):
+            handle.write(f"2{i % 3 + 1}/01/2024 10:00,A,{i}\n")
+
+    # Sin detección de formato, como en flujos que no son archivos
+    df = CSVLoader(path, dtype_profile='compact', sniff_format=False).parse()
+    df, formats = materialize_datetimes(df)
+
+    assert formats['fecha'] == '%d/%m/%Y %H:%M'
+    assert str(df['fecha'].dtype) == 'datetime64[ns]'
+    assert df['tienda'].dtype == 'category'
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+
+def _append(path, text):
+    with open(path, 'a', newline='') as handle:
+        handle.write(text)
+
+
+def test_partial_record_at_start_is_not_duplicated(tmp_path, repository):
+    """Un registro a medio escribir al activar el seguimiento se incorpora una sola vez, completo."""
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='') as handle:
+        handle.write("a,b\n1,2\n3,4\n5,")
+
+    repository.start_following(path)
+    df, _ = repository.load_csv(path)
+    assert df.to_dict('list') == {'a': [1, 3], 'b': [2, 4]}
+
+    # El registro sigue incompleto: no hay filas nuevas
+    assert repository.refresh_followed(path) == 0
+
+    _append(path, "6\n7,")
+    assert repository.refresh_followed(path) == 1
+    _append(path, "8\n")
+    assert repository.refresh_followed(path) == 1
+
+    df, _ = repository.load_csv(path)
+    assert df['a'].tolist() == [1, 3, 5, 7]
+    assert df['b'].tolist() == [2, 4, 6, 8]
+
+
+def test_partial_record_after_reload_is_not_duplicated(tmp_path, repository):
+    """Al recargar un archivo reemplazado que termina a medias, la fila parcial no se duplica."""
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='') as handle:
+        handle.write("a,b\n1,2\n3,4\n5,6\n")
+    repository.start_following(path)
+
+    # Archivo truncado (más corto) y reescrito con un último registro sin terminar
+    with open(path, 'w', newline='') as handle:
+        handle.write("a,b\n9,9\n7,")
+    repository.refresh_followed(path)
+    _append(path, "8\n")
+    repository.refresh_followed(path)
+
+    df, _ = repository.load_csv(path)
+    assert df.to_dict('list') == {'a': [9, 7], 'b': [9, 8]}
+
+
+def test_appended_rows_update_stats_without_rebuilding(tmp_path, repository):
+    """Las filas añadidas se ven en los datos y en las estadísticas tras varios refrescos."""
+    path = str(tmp_path / 'datos.csv')
+    pd.DataFrame({'a': range(100), 'b': [0.5] * 100}).to_csv(path, index=False)
+    repository.start_following(path)
+    repository.get_column_stats(path, ['a'])
+
+    for start in range(100, 130, 10):
+        _append(path, "".join(f"{i},1.5\n" for i in range(start, start + 10)))
+        assert repository.refresh_followed(path) == 10
+
+    df, _ = repository.load_csv(path)
+    assert df['a'].tolist() == list(range(130))
+    stats = repository.get_column_stats(path, ['a', 'b'])
+    assert stats['a']['count'] == 130 and stats['a']['max'] == 129
+    assert stats['b']['sum'] == pytest.approx(100 * 0.5 + 30 * 1.5)
@@ -0,0 +1,54 @@
+import pytest
+
+from core.csv_loader import CSVLoader
+from core.format_sniffer import FormatSniffer
+
+
+def _sniff(text):
+    return FormatSniffer.sniff_sample(text.encode('utf-8'), complete=True)
+
+
+@pytest.mark.parametrize('text, sep, decimal, thousands', [
+    ("a;b\n1,5;2\n3,25;4\n", ';', ',', None),
+    ("a,b\n1.5,2\n3.25,4\n", ',', '.', None),
+    # 1,000 no vota por la coma decimal: sin otros valores es separador de miles
+    ("a;b\n1,000;2\n2,500;3\n", ';', '.', ','),
+    # Con otros decimales con coma, 1.000 es separador de miles
+    ("a;b\n1.000;2,5\n2.500;3,5\n", ';', ',', '.'),
+    # Sin decimales con coma, 1.500 es decimal
+    ("a;b\n1.500;2\n2.250;3\n", ';', '.', None),
+    ("a;b\n1.234,5;2\n", ';', ',', '.'),
+    ("a\tb\n1,234.5\t2\n", '\t', '.', ','),
+])
+def test_number_format_votes(text, sep, decimal, thousands):
+    """Los separadores decimal y de miles se deciden por votos de los valores numéricos."""
+    profile = _sniff(text)
+    assert (profile['sep'], profile['decimal'], profile['thousands']) == (sep, decimal, thousands)
+
+
+@pytest.mark.parametrize('text, header', [
+    ("nombre,valor\nA,1\n", 0),
+    ("2020,2021\n1,2\n", 0),        # Años: se mantienen como cabecera, igual que pandas
+    ("1.5,2.5\n3.5,4.5\n", None),   # Decimales: la primera fila son datos
+    ("25/03/2024,1.5\n26/03/2024,2.5\n", None),
+])
+def test_header_detection(text, header):
+    """La primera fila solo se toma como datos si tiene decimales y el resto parecen números o fechas."""
+    assert _sniff(text)['header'] == header
+
+
+def test_datetime_columns_in_profile():
+    """Las columnas de fecha entran en el perfil con su formato."""
+    profile = _sniff("fecha;valor\n25/03/2024;1\n26/03/2024;2\n")
+    assert profile['datetime_columns'] == {'fecha': '%d/%m/%Y'}
+
+
+def test_sniffed_options_parse_european_numbers(tmp_path):
+    """El perfil detectado se traduce en opciones explícitas para pandas."""
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        handle.write("importe;precio\n1.000;2,5\n2.500;3,75\n")
+
+    df = CSVLoader(path).parse()
+    assert df['importe'].tolist() == [1000, 2500]
+    assert df['precio'].tolist() == [2.5, 3.75]
@@ -0,0 +1,68 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+bson = pytest.importorskip('bson')
+
+from core.mongo_columns import MIN_UNIFORM_RUN, documents_to_frame, raw_batches_to_frame
+
+
+def _batch(documents):
+    return b''.join(bson.encode(document) for document in documents)
+
+
+def _reference(batches):
+    """Conversión por diccionarios de los mismos lotes."""
+    return documents_to_frame(document for batch in batches for document in bson.decode_all(batch))
+
+
+START = datetime.datetime(2024, 1, 1)
+
+# Lote uniforme: se lee directamente a columnas
+UNIFORM = [{'fecha': START + datetime.timedelta(hours=i), 'valor': float(i), 'n': i, 'ok': bool(i % 2),
+            'sensor': 'A1'} for i in range(4)]
+
+# Lote con textos de longitud variable, un campo ausente y otro nulo: se decodifica
+MIXED = [
+    {'fecha': START + datetime.timedelta(days=1), 'valor': 1.5, 'n': 7, 'ok': True, 'sensor': 'B12'},
+    {'fecha': START + datetime.timedelta(days=2), 'valor': None, 'ok': False, 'sensor': 'C'},
+    {'fecha': START + datetime.timedelta(days=3), 'valor': 3.5, 'n': 9, 'ok': True, 'sensor': 'D1',
+     'extra': 'x'},
+]
+
+# Lote que cambia de disposición a mitad: dos tramos uniformes largos
+EVOLVING = ([{'fecha': START, 'valor': float(i), 'n': i} for i in range(MIN_UNIFORM_RUN)]
+            + [{'fecha': START, 'valor': float(i), 'n': i, 'ok': True} for i in range(MIN_UNIFORM_RUN + 3)])
+
+# Lote uniforme con otro orden de campos y sin 'ok'
+REORDERED = [{'sensor': 'Z9', 'n': 100 + i, 'valor': -float(i), 'fecha': START} for i in range(3)]
+
+
+@pytest.mark.parametrize('batches', [
+    [_batch(UNIFORM)],
+    [_batch(MIXED)],
+    [_batch(UNIFORM), _batch(MIXED), _batch(REORDERED)],
+    [_batch(MIXED), _batch(UNIFORM), _batch(UNIFORM)],
+    [_batch(EVOLVING), _batch(MIXED + EVOLVING), _batch(EVOLVING + MIXED)],
+])
+def test_raw_batches_match_document_decoding(batches):
+    """Los lotes crudos, uniformes o no, dan el mismo DataFrame que los documentos decodificados."""
+    pd.testing.assert_frame_equal(raw_batches_to_frame(batches), _reference(batches))
+
+
+def test_uniform_batch_keeps_types():
+    """Un lote uniforme conserva fechas, números, booleanos y textos."""
+    df = raw_batches_to_frame([_batch(UNIFORM)])
+    assert pd.api.types.is_datetime64_any_dtype(df['fecha'])
+    assert df['valor'].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert df['n'].dtype == 'int64'
+    assert df['ok'].tolist() == [False, True, False, True]
+    assert df['sensor'].tolist() == ['A1'] * 4
+
+
+def test_object_id_is_excluded():
+    """El _id de MongoDB no se incorpora como columna."""
+    documents = [{'_id': bson.ObjectId(), 'valor': float(i)} for i in range(3)]
+    df = raw_batches_to_frame([_batch(documents)])
+    assert list(df.columns) == ['valor']
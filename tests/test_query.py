@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / 'ventas.csv')
+    pd.DataFrame({
+        'tienda': ['A', 'A', 'B', 'B', 'C'],
+        'importe': [10.0, 20.0, 5.0, 7.0, 1.0],
+        'unidades': [1, 2, 1, 1, 3],
+        'nota': ['x', 'y', 'z', 'w', 'v']
+    }).to_csv(path, index=False)
+    return path
+
+
+EXPECTED = pd.DataFrame({'tienda': ['A', 'B', 'C'], 'importe': [30.0, 12.0, 1.0]})
+
+
+def test_select_then_groupby_from_csv_chunks(repository, csv_path):
+    """Una selección previa a la agregación no pide columnas que la lectura ya no trae."""
+    result = repository.query(csv_path).select('tienda', 'importe', 'nota') \
+        .groupby('tienda', {'importe': 'sum'}).collect()
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), EXPECTED)
+
+
+def test_select_then_groupby_from_cached_frame(repository, csv_path):
+    repository.load_csv(csv_path)
+    result = repository.query(csv_path).select('tienda', 'importe', 'nota') \
+        .groupby('tienda', {'importe': 'sum'}).collect()
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), EXPECTED)
+
+
+def test_plan_prunes_columns_and_select_steps(repository, csv_path):
+    plan = repository.query(csv_path).select('tienda', 'importe', 'nota') \
+        .filter('unidades', '>', 1).groupby('tienda', {'importe': 'sum'}).optimize()
+    assert plan.columns == ['unidades', 'tienda', 'importe']
+    assert [step['op'] for step in plan.steps] == ['select', 'groupby']
+    assert plan.steps[0]['columns'] == ['tienda', 'importe']
+
+
+def test_filter_and_limit_are_pushed_to_the_read(repository, csv_path):
+    query = repository.query(csv_path).filter('importe', '>=', 5).select('tienda', 'importe').limit(2)
+    plan = query.optimize()
+    assert plan.limit == 2 and len(plan.predicates) == 1
+    result = query.collect()
+    assert result['importe'].tolist() == [10.0, 20.0]
+    assert list(result.columns) == ['tienda', 'importe']
+
+
+def test_cached_and_csv_paths_agree(repository, csv_path):
+    query = repository.query(csv_path).filter('tienda', 'in', ['A', 'C']).select('tienda', 'unidades')
+    from_csv = query.collect().reset_index(drop=True)
+    repository.load_csv(csv_path)
+    from_cache = query.collect().reset_index(drop=True)
+    pd.testing.assert_frame_equal(from_csv, from_cache)
+    assert from_cache['unidades'].tolist() == [1, 2, 3]
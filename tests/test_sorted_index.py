@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sorted_index import SortedIndex
+
+
+def test_sorted_column_returns_slice():
+    """Una columna ya ordenada se consulta como intervalo contiguo, con límites incluidos."""
+    index = SortedIndex(pd.Series([1.0, 2.0, 2.0, 3.0, 5.0], name='x'))
+    assert index.order is None
+    assert index.positions(2, 3) == slice(1, 4)
+    assert index.positions(None, 1) == slice(0, 1)
+    assert index.positions(4, 4) == slice(4, 4)
+
+
+def test_unsorted_column_skips_nan():
+    """En una columna desordenada se devuelven posiciones en orden de valor, sin nulos."""
+    index = SortedIndex(pd.Series([5.0, np.nan, 1.0, 3.0, 3.0], name='x'))
+    assert index.positions(2, 5).tolist() == [3, 4, 0]
+    assert index.positions().tolist() == [2, 3, 4, 0]
+
+
+def test_datetime_column_skips_nat_and_parses_text_bounds():
+    """Las fechas se consultan con límites de texto y NaT no entra en ningún rango."""
+    values = pd.Series(pd.to_datetime(['2024-01-03', None, '2024-01-01', '2024-01-02']), name='fecha')
+    index = SortedIndex(values)
+    assert index.positions('2024-01-01', '2024-01-02').tolist() == [2, 3]
+    assert index.positions().tolist() == [2, 3, 0]
+
+
+def test_naive_bound_is_localized_to_column_timezone():
+    """Un límite sin zona se interpreta en la hora local de una columna con zona."""
+    values = pd.Series(pd.date_range('2024-01-01 00:00', periods=4, freq='h', tz='Europe/Madrid'), name='fecha')
+    index = SortedIndex(values)
+    assert index.positions('2024-01-01 01:00', '2024-01-01 02:00') == slice(1, 3)
+    assert index.positions(pd.Timestamp('2024-01-01 00:00', tz='UTC')) == slice(1, 4)
+
+
+def test_invalid_bound_raises():
+    """Un límite que no es número ni fecha se rechaza con ValueError."""
+    index = SortedIndex(pd.Series([1, 2, 3], name='x'))
+    with pytest.raises(ValueError):
+        index.positions('abc')
+
+
+def test_append_keeps_and_breaks_order():
+    """Las filas añadidas que siguen el orden no crean permutación; las que lo rompen sí."""
+    index = SortedIndex(pd.Series([1.0, 2.0], name='x'))
+    index.append(pd.Series([1.0, 2.0, 4.0], name='x'))
+    assert index.order is None and index.positions(2, 4) == slice(1, 3)
+
+    index.append(pd.Series([1.0, 2.0, 4.0, 0.0], name='x'))
+    assert index.rows == 4
+    assert index.positions(None, 1).tolist() == [3, 0]
+
+
+def test_get_range_sees_replaced_column(tmp_path, repository):
+    """Tras sustituir la columna indexada, el rango se resuelve sobre los valores nuevos."""
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='') as handle:
+        handle.write("x,y\n1,a\n2,b\n3,c\n")
+    repository.load_csv(path)
+    assert repository.get_range(path, 'x', 2, 3)['y'].tolist() == ['b', 'c']
+
+    repository.update_columns(path, {'x': pd.Series([30, 20, 10])})
+    assert repository.get_range(path, 'x', 15, 30)['y'].tolist() == ['b', 'a']
@@ -0,0 +1,41 @@
+
+def _load(tmp_path, repository, text):
+    path = str(tmp_path / 'datos.csv')
+    with open(path, 'w', newline='') as handle:
+        handle.write(text)
+    repository.load_csv(path)
+    return path
+
+
+def test_conversion_is_published_without_fill(tmp_path, repository):
+    """La columna convertida se publica aunque no se rellenen nulos."""
+    path = _load(tmp_path, repository, "a,b\n1,x\n2,y\n")
+    version = repository.dataset_versions[path]
+
+    result = repository.validate_column(path, 'a', 'float64')
+
+    assert result['validated'] and result['actual_type'] == 'float64'
+    assert repository.dataset_versions[path] == version + 1
+    df, _ = repository.load_csv(path)
+    assert df['a'].dtype == 'float64'
+
+
+def test_fill_is_published_and_reported(tmp_path, repository):
+    """El relleno de nulos se publica con el tipo convertido."""
+    path = _load(tmp_path, repository, "a,b\n1,x\n,y\n")
+
+    result = repository.validate_column(path, 'a', 'int64', fill_null_with=0)
+
+    assert result['validated'] and result['actual_type'] == 'int64'
+    df, _ = repository.load_csv(path)
+    assert df['a'].tolist() == [1, 0]
+    assert df['a'].dtype == 'int64'
+
+
+def test_unchanged_column_keeps_version(tmp_path, repository):
+    """Sin conversión ni relleno no se publica una versión nueva."""
+    path = _load(tmp_path, repository, "a,b\n1,x\n2,y\n")
+    version = repository.dataset_versions[path]
+
+    assert repository.validate_column(path, 'a', 'int64')['validated']
+    assert repository.dataset_versions[path] == version
@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+import warnings
+from typing import Dict, List, Optional, Tuple, Any
+
+from utils.datetime_utils import is_datetime_like, epoch_view
+
+# Filas por tramo en el nivel más fino de la pirámide (los siguientes duplican el tamaño)
+BASE_BUCKET_SIZE = 32
+
+# Filas convertidas a float64 de una vez al construir el primer nivel
+BUILD_CHUNK_ROWS = BASE_BUCKET_SIZE * 32768
+
+_STATS = ('min', 'max', 'sum', 'count')
+
+
+def _axis_keys(x: Any, n: int) -> np.ndarray:
+    """
+    Claves ordenables del eje X: nanosegundos para fechas, el valor para números
+    y la posición para el resto (textos, categorías).
+    """
+    if x is not None and is_datetime_like(x):
+        return epoch_view(x)
+    if x is not None and pd.api.types.is_numeric_dtype(getattr(x, 'dtype', None)) \
+            and not pd.api.types.is_bool_dtype(x.dtype):
+        return x.to_numpy(dtype='float64', na_value=np.nan)
+    return np.arange(n, dtype='int64')
+
+
+def _reduce_rows(series: pd.Series) -> Dict[str, np.ndarray]:
+    """Agregar filas consecutivas en tramos de BASE_BUCKET_SIZE (el último puede quedar incompleto)."""
+    if series.empty:
+        return {stat: np.empty(0, dtype=np.int64 if stat == 'count' else 'float64') for stat in _STATS}
+    parts = []
+    for start in range(0, len(series), BUILD_CHUNK_ROWS):
+        values = series.iloc[start:start + BUILD_CHUNK_ROWS].to_numpy(dtype='float64', na_value=np.nan)
+        pad = -len(values) % BASE_BUCKET_SIZE
+        if pad:
+            values = np.concatenate([values, np.full(pad, np.nan)])
+        buckets = values.reshape(-1, BASE_BUCKET_SIZE)
+        with warnings.catch_warnings():
+            # Tramos sin valores: min y max quedan como NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            parts.append({
+                'min': np.nanmin(buckets, axis=1),
+                'max': np.nanmax(buckets, axis=1),
+                'sum': np.nansum(buckets, axis=1),
+                'count': np.count_nonzero(~np.isnan(buckets), axis=1).astype(np.int64)
+            })
+    return {stat: np.concatenate([part[stat] for part in parts]) for stat in _STATS}
+
+
+def _reduce_pairs(level: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Combinar los tramos de un nivel de dos en dos para obtener el siguiente."""
+    if len(level['count']) % 2:
+        level = {stat: np.append(values, np.nan if stat in ('min', 'max') else 0)
+                 for stat, values in level.items()}
+    return {
+        'min': np.fmin(level['min'][0::2], level['min'][1::2]),
+        'max': np.fmax(level['max'][0::2], level['max'][1::2]),
+        'sum': level['sum'][0::2] + level['sum'][1::2],
+        'count': (level['count'][0::2] + level['count'][1::2]).astype(np.int64)
+    }
+
+
+class AggregatePyramid:
+    """
+    Pirámide de agregados (mínimo, máximo, suma y conteo) de un dataset a varias resoluciones.
+
+    El nivel k agrupa BASE_BUCKET_SIZE * 2**k filas consecutivas por tramo y se
+    calcula combinando de dos en dos los tramos del nivel anterior, de modo que
+    la pirámide completa ocupa menos que la columna original. Para un rango del
+    eje X se elige el nivel más fino que no supera los puntos pedidos: el coste
+    de la consulta depende de los píxeles y no del número de filas. Al añadir
+    filas al final solo se recalculan los tramos afectados.
+    """
+
+    def __init__(self, df: pd.DataFrame, x_column: Optional[str] = None,
+                 keys: Optional[np.ndarray] = None):
+        """
+        Crear la pirámide de un dataset (los niveles de cada columna se construyen con ensure).
+
+        Args:
+            df: Datos del dataset
+            x_column: Columna del eje X (None = índice del DataFrame)
+            keys: Claves del eje X ya calculadas (p. ej. la vista en nanosegundos
+                  cacheada por el repositorio); None = calcularlas
+
+        Raises:
+            ValueError: Si el eje X no está ordenado de forma ascendente
+        """
+        self.x_column = x_column
+        self.rows = 0
+        self.keys = np.empty(0)
+        self.is_datetime = False   # Claves en nanosegundos desde epoch
+        self._levels: Dict[str, List[Dict[str, np.ndarray]]] = {}
+        self._set_keys(df, keys)
+
+    def _set_keys(self, df: pd.DataFrame, keys: Optional[np.ndarray] = None) -> None:
+        """Actualizar las claves del eje X comprobando el orden de las filas nuevas."""
+        x = df[self.x_column] if self.x_column is not None else df.index
+        keys = _axis_keys(x, len(df)) if keys is None else keys
+        self.is_datetime = is_datetime_like(x)
+        checked = keys[max(self.rows - 1, 0):]
+        if len(checked) > 1 and not (np.diff(checked) >= 0).all():
+            raise ValueError("El eje X no está ordenado; no se puede consultar por rango")
+        self.keys = keys
+        self.rows = len(df)
+
+    def copy(self) -> "AggregatePyramid":
+        """
+        Obtener una copia independiente de la pirámide (coste por columna, no por fila).
+
+        Los niveles y las claves no se modifican nunca en su sitio (se sustituyen),
+        así que la copia los comparte; permite actualizarla sin bloquear a quien
+        consulte la original y publicarla después.
+
+        Returns:
+            AggregatePyramid: Copia con las mismas claves y niveles
+        """
+        clone = AggregatePyramid.__new__(AggregatePyramid)
+        clone.x_column = self.x_column
+        clone.rows = self.rows
+        clone.keys = self.keys
+        clone.is_datetime = self.is_datetime
+        clone._levels = dict(self._levels)
+        return clone
+
+    @property
+    def columns(self) -> List[str]:
+        """Columnas con niveles construidos."""
+        return list(self._levels)
+
+    def ensure(self, df: pd.DataFrame, columns: List[str]) -> None:
+        """
+        Construir los niveles de las columnas que aún no los tienen.
+
+        Args:
+            df: Datos completos actuales del dataset
+            columns: Columnas numéricas requeridas
+        """
+        for column in columns:
+            if column not in self._levels:
+                self._levels[column] = self._build(df[column], [], 0)
+
+    def discard(self, columns: List[str]) -> None:
+        """
+        Descartar los niveles de columnas cuyos valores cambiaron (ensure los reconstruye).
+
+        Args:
+            columns: Columnas modificadas
+        """
+        for column in columns:
+            self._levels.pop(column, None)
+
+    def _build(self, series: pd.Series, levels: List[Dict[str, np.ndarray]],
+               first_bucket: int) -> List[Dict[str, np.ndarray]]:
+        """
+        Recalcular los niveles a partir de un tramo del primer nivel.
+
+        Args:
+            series: Columna completa
+            levels: Niveles existentes (se conservan los tramos anteriores a first_bucket)
+            first_bucket: Primer tramo del nivel base que hay que recalcular
+
+        Returns:
+            List[Dict[str, np.ndarray]]: Niveles actualizados, del más fino al más grueso
+        """
+        fresh = _reduce_rows(series.iloc[first_bucket * BASE_BUCKET_SIZE:])
+        current = {stat: np.concatenate([levels[0][stat][:first_bucket], fresh[stat]]) if levels
+                   else fresh[stat] for stat in _STATS}
+        result = [current]
+
+        depth = 1
+        while len(current['count']) > 1:
+            # Solo cambian los tramos que contienen alguno de los recalculados
+            first_bucket //= 2
+            if depth < len(levels):
+                start = first_bucket * 2
+                tail = _reduce_pairs({stat: values[start:] for stat, values in current.items()})
+                current = {stat: np.concatenate([levels[depth][stat][:first_bucket], tail[stat]])
+                           for stat in _STATS}
+            else:
+                current = _reduce_pairs(current)
+            result.append(current)
+            depth += 1
+        return result
+
+    def append(self, df: pd.DataFrame, keys: Optional[np.ndarray] = None) -> None:
+        """
+        Incorporar filas añadidas al final del dataset.
+
+        Args:
+            df: Dataset completo con las filas nuevas al final
+            keys: Claves del eje X del dataset completo ya calculadas (None = calcularlas)
+
+        Raises:
+            ValueError: Si las filas nuevas rompen el orden del eje X
+        """
+        previous = self.rows
+        self._set_keys(df, keys)
+        first_bucket = previous // BASE_BUCKET_SIZE
+        for column in list(self._levels):
+            self._levels[column] = self._build(df[column], self._levels[column], first_bucket)
+
+    def row_range(self, x_min: Any, x_max: Any) -> Tuple[int, int]:
+        """
+        Obtener las filas cuyo valor X está dentro de [x_min, x_max].
+
+        Args:
+            x_min: Límite inferior en unidades de las claves (None = desde el principio)
+            x_max: Límite superior en unidades de las claves (None = hasta el final)
+
+        Returns:
+            Tuple[int, int]: Fila inicial (incluida) y final (excluida)
+        """
+        start = 0 if x_min is None else int(np.searchsorted(self.keys, x_min, side='left'))
+        end = self.rows if x_max is None else int(np.searchsorted(self.keys, x_max, side='right'))
+        return start, max(start, end)
+
+    @staticmethod
+    def bucket_size(level: int) -> int:
+        """Filas agrupadas en cada tramo de un nivel."""
+        return BASE_BUCKET_SIZE * 2 ** level
+
+    def level_for(self, rows: int, max_points: int) -> Optional[int]:
+        """
+        Elegir el nivel más fino que representa un rango de filas con max_points tramos o menos.
+
+        Args:
+            rows: Filas del rango visible
+            max_points: Puntos máximos a dibujar (normalmente el ancho en píxeles)
+
+        Returns:
+            Optional[int]: Nivel de la pirámide o None si las filas originales ya caben
+        """
+        if rows <= 2 * max_points or not self._levels:
+            return None
+        depth = len(next(iter(self._levels.values())))
+        size = BASE_BUCKET_SIZE
+        for level in range(depth):
+            if -(-rows // size) <= max_points:
+                return level
+            size *= 2
+        return depth - 1
+
+    def aggregate(self, level: int, row_start: int, row_end: int,
+                  columns: List[str]) -> Tuple[np.ndarray, Dict[str, Dict[str, np.ndarray]]]:
+        """
+        Leer los tramos de un nivel que cubren un rango de filas.
+
+        Args:
+            level: Nivel de la pirámide
+            row_start: Fila inicial (incluida)
+            row_end: Fila final (excluida)
+            columns: Columnas a leer (con niveles construidos)
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, Dict[str, np.ndarray]]]: Claves X del centro de cada
+            tramo y, por columna, sus arrays min, max, mean y count
+        """
+        size = self.bucket_size(level)
+        first = row_start // size
+        last = max(first, -(-row_end // size))
+        centers = np.minimum(np.arange(first, last) * size + size // 2, self.rows - 1)
+        keys = self.keys[centers]
+
+        result = {}
+        for column in columns:
+            stats = self._levels[column][level]
+            count = stats['count'][first:last]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = stats['sum'][first:last] / count
+            result[column] = {'min': stats['min'][first:last], 'max': stats['max'][first:last],
+                              'mean': mean, 'count': count}
+        return keys, result
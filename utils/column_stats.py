@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple, Any
+
+from utils.dtype_optimizer import get_numeric_columns
+from utils.datetime_utils import is_datetime_like, epoch_view
+
+# Hashes mínimos conservados por columna para estimar valores distintos (KMV)
+DISTINCT_SKETCH_SIZE = 1024
+
+_HASH_SPACE = float(2 ** 64)
+_NAT = np.iinfo(np.int64).min
+
+
+def _summarize(series: pd.Series) -> Dict[str, Any]:
+    """
+    Calcular con operaciones vectorizadas el resumen de una columna.
+
+    Args:
+        series: Columna a resumir
+
+    Returns:
+        Dict[str, Any]: count, nulls, min, max, sum, mean y m2 (suma de cuadrados de
+        las desviaciones a la media); None si no aplican
+    """
+    count = int(series.count())
+    summary = {'count': count, 'nulls': len(series) - count,
+               'min': None, 'max': None, 'sum': None, 'mean': None, 'm2': None}
+    if count == 0:
+        return summary
+
+    dtype = series.dtype
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        values = values[~np.isnan(values)]
+        mean = float(values.mean())
+        summary['min'] = series.min()
+        summary['max'] = series.max()
+        summary['sum'] = float(values.sum())
+        summary['mean'] = mean
+        # Desviaciones respecto a la media (dos pasadas): estable aunque los valores sean grandes
+        summary['m2'] = float(np.square(values - mean).sum())
+    elif is_datetime_like(series):
+        epochs = epoch_view(series)
+        epochs = epochs[epochs != _NAT]
+        summary['min'] = pd.Timestamp(int(epochs.min()))
+        summary['max'] = pd.Timestamp(int(epochs.max()))
+    return summary
+
+
+def _merge(current: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combinar los resúmenes de dos bloques de filas consecutivos de una columna.
+
+    La media y m2 se combinan con la fórmula de Chan (Welford por bloques), que
+    no pierde precisión como la diferencia entre suma de cuadrados y media².
+    """
+    merged = {'count': current['count'] + new['count'], 'nulls': current['nulls'] + new['nulls']}
+    for key, combine in (('min', min), ('max', max)):
+        values = [value for value in (current[key], new[key]) if value is not None]
+        merged[key] = combine(values) if values else None
+    values = [value for value in (current['sum'], new['sum']) if value is not None]
+    merged['sum'] = sum(values) if values else None
+
+    if current['mean'] is None or new['mean'] is None:
+        source = current if new['mean'] is None else new
+        merged['mean'], merged['m2'] = source['mean'], source['m2']
+    else:
+        n_a, n_b = current['count'], new['count']
+        delta = new['mean'] - current['mean']
+        total = n_a + n_b
+        merged['mean'] = current['mean'] + delta * n_b / total
+        merged['m2'] = current['m2'] + new['m2'] + delta * delta * n_a * n_b / total
+    return merged
+
+
+def _hash_values(series: pd.Series) -> np.ndarray:
+    """Hashes uint64 de los valores no nulos de una columna."""
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy()
+
+
+def _sketch(hashes: np.ndarray) -> np.ndarray:
+    """Conservar los DISTINCT_SKETCH_SIZE hashes distintos más pequeños."""
+    return np.unique(hashes)[:DISTINCT_SKETCH_SIZE]
+
+
+class ColumnStatistics:
+    """
+    Índice de estadísticas por columna de un dataset.
+
+    El esquema (tipos y columnas numéricas) se registra al crear el índice;
+    los resúmenes de cada columna (count, nulls, min, max, sum, mean, m2) se
+    calculan con una pasada vectorizada la primera vez que se piden y después
+    se actualizan de forma incremental al añadir filas, de modo que las
+    consultas no vuelven a recorrer los datos. El número de valores distintos
+    se estima con un sketch KMV (k valores mínimos), exacto hasta
+    DISTINCT_SKETCH_SIZE valores distintos.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Crear el índice de un dataset registrando su esquema.
+
+        Args:
+            df: Datos del dataset
+        """
+        self.rows = len(df)
+        self.dtypes: Dict[str, str] = {}
+        self._numeric: set = set()
+        self._columns: Dict[str, Dict[str, Any]] = {}
+        self._sketches: Dict[str, np.ndarray] = {}
+        self.refresh_schema(df)
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        """Columnas numéricas del dataset, en el orden de sus columnas."""
+        return [col for col in self.dtypes if col in self._numeric]
+
+    def refresh_schema(self, df: pd.DataFrame) -> None:
+        """
+        Actualizar los tipos registrados de las columnas de df (coste por columna, no por fila).
+
+        Args:
+            df: DataFrame con los tipos vigentes
+        """
+        self.dtypes.update({col: str(dtype) for col, dtype in df.dtypes.items()})
+        self._numeric.difference_update(df.columns)
+        self._numeric.update(get_numeric_columns(df))
+
+    def copy(self) -> "ColumnStatistics":
+        """
+        Obtener una copia independiente del índice (coste por columna, no por fila).
+
+        Los resúmenes y sketches no se modifican nunca en su sitio (se sustituyen),
+        así que la copia los comparte; permite completar el índice sin bloquear a
+        quien use el original y publicarlo después.
+
+        Returns:
+            ColumnStatistics: Copia con el mismo esquema y los mismos resúmenes
+        """
+        clone = ColumnStatistics.__new__(ColumnStatistics)
+        clone.rows = self.rows
+        clone.dtypes = dict(self.dtypes)
+        clone._numeric = set(self._numeric)
+        clone._columns = dict(self._columns)
+        clone._sketches = dict(self._sketches)
+        return clone
+
+    def ensure(self, df: pd.DataFrame, columns: Optional[List[str]] = None, distinct: bool = False) -> None:
+        """
+        Calcular los resúmenes que falten de las columnas indicadas.
+
+        Args:
+            df: Datos completos actuales del dataset
+            columns: Columnas requeridas (None = todas)
+            distinct: Construir también el sketch de valores distintos
+        """
+        for column in (df.columns if columns is None else columns):
+            if column not in self._columns:
+                self._columns[column] = _summarize(df[column])
+            if distinct and column not in self._sketches:
+                self._sketches[column] = _sketch(_hash_values(df[column]))
+
+    def add_columns(self, df: pd.DataFrame) -> None:
+        """
+        Registrar columnas nuevas o con valores sustituidos (mismas filas) del dataset.
+
+        Los resúmenes anteriores de esas columnas se descartan y se recalculan
+        la próxima vez que se pidan.
+
+        Args:
+            df: DataFrame con las columnas añadidas o sustituidas
+        """
+        for column in df.columns:
+            self._columns.pop(column, None)
+            self._sketches.pop(column, None)
+        self.refresh_schema(df)
+
+    def append(self, new_rows: pd.DataFrame, merged: Optional[pd.DataFrame] = None) -> None:
+        """
+        Actualizar el índice con filas añadidas al final del dataset.
+
+        El coste depende solo de las filas nuevas.
+
+        Args:
+            new_rows: Filas añadidas (mismas columnas que el dataset)
+            merged: Dataset resultante, para actualizar los tipos si cambiaron al concatenar
+        """
+        for column in list(self._columns):
+            if column not in new_rows.columns:
+                continue
+            self._columns[column] = _merge(self._columns[column], _summarize(new_rows[column]))
+            if column in self._sketches:
+                combined = np.concatenate([self._sketches[column], _hash_values(new_rows[column])])
+                self._sketches[column] = _sketch(combined)
+        self.rows += len(new_rows)
+        if merged is not None:
+            self.refresh_schema(merged)
+
+    def get(self, column: str) -> Dict[str, Any]:
+        """
+        Obtener las estadísticas de una columna.
+
+        Args:
+            column: Nombre de la columna
+
+        Returns:
+            Dict[str, Any]: count, nulls, min, max, sum, mean, m2, std y distinct
+            (estimación; None si aún no se ha calculado)
+
+        Raises:
+            ValueError: Si el resumen de la columna no se ha calculado (ver ensure)
+        """
+        if column not in self._columns:
+            raise ValueError(f"La columna '{column}' no está en el índice de estadísticas")
+
+        summary = dict(self._columns[column])
+        std = None
+        if summary['m2'] is not None and summary['count'] > 1:
+            # Varianza muestral a partir de la suma de cuadrados de las desviaciones
+            std = float(np.sqrt(max(summary['m2'], 0.0) / (summary['count'] - 1)))
+        summary['std'] = std
+        summary['distinct'] = self.distinct_estimate(column)
+        return summary
+
+    def has_summary(self, column: str) -> bool:
+        """Indicar si el resumen de una columna ya está calculado."""
+        return column in self._columns
+
+    def value_range(self, columns: List[str]) -> Tuple[Optional[Any], Optional[Any]]:
+        """
+        Obtener el mínimo y el máximo conjuntos de varias columnas.
+
+        Args:
+            columns: Columnas a considerar (con el resumen ya calculado)
+
+        Returns:
+            Tuple[Optional[Any], Optional[Any]]: (mínimo, máximo); None si no hay valores
+        """
+        minimums = [self._columns[col]['min'] for col in columns
+                    if col in self._columns and self._columns[col]['min'] is not None]
+        maximums = [self._columns[col]['max'] for col in columns
+                    if col in self._columns and self._columns[col]['max'] is not None]
+        return (min(minimums) if minimums else None, max(maximums) if maximums else None)
+
+    def distinct_estimate(self, column: str) -> Optional[int]:
+        """
+        Estimar el número de valores distintos no nulos de una columna.
+
+        Args:
+            column: Nombre de la columna
+
+        Returns:
+            Optional[int]: Estimación (exacta por debajo del tamaño del sketch) o None
+            si el sketch no se ha construido (ver ensure con distinct=True)
+        """
+        sketch = self._sketches.get(column)
+        if sketch is None:
+            return None
+        if len(sketch) < DISTINCT_SKETCH_SIZE:
+            return len(sketch)
+        return int(round((DISTINCT_SKETCH_SIZE - 1) * _HASH_SPACE / (float(sketch[-1]) + 1)))
@@ -1,21 +1,40 @@
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Union, Optional, Tuple
+from typing import List, Dict, Union, Optional, Tuple, Any
 import logging
+from utils.column_stats import ColumnStatistics
 
 class ValidatorCSV:
-    """Clase para validar archivos CSV y sus datos."""
+    """
+    Clase para validar archivos CSV y sus datos.
     
-    def __init__(self, dataframe: pd.DataFrame):
+    El validador trabaja sobre una vista del DataFrame recibido, sin copiarlo.
+    Las conversiones y rellenos de validate_column_types se aplican solo a la
+    vista del validador (sustituyendo la columna afectada), nunca al original.
+    Si se le asigna un índice de estadísticas, los conteos de nulos y las
+    comprobaciones de rango se responden desde él sin recorrer los datos.
+    """
+    
+    def __init__(self, dataframe: pd.DataFrame, stats: Optional[ColumnStatistics] = None):
         """
         Inicializar el validador con un DataFrame.
         
         Args:
-            dataframe (pd.DataFrame): DataFrame a validar
+            dataframe (pd.DataFrame): DataFrame a validar (no se modifica)
+            stats: Índice de estadísticas del mismo DataFrame (opcional)
         """
         if not isinstance(dataframe, pd.DataFrame):
             raise TypeError("Se requiere un DataFrame de pandas")
-        self.dataframe = dataframe.copy()
+        self.dataframe = dataframe
+        self.stats = stats
+        self._modified = set()   # Columnas sustituidas en la vista del validador
+    
+    def _column_summary(self, column: str) -> Optional[Dict[str, Any]]:
+        """Resumen de una columna desde el índice, si existe y sigue describiendo la vista."""
+        if (self.stats is None or column in self._modified or not self.stats.has_summary(column)
+                or self.stats.rows != len(self.dataframe)):
+            return None
+        return self.stats.get(column)
 
     def validate_columns(self, required_columns: List[str]) -> bool:
         """
@@ -57,7 +76,8 @@ class ValidatorCSV:
             if not self.validate_column_exists(column):
                 raise ValueError(f"La columna '{column}' no existe en el DataFrame")
             
-            null_count = self.dataframe[column].isna().sum()
+            summary = self._column_summary(column)
+            null_count = summary['nulls'] if summary else self.dataframe[column].isna().sum()
             result[column] = null_count
             
         return result
@@ -134,23 +154,19 @@ class ValidatorCSV:
         if not column_types:
             return True
             
-        # Convertir tipos de columnas en copia para no modificar el original
-        df_copy = self.dataframe.copy()
-        
         for column, dtype in column_types.items():
             if not self.validate_column_exists(column):
                 raise ValueError(f"La columna '{column}' no existe en el DataFrame")
                 
             try:
-                # Reemplazar valores nulos si es necesario
+                # Trabajar sobre la columna: rellenar nulos (explícito) y convertir tipo
+                series = self.dataframe[column]
                 if fill_values and column in fill_values:
-                    df_copy[column] = df_copy[column].fillna(fill_values[column])
-                    
-                # Convertir tipo
-                df_copy[column] = df_copy[column].astype(dtype)
+                    series = series.fillna(fill_values[column])
+                series = series.astype(dtype)
                 
-                # Actualizar DataFrame original
-                self.dataframe[column] = df_copy[column]
+                # Sustituir la columna solo en la vista del validador
+                self._replace_column(column, series)
                 
             except (ValueError, TypeError) as e:
                 problematic_values = self._find_problematic_values(column, dtype)
@@ -161,6 +177,22 @@ class ValidatorCSV:
                 
         return True
 
+    def _replace_column(self, column: str, series: pd.Series) -> None:
+        """
+        Sustituir una columna en la vista del validador sin tocar el DataFrame original.
+        
+        La copia superficial comparte los búferes del resto de columnas, de modo
+        que solo se asigna memoria para la columna convertida.
+        
+        Args:
+            column: Nombre de la columna
+            series: Nuevos valores de la columna
+        """
+        dataframe = self.dataframe.copy(deep=False)
+        dataframe[column] = series
+        self.dataframe = dataframe
+        self._modified.add(column)
+
     def _find_problematic_values(self, column: str, target_type: str) -> List:
         """
         Encontrar valores que no pueden convertirse al tipo especificado.
@@ -228,6 +260,14 @@ class ValidatorCSV:
             min_val = range_values.get('min', -np.inf)
             max_val = range_values.get('max', np.inf)
             
+            # Si el mínimo y el máximo indexados están dentro del rango no hace falta recorrer la columna
+            summary = self._column_summary(column)
+            if summary and summary['count'] == 0:
+                continue
+            # Los booleanos no tienen mínimo ni máximo indexados: se recorren como antes
+            if summary and summary['min'] is not None and summary['min'] >= min_val and summary['max'] <= max_val:
+                continue
+            
             # Ignorar valores nulos en la validación de rango
             valid_data = self.dataframe[column].dropna()
             mask = (valid_data < min_val) | (valid_data > max_val)
@@ -283,6 +323,14 @@ class ValidatorCSV:
         if not pd.api.types.is_numeric_dtype(self.dataframe[column]):
             raise ValueError(f"La columna '{column}' no es numérica")
             
+        # Comprobar primero contra el mínimo y el máximo indexados
+        summary = self._column_summary(column)
+        if summary and (summary['count'] == 0 or (
+                summary['min'] is not None
+                and (min_value is None or summary['min'] >= min_value)
+                and (max_value is None or summary['max'] <= max_value))):
+            return True, []
+            
         out_of_range = []
         
         # Filtrar por mínimo si se especifica
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Any
+import logging
+import re
+
+# Formatos de fecha reconocidos, de más a menos específico
+DATETIME_FORMATS = [
+    '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M',
+    '%Y-%m-%d', '%Y/%m/%d %H:%M:%S', '%Y/%m/%d',
+    '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y',
+    '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y',
+    '%d-%m-%Y %H:%M:%S', '%d-%m-%Y', '%d.%m.%Y %H:%M:%S', '%d.%m.%Y'
+]
+
+# Valores de texto examinados por columna para inferir el formato
+DATETIME_SAMPLE_SIZE = 200
+
+# Paso usado al extender un eje temporal con un único punto
+DEFAULT_TIME_STEP = timedelta(days=1)
+
+_PLAIN_NUMBER = re.compile(r'^[-+]?\d+(\.\d+)?$')
+
+
+def _swap_day_month(fmt: str) -> str:
+    """Formato con el día y el mes intercambiados (p. ej. '%d/%m/%Y' -> '%m/%d/%Y')."""
+    return fmt.replace('%d', '\0').replace('%m', '%d').replace('\0', '%m')
+
+
+# Formatos con día y mes separados por barras: sin un componente mayor que 12 el orden es ambiguo
+_DAY_MONTH_FORMATS = frozenset(fmt for fmt in DATETIME_FORMATS if fmt.startswith(('%d/%m', '%m/%d')))
+
+
+def _parses(values: List[str], fmt: str) -> bool:
+    """Indicar si todos los valores se interpretan con el formato."""
+    try:
+        for value in values:
+            datetime.strptime(value, fmt)
+        return True
+    except ValueError:
+        return False
+
+
+def infer_datetime_format(values: List[str], ambiguous: bool = False) -> Optional[str]:
+    """
+    Buscar un formato de fecha que interprete todos los valores de una muestra.
+
+    Los formatos con día y mes separados por barras solo se aceptan si algún
+    valor de la muestra tiene un componente mayor que 12 que decide el orden
+    (p. ej. 25/03/2024); si no, la columna no se considera de fechas.
+
+    Args:
+        values: Valores de texto no vacíos de una columna
+        ambiguous: Aceptar también un orden día/mes que la muestra no decide
+                   (para saber si los valores son fechas, no para convertirlos)
+
+    Returns:
+        Optional[str]: Formato strftime reconocido o None si la columna no es de fechas
+    """
+    if not values or not all(any(ch.isdigit() for ch in value) for value in values):
+        return None
+
+    # Los valores puramente numéricos no se consideran fechas
+    if all(_PLAIN_NUMBER.match(value) for value in values):
+        return None
+
+    for fmt in DATETIME_FORMATS:
+        if not _parses(values, fmt):
+            continue
+        if fmt in _DAY_MONTH_FORMATS and not ambiguous and _parses(values, _swap_day_month(fmt)):
+            # Ningún día supera 12: no se sabe si es día/mes o mes/día
+            logging.debug(f"Orden de día y mes ambiguo en la muestra ({fmt}); la columna queda como texto")
+            return None
+        return fmt
+    return None
+
+
+def materialize_datetimes(df: pd.DataFrame,
+                          formats: Optional[Dict[Any, Optional[str]]] = None) -> Tuple[pd.DataFrame, Dict[Any, Optional[str]]]:
+    """
+    Convertir una sola vez a datetime64[ns] las columnas de fecha de un DataFrame.
+
+    Las columnas de texto se examinan con una muestra para inferir su formato;
+    el resultado (incluido "no es fecha", guardado como None) se devuelve para
+    reutilizarlo en cargas posteriores del mismo dataset sin volver a inferir.
+
+    Args:
+        df: DataFrame recién cargado
+        formats: Formatos ya conocidos por columna (None = columna que no es de fechas)
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[Any, Optional[str]]]: DataFrame con las fechas convertidas
+        y formatos por columna actualizados
+    """
+    formats = dict(formats or {})
+    converted = {}
+
+    for column, dtype in df.dtypes.items():
+        # Fechas ya tipadas con otra resolución (p. ej. microsegundos): pasar a nanosegundos
+        if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+            if dtype != 'datetime64[ns]':
+                converted[column] = df[column].astype('datetime64[ns]')
+            continue
+
+        # Solo se examinan columnas de texto; las fechas ya tipadas (incluidas las de Arrow) se conservan
+        if not (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) \
+                or isinstance(dtype, pd.CategoricalDtype):
+            continue
+
+        series = df[column]
+        if column not in formats:
+            sample = [value.strip() for value in series.dropna().head(DATETIME_SAMPLE_SIZE)
+                      if isinstance(value, str) and value.strip()]
+            formats[column] = infer_datetime_format(sample)
+
+        fmt = formats[column]
+        if not fmt:
+            continue
+
+        try:
+            parsed = pd.to_datetime(series, format=fmt)
+        except (ValueError, TypeError) as e:
+            # Valores fuera de la muestra con otro formato: dejar la columna como texto
+            logging.warning(f"La columna '{column}' no sigue el formato {fmt}: {str(e)}")
+            formats[column] = None
+            continue
+
+        # Resolución fija en nanosegundos para que la vista int64 sea directa
+        if parsed.dtype != 'datetime64[ns]':
+            parsed = parsed.astype('datetime64[ns]')
+        converted[column] = parsed
+
+    if not converted:
+        return df, formats
+
+    result = df.copy(deep=False)
+    for column, series in converted.items():
+        result[column] = series
+    return result, formats
+
+
+def _is_arrow_timestamp(dtype: Any) -> bool:
+    """Indicar si un tipo es una columna de fechas respaldada por Arrow."""
+    arrow_dtype = getattr(pd, 'ArrowDtype', None)
+    return arrow_dtype is not None and isinstance(dtype, arrow_dtype) and dtype.numpy_dtype.kind == 'M'
+
+
+def is_datetime_like(values: Any) -> bool:
+    """Indicar si una serie, índice o array contiene fechas (con o sin zona horaria)."""
+    dtype = getattr(values, 'dtype', None)
+    return dtype is not None and (pd.api.types.is_datetime64_any_dtype(dtype) or _is_arrow_timestamp(dtype))
+
+
+def epoch_view(values: Any) -> np.ndarray:
+    """
+    Obtener las fechas como nanosegundos desde epoch en un array int64.
+
+    Para columnas datetime64[ns] sin zona horaria no copia datos: es una
+    vista del mismo búfer. NaT se representa con el mínimo de int64.
+
+    Args:
+        values: Serie, índice o array de fechas
+
+    Returns:
+        np.ndarray: Array int64 con los instantes en nanosegundos
+
+    Raises:
+        ValueError: Si los valores no son fechas
+    """
+    if not is_datetime_like(values):
+        raise ValueError("Los valores no son de tipo fecha")
+
+    dtype = values.dtype
+    if _is_arrow_timestamp(dtype):
+        values = pd.Series(values).to_numpy(dtype='datetime64[ns]', na_value=np.datetime64('NaT'))
+    elif isinstance(dtype, pd.DatetimeTZDtype):
+        values = pd.Series(values).dt.tz_convert('UTC').dt.tz_localize(None)
+
+    return np.asarray(values, dtype='datetime64[ns]').view('int64')
+
+
+def extend_time_axis(x_values: Any, periods: int) -> Any:
+    """
+    Generar las posiciones X de los periodos siguientes a un eje existente.
+
+    Para ejes de fechas se trabaja sobre la vista int64 (sin reconvertir
+    textos ni recorrer objetos Timestamp) con el paso medio entre puntos.
+
+    Args:
+        x_values: Valores del eje X original (fechas, range, índice o serie numérica)
+        periods: Número de posiciones a generar
+
+    Returns:
+        Any: DatetimeIndex para ejes temporales o range en otro caso
+    """
+    if is_datetime_like(x_values):
+        epochs = epoch_view(x_values)
+        epochs = epochs[epochs != np.iinfo(np.int64).min]   # Descartar NaT
+        if len(epochs) > 0:
+            if len(epochs) > 1:
+                step = (int(epochs[-1]) - int(epochs[0])) // (len(epochs) - 1)
+            else:
+                step = int(DEFAULT_TIME_STEP.total_seconds() * 1e9)
+            future = int(epochs[-1]) + step * np.arange(1, periods + 1, dtype=np.int64)
+            return pd.to_datetime(future)
+
+    if isinstance(x_values, range) and len(x_values) > 0:
+        last_x = max(x_values)
+        return range(last_x + 1, last_x + periods + 1)
+
+    return range(len(x_values), len(x_values) + periods)
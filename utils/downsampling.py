@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Optional, Tuple
+
+from utils.datetime_utils import is_datetime_like, epoch_view
+
+# Métodos de reducción disponibles
+MINMAX = 'minmax'
+LTTB = 'lttb'
+
+
+def _numeric_axis(x_values: Any, n: int) -> np.ndarray:
+    """
+    Obtener las posiciones X como float64 para los cálculos geométricos.
+
+    Las fechas se usan por su vista en nanosegundos; los ejes no numéricos
+    (categorías, textos) se tratan por posición.
+    """
+    if x_values is not None and is_datetime_like(x_values):
+        return epoch_view(x_values).astype('float64')
+    if x_values is not None and pd.api.types.is_numeric_dtype(getattr(x_values, 'dtype', None)):
+        return np.asarray(x_values, dtype='float64')
+    return np.arange(n, dtype='float64')
+
+
+def _take(x_values: Any, indices: np.ndarray) -> Any:
+    """Seleccionar posiciones de los valores X conservando su tipo (serie, índice o array)."""
+    if isinstance(x_values, pd.Series):
+        return x_values.iloc[indices]
+    if isinstance(x_values, pd.Index):
+        return x_values[indices]
+    return np.asarray(x_values)[indices]
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Seleccionar el mínimo y el máximo de cada tramo de puntos consecutivos.
+
+    Con un tramo por píxel, la línea dibujada con los puntos elegidos cubre
+    exactamente la misma altura en cada columna de píxeles que la original.
+
+    Args:
+        y: Valores Y (float64; NaN = ausente)
+        n_buckets: Número de tramos (normalmente el ancho en píxeles)
+
+    Returns:
+        np.ndarray: Posiciones seleccionadas, ordenadas y sin repetir (incluye extremos)
+    """
+    n = len(y)
+    if n_buckets <= 0 or n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    offsets = np.arange(n_buckets) * size
+
+    # Rellenar hasta completar los tramos; los NaN nunca ganan al mínimo ni al máximo
+    missing = np.isnan(y)
+    low = np.full(n_buckets * size, np.inf)
+    low[:n] = np.where(missing, np.inf, y)
+    high = np.full(n_buckets * size, -np.inf)
+    high[:n] = np.where(missing, -np.inf, y)
+
+    argmin = low.reshape(n_buckets, size).argmin(axis=1) + offsets
+    argmax = high.reshape(n_buckets, size).argmax(axis=1) + offsets
+    indices = np.concatenate([argmin, argmax, [0, n - 1]])
+    return np.unique(indices[indices < n])
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Seleccionar puntos con Largest-Triangle-Three-Buckets.
+
+    En cada tramo se elige el punto que forma el triángulo de mayor área con
+    el punto elegido en el tramo anterior y la media del tramo siguiente, lo
+    que conserva picos y cambios de tendencia.
+
+    Args:
+        x: Posiciones X (float64)
+        y: Valores Y (float64; NaN = ausente)
+        threshold: Número de puntos a conservar (incluidos el primero y el último)
+
+    Returns:
+        np.ndarray: Posiciones seleccionadas, ordenadas
+    """
+    n = len(y)
+    if threshold < 3 or n <= threshold:
+        return np.arange(n)
+
+    # threshold - 2 tramos entre el primer y el último punto
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    anchor = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = np.nanmean(y[end:next_end]) if not np.isnan(y[end:next_end]).all() else np.nan
+
+        area = np.abs((x[anchor] - next_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (next_y - y[anchor]))
+        anchor = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[i + 1] = anchor
+
+    return selected
+
+
+def downsample(x_values: Any, y_data: pd.DataFrame, pixel_width: int,
+               method: Optional[str] = MINMAX, x_keys: Optional[np.ndarray] = None) -> Tuple[Any, pd.DataFrame]:
+    """
+    Reducir los puntos de un gráfico a los que caben en su ancho en píxeles.
+
+    Las posiciones elegidas para cada serie se unen, de modo que todas las
+    columnas siguen alineadas con los mismos valores X. La selección se hace
+    con iloc y no copia los datos que no se eligen.
+
+    Args:
+        x_values: Valores del eje X (serie, índice o array)
+        y_data: Columnas numéricas a dibujar
+        pixel_width: Ancho del área del gráfico en píxeles
+        method: 'minmax' (mínimo y máximo por píxel), 'lttb' o None (sin reducción)
+        x_keys: Posiciones X numéricas ya calculadas (p. ej. la vista en nanosegundos
+                cacheada por el repositorio); None = obtenerlas de x_values
+
+    Returns:
+        Tuple[Any, pd.DataFrame]: Valores X y datos Y reducidos (los originales si caben)
+
+    Raises:
+        ValueError: Si el método no es conocido
+    """
+    n = len(y_data)
+    if method is None or pixel_width <= 0 or n <= 2 * pixel_width:
+        return x_values, y_data
+    if method not in (MINMAX, LTTB):
+        raise ValueError(f"Método de reducción no soportado: {method}")
+
+    x = None
+    if method == LTTB:
+        x = _numeric_axis(x_values, n) if x_keys is None else np.asarray(x_keys, dtype='float64')
+    selected = []
+    for column in y_data.columns:
+        y = y_data[column].to_numpy(dtype='float64', na_value=np.nan)
+        if method == MINMAX:
+            selected.append(minmax_indices(y, pixel_width))
+        else:
+            selected.append(lttb_indices(x, y, pixel_width))
+
+    indices = np.unique(np.concatenate(selected)) if len(selected) > 1 else selected[0]
+    return _take(x_values, indices), y_data.iloc[indices]
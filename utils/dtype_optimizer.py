@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple, Any
+import logging
+
+from utils.datetime_utils import infer_datetime_format, DATETIME_SAMPLE_SIZE
+
+# Perfiles de carga disponibles y sus parámetros de optimización
+DTYPE_PROFILES = {
+    'compact': {
+        'downcast_integers': True,      # int64 -> int8/int16/int32 cuando el rango lo permite
+        'downcast_floats': True,        # float64 -> float32
+        'categorical_threshold': 0.5,   # Proporción máxima de valores únicos para usar category
+    }
+}
+
+
+def get_numeric_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Obtener las columnas numéricas de un DataFrame con independencia del ancho del tipo.
+
+    Reconoce tanto int64/float64 como los tipos reducidos (int8, float32, etc.)
+    y excluye las columnas booleanas.
+
+    Args:
+        df: DataFrame a inspeccionar
+
+    Returns:
+        List[str]: Nombres de las columnas numéricas
+    """
+    return [col for col, dtype in df.dtypes.items()
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+
+
+def to_numpy_backed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convertir a tipos NumPy las columnas respaldadas por Arrow (pd.ArrowDtype).
+
+    Se aplica solo en el límite con gráficos y modelos, que trabajan con
+    arrays NumPy; el resto de columnas se reutiliza sin copiar.
+
+    Args:
+        df: DataFrame posiblemente leído con el motor 'arrow'
+
+    Returns:
+        pd.DataFrame: DataFrame con columnas NumPy (el mismo objeto si no había columnas Arrow)
+    """
+    arrow_dtype = getattr(pd, 'ArrowDtype', None)
+    if arrow_dtype is None:
+        return df
+
+    converted = {}
+    for column, dtype in df.dtypes.items():
+        if not isinstance(dtype, arrow_dtype):
+            continue
+
+        series = df[column]
+        kind = dtype.numpy_dtype.kind
+        if kind in 'iub' and not series.isna().any():
+            values = series.to_numpy(dtype=dtype.numpy_dtype)
+        elif kind in 'iuf':
+            # Los nulos de Arrow pasan a NaN, como en el parser de pandas
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+        elif kind == 'M':
+            values = series.to_numpy(dtype='datetime64[ns]', na_value=np.datetime64('NaT'))
+        else:
+            values = series.to_numpy(dtype=object, na_value=np.nan)
+        converted[column] = pd.Series(values, index=df.index, name=column)
+
+    return _replace_columns(df, converted) if converted else df
+
+
+def optimize_dtypes(df: pd.DataFrame, profile: str = 'compact') -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Reducir la memoria de un DataFrame aplicando un perfil de tipos de datos.
+
+    Args:
+        df: DataFrame a optimizar
+        profile: Nombre del perfil de optimización (ver DTYPE_PROFILES)
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]: DataFrame optimizado y reporte por
+        columna con tipo original, tipo final y bytes ahorrados
+
+    Raises:
+        ValueError: Si el perfil solicitado no existe
+    """
+    if profile not in DTYPE_PROFILES:
+        raise ValueError(f"Perfil de tipos desconocido: {profile}. Disponibles: {list(DTYPE_PROFILES)}")
+
+    options = DTYPE_PROFILES[profile]
+    converted = {}
+    report = {}
+
+    for column in df.columns:
+        series = df[column]
+        new_series = _optimize_series(series, options)
+
+        if new_series is None or new_series.dtype == series.dtype:
+            continue
+
+        # Medir el ahorro real incluyendo el contenido de los objetos Python
+        bytes_before = int(series.memory_usage(deep=True, index=False))
+        bytes_after = int(new_series.memory_usage(deep=True, index=False))
+
+        if bytes_after >= bytes_before:
+            continue
+
+        converted[column] = new_series
+        report[column] = {
+            'original_dtype': str(series.dtype),
+            'optimized_dtype': str(new_series.dtype),
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+            'bytes_saved': bytes_before - bytes_after
+        }
+
+    if converted:
+        df = _replace_columns(df, converted)
+        total_saved = sum(item['bytes_saved'] for item in report.values())
+        logging.info(f"Optimización de tipos ({profile}): {len(report)} columnas, {total_saved} bytes ahorrados")
+
+    return df, report
+
+
+def _optimize_series(series: pd.Series, options: Dict[str, Any]) -> Optional[pd.Series]:
+    """
+    Calcular la versión optimizada de una serie según las opciones del perfil.
+
+    Args:
+        series: Serie a optimizar
+        options: Parámetros del perfil de optimización
+
+    Returns:
+        Optional[pd.Series]: Serie convertida o None si no aplica ninguna conversión
+    """
+    dtype = series.dtype
+
+    if pd.api.types.is_bool_dtype(dtype):
+        return None
+
+    if pd.api.types.is_integer_dtype(dtype) and options.get('downcast_integers'):
+        return pd.to_numeric(series, downcast='integer')
+
+    if pd.api.types.is_float_dtype(dtype) and options.get('downcast_floats'):
+        return pd.to_numeric(series, downcast='float')
+
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        threshold = options.get('categorical_threshold')
+        if not threshold or len(series) == 0:
+            return None
+
+        # Las fechas en texto se dejan para materialize_datetimes, que no examina categorías
+        sample = [value.strip() for value in series.dropna().head(DATETIME_SAMPLE_SIZE)
+                  if isinstance(value, str) and value.strip()]
+        if infer_datetime_format(sample):
+            return None
+
+        # Convertir a categoría solo columnas de baja cardinalidad
+        unique_ratio = series.nunique(dropna=True) / len(series)
+        if unique_ratio <= threshold:
+            return series.astype('category')
+
+    return None
+
+
+def _replace_columns(df: pd.DataFrame, converted: Dict[Any, pd.Series]) -> pd.DataFrame:
+    """Reemplazar columnas en una copia superficial del DataFrame sin duplicar las demás."""
+    result = df.copy(deep=False)
+    for column, series in converted.items():
+        result[column] = series
+    return result
@@ -0,0 +1,109 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class ReadWriteLock:
+    """
+    Cerrojo de lectores y escritor: muchas lecturas simultáneas o una única escritura.
+
+    Los escritores tienen preferencia: en cuanto uno espera, las lecturas
+    nuevas de otros hilos se detienen hasta que termine, de modo que un flujo
+    continuo de lecturas no lo bloquea indefinidamente. El cerrojo es
+    reentrante por hilo: quien ya lee puede volver a leer y quien escribe
+    puede leer o escribir de nuevo. Pasar de lectura a escritura no está
+    permitido, porque dos hilos que lo intentaran a la vez se bloquearían
+    mutuamente.
+    """
+
+    def __init__(self):
+        """Inicializar el cerrojo sin lectores ni escritor."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}   # Hilo -> lecturas anidadas
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Empezar una lectura, esperando si hay un escritor activo o en espera."""
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers[me] = 1
+
+    def release_read(self) -> None:
+        """
+        Terminar una lectura.
+
+        Raises:
+            RuntimeError: Si el hilo no tiene ninguna lectura en curso
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if me not in self._readers:
+                raise RuntimeError("El hilo no tiene ninguna lectura en curso")
+            self._readers[me] -= 1
+            if not self._readers[me]:
+                del self._readers[me]
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Empezar una escritura, esperando a que terminen las lecturas y escrituras en curso.
+
+        Raises:
+            RuntimeError: Si el hilo tiene una lectura en curso sin ser el escritor
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("No se puede pasar de lectura a escritura; libere antes la lectura")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        """
+        Terminar una escritura.
+
+        Raises:
+            RuntimeError: Si el hilo no es el escritor
+        """
+        with self._condition:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("El hilo no tiene ninguna escritura en curso")
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Bloque de lectura (with lock.read(): ...)."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Bloque de escritura (with lock.write(): ...)."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
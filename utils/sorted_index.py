@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Optional, Tuple, Union
+
+from utils.datetime_utils import is_datetime_like, epoch_view
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _column_keys(values: pd.Series) -> np.ndarray:
+    """
+    Claves numéricas ordenables de una columna (nanosegundos para fechas, float64 para números).
+
+    Raises:
+        ValueError: Si la columna no es de fechas ni numérica
+    """
+    if is_datetime_like(values):
+        return epoch_view(values)
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        return values.to_numpy(dtype='float64', na_value=np.nan)
+    raise ValueError(f"La columna '{values.name}' no es de fechas ni numérica")
+
+
+def _column_timezone(values: pd.Series) -> Any:
+    """Zona horaria de una columna de fechas (también respaldada por Arrow); None si no tiene."""
+    tz = getattr(values.dtype, 'tz', None)
+    if tz is None:
+        tz = getattr(getattr(values.dtype, 'pyarrow_dtype', None), 'tz', None)
+    return tz
+
+
+def _is_sorted(keys: np.ndarray) -> bool:
+    """Indicar si las claves están en orden ascendente (NaN rompe el orden)."""
+    return len(keys) < 2 or bool((keys[1:] >= keys[:-1]).all())
+
+
+class SortedIndex:
+    """
+    Índice ordenado de una columna de fechas o numérica para consultas por rango.
+
+    Si la columna ya está ordenada (el caso habitual en series temporales) el
+    índice no guarda nada más que una vista de la columna y cada consulta
+    devuelve un intervalo de filas contiguo, que se recorta sin copiar. Si no,
+    se guarda la permutación que la ordena. Las consultas se resuelven con
+    búsqueda binaria; los valores nulos nunca entran en un rango.
+    """
+
+    def __init__(self, values: pd.Series, keys: Optional[np.ndarray] = None):
+        """
+        Crear el índice de una columna.
+
+        Args:
+            values: Columna completa del dataset
+            keys: Claves de la columna ya calculadas (p. ej. la vista en nanosegundos
+                  cacheada por el repositorio); None = calcularlas
+
+        Raises:
+            ValueError: Si la columna no es de fechas ni numérica
+        """
+        self.column = values.name
+        self.is_datetime = is_datetime_like(values)
+        self.tz = _column_timezone(values)   # Zona horaria de la columna (None = sin zona)
+        self.rows = 0
+        self.keys = np.empty(0)
+        self.order: Optional[np.ndarray] = None   # Permutación que ordena la columna (None = ya ordenada)
+        self._build(_column_keys(values) if keys is None else keys)
+
+    def _build(self, keys: np.ndarray) -> None:
+        """Registrar las claves, ordenándolas si hace falta."""
+        self.rows = len(keys)
+        if _is_sorted(keys):
+            self.order = None
+            self.keys = keys
+        else:
+            # Ordenación estable: filas con la misma clave conservan su orden original
+            self.order = np.argsort(keys, kind='stable')
+            self.keys = keys[self.order]
+
+        # NaT (mínimo de int64) queda al principio y NaN al final del orden
+        if self.is_datetime:
+            self._valid = (int(np.searchsorted(self.keys, _NAT, side='right')), self.rows)
+        else:
+            self._valid = (0, self.rows - int(np.isnan(self.keys).sum()))
+
+    def append(self, values: pd.Series, keys: Optional[np.ndarray] = None) -> None:
+        """
+        Incorporar las filas añadidas al final de la columna.
+
+        Si las filas nuevas continúan el orden se reutiliza la vista de la
+        columna; si no, se reordena (la ordenación estable aprovecha los tramos
+        ya ordenados).
+
+        Args:
+            values: Columna completa con las filas nuevas al final
+            keys: Claves de la columna completa ya calculadas (None = calcularlas)
+        """
+        keys = _column_keys(values) if keys is None else keys
+        previous = self.rows
+        if self.order is None and _is_sorted(keys[max(previous - 1, 0):]):
+            self.rows = len(keys)
+            self.keys = keys
+            self._valid = (self._valid[0], self.rows) if self.is_datetime else (0, self.rows)
+            return
+        self._build(keys)
+
+    def coerce(self, bound: Any) -> Any:
+        """
+        Convertir un límite de rango (fecha, número o texto) a las unidades de las claves.
+
+        Args:
+            bound: Límite indicado por el usuario (None = sin límite)
+
+        Returns:
+            Any: Límite en nanosegundos desde epoch o como float; None si no hay límite.
+            En columnas con zona horaria los límites sin zona se interpretan en la de la columna
+
+        Raises:
+            ValueError: Si el límite no puede interpretarse como fecha o número
+        """
+        if bound is None or (isinstance(bound, str) and not bound.strip()):
+            return None
+        try:
+            if self.is_datetime:
+                timestamp = pd.Timestamp(bound.strip() if isinstance(bound, str) else bound)
+                if timestamp.tzinfo is None and self.tz is not None:
+                    # Un límite sin zona se refiere a la hora local de la columna
+                    timestamp = timestamp.tz_localize(self.tz, ambiguous=True, nonexistent='shift_forward')
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+                return timestamp.value
+            return float(bound)
+        except (ValueError, TypeError) as e:
+            kind = "fecha" if self.is_datetime else "número"
+            raise ValueError(f"El límite '{bound}' no se puede interpretar como {kind} "
+                             f"en la columna '{self.column}': {str(e)}")
+
+    def row_range(self, x_min: Any = None, x_max: Any = None) -> Tuple[int, int]:
+        """
+        Buscar el intervalo del orden cuyas claves están en [x_min, x_max].
+
+        Args:
+            x_min: Límite inferior (None = desde el primer valor)
+            x_max: Límite superior (None = hasta el último valor)
+
+        Returns:
+            Tuple[int, int]: Posición inicial (incluida) y final (excluida) en el orden
+        """
+        valid_start, valid_end = self._valid
+        x_min, x_max = self.coerce(x_min), self.coerce(x_max)
+        start = valid_start if x_min is None else max(
+            valid_start, int(np.searchsorted(self.keys[:valid_end], x_min, side='left')))
+        end = valid_end if x_max is None else int(np.searchsorted(self.keys[:valid_end], x_max, side='right'))
+        return start, max(start, end)
+
+    def positions(self, x_min: Any = None, x_max: Any = None) -> Union[slice, np.ndarray]:
+        """
+        Obtener las filas del dataset con valores en [x_min, x_max].
+
+        Args:
+            x_min: Límite inferior (None = sin límite)
+            x_max: Límite superior (None = sin límite)
+
+        Returns:
+            Union[slice, np.ndarray]: Intervalo de filas (columna ordenada) o posiciones
+            en orden ascendente de la columna
+        """
+        start, end = self.row_range(x_min, x_max)
+        if self.order is None:
+            return slice(start, end)
+        return self.order[start:end]